@@ -1,118 +1,451 @@
+import hashlib
+import json
 import os
-import joblib
-from flask import Flask, render_template, request, jsonify, send_file
+from datetime import datetime, timezone
+from flask import Flask, Response, render_template, request, jsonify, send_file
 import pandas as pd
-from pymongo import MongoClient
-from azure.storage.blob import BlobServiceClient
+from data_source import data_source_from_env
+from features import FEATURES, FeatureStore, build_features, upsert_rows
+from league_feed import LEAGUE_FEED, LeagueFeed, LeagueState, extend_snapshot_id
+from match_features import MatchFeatureEngine
+from metrics import Metrics, SlowRequestProfiler, instrument
+from model_store import ModelStore, model_source_from_env
+from response_cache import ResponseCache
+from scenario import ScenarioEngine
+from team_index import build_team_index, latest_rows, snapshot_rows
+from simulation import fit_team_strengths, simulate_season, split_matches
 
-def download_file_from_blob(container_name, blob_pattern, local_filename):
+def build_details(team_data):
     """
-    Lädt eine Datei aus dem angegebenen Blob-Container herunter, 
-    deren Name dem übergebenen Muster (blob_pattern) entspricht, und speichert sie lokal.
+    Stellt die Zusatzinformationen zu einer Tabellenzeile zusammen, wie sie im Frontend
+    und in der JSON-API angezeigt werden.
     """
-    connection_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-    if not connection_str:
-        raise ValueError("AZURE_STORAGE_CONNECTION_STRING ist nicht gesetzt!")
-    
-    blob_service_client = BlobServiceClient.from_connection_string(connection_str)
-    container_client = blob_service_client.get_container_client(container_name)
-    blobs = list(container_client.list_blobs(name_starts_with=blob_pattern))
-    if not blobs:
-        raise FileNotFoundError(f"Keine Datei gefunden, die mit '{blob_pattern}' beginnt!")
-    
-    # Sortieren nach Versionsnummer (angenommen, die Version steht am Ende des Blob-Namens)
-    latest_blob = sorted(
-        blobs, key=lambda b: int(b.name.split("-")[-1].replace(".pkl", ""))
-    )[-1]
-    local_path = os.path.join("..", "model", local_filename)
-    # Sicherstellen, dass das Verzeichnis existiert
-    os.makedirs(os.path.dirname(local_path), exist_ok=True)
-    with open(local_path, "wb") as f:
-        f.write(container_client.download_blob(latest_blob.name).readall())
-    return local_path
-
-def download_model_and_scaler():
-    """
-    Lädt sowohl das aktuellste Modell als auch den Skalierer aus dem Blob Storage herunter
-    und gibt die lokalen Pfade zurück.
-    """
-    container_name = "models"  # Containername, wie im save.py verwendet
-    model_path = download_file_from_blob(container_name, "model-", "model.pkl")
-    scaler_path = download_file_from_blob(container_name, "scaler-", "scaler.pkl")
-    return model_path, scaler_path
+    return {
+        "Aktuelle Punkte": team_data["Points"],
+        "Aktueller Rank": team_data["Rank"],
+        "Restspiele": team_data["Restspiele"],
+        "Geschätzte Extra-Punkte": team_data["Estimated_Extra_Points"],
+        "Aktueller Spieltag": team_data["Spieltag"],
+    }
+
+def simulation_details(team_sim):
+    """Fasst das Simulationsergebnis eines Teams für die Detailansicht zusammen."""
+    if team_sim is None:
+        return {"Simulation Restsaison": "Keine Spieldaten vorhanden"}
+    return {
+        "Simulation Restsaison": (
+            f"Abstieg {team_sim['Relegation']*100:.1f}%, Barrage {team_sim['Playoff']*100:.1f}%, "
+            f"Meistertitel {team_sim['Title']*100:.1f}%"
+        ),
+        "Simulierte Extra-Punkte": round(team_sim["Expected_Extra_Points"], 2),
+        "Simulierter Schlussrang": round(team_sim["Expected_Rank"], 2),
+    }
+
+def match_feature_details(team_features, form_window):
+    """Elo-Rating und Form eines Teams aus der MatchFeatureEngine für die Detailansicht."""
+    if team_features is None:
+        return {}
+    return {
+        "Elo-Rating": round(team_features["Elo"]),
+        f"Form (Punkte aus den letzten {form_window} Spielen)": int(team_features["Form_Points"]),
+    }
+
+def data_snapshot_id(*frames):
+    """Kurze ID des geladenen Datenstands (Hash über den Inhalt der übergebenen DataFrames)."""
+    digest = hashlib.sha1()
+    for frame in frames:
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:12]
+
+def request_key(params):
+    """Hashbarer Schlüssel aus JSON-Body oder Query-Parametern einer Anfrage."""
+    if isinstance(params, dict):
+        return json.dumps(params, sort_keys=True, default=str)
+    return tuple(sorted(params.items(multi=True)))
+
+def parse_teams(value, all_teams):
+    """Teams aus dem Parameter "teams": "all", kommagetrennte Liste oder Liste von Namen."""
+    if isinstance(value, str):
+        return list(all_teams) if value == "all" else [t.strip() for t in value.split(",") if t.strip()]
+    if isinstance(value, list) and all(isinstance(team, str) for team in value):
+        return value
+    raise ValueError("'teams' muss \"all\", eine kommagetrennte Liste oder eine Liste von Teamnamen sein.")
 
-def create_app():
+def json_object_body():
+    """JSON-Body der Anfrage; ValueError, wenn er kein Objekt ist (None ohne gültigen JSON-Body)."""
+    body = request.get_json(silent=True)
+    if body is not None and not isinstance(body, dict):
+        raise ValueError("Der JSON-Body muss ein Objekt sein.")
+    return body
+
+def parse_optional_int(value, name):
+    """Wandelt einen optionalen Request-Parameter in int um (None bleibt None)."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Ungültiger Wert für '{name}': {value!r}")
+
+def create_app(start_watcher=True):
     """
     Initialisiert die Flask-Anwendung:
-      - Stellt die Verbindung zu MongoDB her und lädt die Liga-Daten.
-      - Lädt das aktuellste ML-Modell sowie den Skalierer aus Azure Blob Storage.
-      - Definiert Routen für den Haupt-Endpunkt ("/") und Vorhersagen ("/predict").
+      - Lädt Liga-Daten und Spiele aus der Datenquelle (DATA_SOURCE: MongoDB, CSV oder Parquet,
+        siehe data_source.py); ohne MONGODB_URI werden die Dateien in data/ verwendet.
+      - Lädt das aktuellste ML-Modell sowie den Skalierer aus Azure Blob Storage und
+        sucht im Hintergrund nach neueren Versionen (MODEL_POLL_INTERVAL Sekunden).
+      - Baut pro Modellversion einen Index der aktuellsten, bereits skalierten Tabellenzeile pro Team auf.
+      - Übernimmt neue Spieltage aus "league-tables" im laufenden Betrieb (LeagueFeed: Change
+        Streams oder Polling); Index und Feature-Frame werden dabei nur ergänzt.
+      - Simuliert die Restsaison auf Basis der "matches"-Collection (Monte Carlo) und
+        berechnet daraus Elo-Ratings und Form pro Team.
+      - Definiert Routen für den Haupt-Endpunkt ("/"), Vorhersagen ("/predict")
+        sowie Batch-Vorhersagen, Simulationen und Was-wäre-wenn-Szenarien als JSON
+        ("/api/predict", "/api/simulation", "/api/scenario")
+        und den Status der geladenen Modellversion ("/health", "/version").
+      - Liegt zur Modellversion ein Unsicherheits-Artefakt vor, werden die Wahrscheinlichkeiten
+        kalibriert und um ein Bootstrap-Intervall ergänzt (siehe uncertainty.py).
+      - Misst Start, einzelne Verarbeitungsschritte und Anfragen und stellt die Werte unter
+        "/metrics" im Prometheus-Textformat bereit (METRICS_ENABLED, PROFILE_SLOW_MS, siehe metrics.py).
+
+    Mit start_watcher=False werden die Hintergrund-Threads nicht gestartet (z. B. in wsgi.py, wo
+    die App vor dem Forken der Worker geladen wird und jeder Worker seine eigenen Threads startet).
     """
     app = Flask(__name__, template_folder="../frontend/templates", static_folder="../frontend/static")
+    metrics = Metrics()
+    stage = metrics.stage
+    app.config["METRICS"] = metrics
 
-    # MongoDB-Verbindung via Umgebungsvariable
-    mongodb_uri = os.getenv("MONGODB_URI")
-    if not mongodb_uri:
-        raise ValueError("MONGODB_URI nicht gesetzt!")
-    client = MongoClient(mongodb_uri)
-    db = client["mdm-project1"]
+    # Datenquelle via Umgebungsvariablen (MONGODB_URI, DATA_SOURCE, DATA_DIR)
+    source = data_source_from_env()
 
     def load_league_data():
         """
-        Lädt Liga-Daten aus der "league-tables"-Collection in MongoDB und bereitet den DataFrame vor.
+        Lädt die Liga-Features aus dem Feature-Store (data/features); neue Spieltage aus der
+        Datenquelle werden dabei inkrementell ergänzt.
+
+        Mit LEAGUE_DATA=latest wird nur die aktuellste Zeile pro Team geladen (weniger
+        Speicher, dafür keine historischen Tabellenstände in /api/predict).
         """
-        cursor = db["league-tables"].find()
-        df = pd.DataFrame(list(cursor))
-        if '_id' in df.columns:
-            df.drop('_id', axis=1, inplace=True)
-        numeric_cols = ['Spieltag', 'Rank', 'Spiele', 'G', 'U', 'V', 'Tore', 'Goal_Diff', 'Points']
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        df.fillna(-1, inplace=True)
-        df = df[df['Future'] == False].copy()
-        df['Restspiele'] = 38 - df['Spieltag']
-        df['Estimated_Extra_Points'] = df['Restspiele'] * 1.2
-        df['relegated'] = df['Rank'].apply(lambda x: 1 if x in [11, 12] else 0)
-        return df
-
-    league_df = load_league_data()
-    teams = league_df['Team'].unique().tolist()
-
-    # Laden von Modell und Skalierer aus Azure Blob Storage
-    model_path, scaler_path = download_model_and_scaler()
-    model = joblib.load(model_path)
-    scaler = joblib.load(scaler_path)
-    features = ['Points', 'Goal_Diff', 'G', 'U', 'V', 'Restspiele', 'Estimated_Extra_Points']
+        if os.getenv("LEAGUE_DATA", "store") == "latest":
+            return build_features(source.latest_rows())
+        return FeatureStore().refresh(source)
+
+    with metrics.startup("league_data"):
+        league_df = load_league_data()
+
+    # Monte-Carlo-Simulation der Restsaison; Teamstärken werden einmalig geschätzt
+    simulation_runs = int(os.getenv("SIMULATION_RUNS", "100000"))
+    simulation_seed = int(os.getenv("SIMULATION_SEED", "42"))
+    # Obergrenze für n_sims in /api/simulation, damit eine Anfrage keinen Worker lange blockiert
+    simulation_max_runs = int(os.getenv("SIMULATION_MAX_RUNS", "100000"))
+    with metrics.startup("matches"):
+        # Spielresultate inklusive noch nicht gespielter Partien
+        matches_df = source.matches()
+    strengths = None
+    simulation = None
+    if not matches_df.empty:
+        with metrics.startup("simulation"):
+            strengths = fit_team_strengths(split_matches(matches_df)[0])
+            simulation = simulate_season(matches_df, n_sims=simulation_runs, seed=simulation_seed, strengths=strengths)
+
+    # Elo-Ratings und Form pro Team aus den Spielresultaten (Stand nach dem letzten Spieltag)
+    match_engine = MatchFeatureEngine()
+    with metrics.startup("match_features"):
+        if not matches_df.empty:
+            match_engine.process(matches_df)
+        match_features = match_engine.latest()
 
+    # Alle Daten sind geladen; die Verbindung wird geschlossen, damit keine Sockets in
+    # geforkte Worker-Prozesse vererbt werden
+    source.close()
+
+    features = FEATURES
+
+    # Laden von Modell und Skalierer aus Azure Blob Storage; pro Version werden die aktuellste
+    # Zeile und der skalierte Feature-Vektor jedes Teams einmalig vorberechnet (bundle.extras)
+    model_store = ModelStore(
+        model_source_from_env(),
+        build_extras=lambda model, scaler: build_team_index(feed.state.league_df, scaler, features),
+    )
+
+    def scenario_engine(rows):
+        """Ausgangsstand und offene Partien der laufenden Saison für Was-wäre-wenn-Szenarien."""
+        return ScenarioEngine.from_data(rows, matches_df, features)
+
+    def apply_league_rows(state, new_rows):
+        """
+        Übernimmt neue oder korrigierte Tabellenzeilen aus dem LeagueFeed: Im Team-Index werden
+        nur die betroffenen Teams neu skaliert, im Feature-Frame ersetzen sie Zeilen mit gleichem
+        (Season, Spieltag, Team) oder werden angehängt; der Szenario-Ausgangsstand wird neu gebaut.
+        Läuft unter model_store.update_lock; zuerst wird das Bundle getauscht, danach der
+        Datenstand (Anfragen lesen erst feed.state, dann model_store.bundle).
+        """
+        bundle = model_store.update_extras(lambda b: b.extras.updated(new_rows, b.scaler, features))
+        league_df = upsert_rows(state.league_df, new_rows)
+        return LeagueState(league_df, extend_snapshot_id(state.data_id, new_rows), scenario_engine(bundle.extras.rows))
+
+    # Datenstand (Feature-Frame, Teams, Snapshot-ID, Szenarien); wird vom LeagueFeed ersetzt
+    initial_rows = {row["Team"]: row for row in latest_rows(league_df).to_dict(orient="records")}
+    feed = LeagueFeed(
+        LeagueState(league_df, data_snapshot_id(league_df, matches_df), scenario_engine(initial_rows)),
+        getattr(source, "connect_league_tables", None), apply_league_rows, lock=model_store.update_lock,
+        # Neue Spieltage kommen nur aus MongoDB; Dateiquellen bleiben bis zum Neustart unverändert
+        mode=LEAGUE_FEED if source.name == "mongo" else "off",
+    )
+    del league_df, initial_rows
+    app.config["LEAGUE_FEED"] = feed
+
+    with metrics.startup("model"):
+        model_store.load_latest()
+    if start_watcher:
+        model_store.start_watcher(float(os.getenv("MODEL_POLL_INTERVAL", "300")))
+        feed.start()
+    app.config["MODEL_STORE"] = model_store
+
+    # Zwischenspeicher für Seiten und Vorhersagen; gültig pro (Daten-Snapshot, Modellversion)
+    response_cache = ResponseCache()
+    app.config["RESPONSE_CACHE"] = response_cache
+
+    def cached(key, state, bundle, create):
+        generation = (state.data_id, bundle.version)
+        last_modified = max(state.loaded_at, bundle.loaded_at)
+        return response_cache.respond(request, key + generation, generation, last_modified, create)
+
+    # Jede Anfrage liest zuerst feed.state und danach model_store.bundle (ohne Sperre)
     @app.route("/")
     def index():
-        return render_template("index.html", teams=teams)
+        state, bundle = feed.state, model_store.bundle
+        return cached(("index",), state, bundle, lambda: render_index(teams=state.teams))
+
+    def render_index(**context):
+        with stage("render_template"):
+            return render_template("index.html", **context)
 
     @app.route("/predict", methods=["POST"])
     def predict():
         selected_team = request.form.get("team")
+        state, bundle = feed.state, model_store.bundle
+        return cached(("predict", selected_team), state, bundle, lambda: render_prediction(selected_team, state, bundle))
+
+    def render_prediction(selected_team, state, bundle):
         error_message = None
         prediction = None
         details = {}
         try:
-            team_data = league_df[league_df['Team'] == selected_team]
-            if team_data.empty:
+            with stage("team_lookup"):
+                entry = bundle.extras.get(selected_team)
+            if entry is None:
                 raise ValueError("Team nicht gefunden.")
-            team_data = team_data.sort_values(by="Spieltag", ascending=False).iloc[0]
-            X_input = team_data[features].values.reshape(1, -1)
-            X_scaled = scaler.transform(X_input)
-            prob = model.predict_proba(X_scaled)[0][1]
-            prediction = f"Die Wahrscheinlichkeit, dass {selected_team} absteigt, beträgt {prob*100:.2f}%."
-            details["Aktuelle Punkte"] = team_data["Points"]
-            details["Aktueller Rank"] = team_data["Rank"]
-            details["Restspiele"] = team_data["Restspiele"]
-            details["Geschätzte Extra-Punkte"] = team_data["Estimated_Extra_Points"]
-            details["Aktueller Spieltag"] = team_data["Spieltag"]
-            details["Simulation letzte 5 Spiele"] = "Noch in Arbeit"
+            team_data, X_scaled = entry
+            with stage("predict_proba"):
+                prob = bundle.model.predict_proba(X_scaled)[0][1]
+            interval = ""
+            if bundle.uncertainty is not None:
+                with stage("uncertainty"):
+                    calibrated, low, high = bundle.uncertainty.predict([prob], bundle.extras.raw([selected_team]))
+                prob = calibrated[0]
+                interval = f" ({bundle.uncertainty.level*100:.0f}%-Intervall: {low[0]*100:.1f}% bis {high[0]*100:.1f}%)"
+            prediction = f"Die Wahrscheinlichkeit, dass {selected_team} absteigt, beträgt {prob*100:.2f}%{interval}."
+            details.update(build_details(team_data))
+            details.update(match_feature_details(match_features.get(selected_team), match_engine.form_window))
+            details.update(simulation_details(simulation.team(selected_team) if simulation else None))
         except Exception as e:
             error_message = f"Fehler: {str(e)}"
-        return render_template("index.html", teams=teams, prediction=prediction, error_message=error_message, details=details)
+        return render_index(teams=state.teams, prediction=prediction, error_message=error_message, details=details)
+
+    @app.route("/api/predict", methods=["GET", "POST"])
+    def api_predict():
+        """
+        Batch-Vorhersage für mehrere Teams in einem einzigen Modellaufruf.
+
+        Parameter (JSON-Body oder Query-String):
+          - teams: Liste von Teams, kommagetrennte Liste oder "all" (Standard: "all").
+          - season, spieltag: optionaler Tabellenstand; ohne Angabe wird der aktuellste verwendet.
+        """
+        try:
+            params = json_object_body() or request.args
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        state, bundle = feed.state, model_store.bundle
+        return cached(("api_predict", request_key(params)), state, bundle, lambda: batch_prediction(params, state, bundle))
+
+    def batch_prediction(params, state, bundle):
+        try:
+            season = parse_optional_int(params.get("season"), "season")
+            spieltag = parse_optional_int(params.get("spieltag"), "spieltag")
+            if season is None and spieltag is None:
+                index = bundle.extras
+            else:
+                # Ein Feature-Vektor pro Team, ein scaler.transform für den gesamten Tabellenstand
+                with stage("snapshot_filter"):
+                    rows = snapshot_rows(state.league_df, season, spieltag)
+                with stage("scaler_transform"):
+                    index = build_team_index(rows, bundle.scaler, features)
+                if len(index) == 0:
+                    raise LookupError(f"Kein Tabellenstand für Saison {season}, Spieltag {spieltag} gefunden.")
+
+            requested = parse_teams(params.get("teams", "all"), index.teams)
+            unknown = [team for team in requested if team not in index]
+            if unknown:
+                raise LookupError(f"Team nicht gefunden: {', '.join(map(str, unknown))}")
+
+            with stage("predict_proba"):
+                probs = index.predict_proba(bundle.model, requested)
+            if bundle.uncertainty is not None:
+                # Kalibrierung und Intervalle aller angefragten Teams in einer Matrixoperation
+                with stage("uncertainty"):
+                    calibrated, low, high = bundle.uncertainty.predict(probs, index.raw(requested))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 404
+
+        predictions = [
+            {"team": team, "probability": float(prob), "details": build_details(index.rows[team])}
+            for team, prob in zip(requested, probs)
+        ]
+        if bundle.uncertainty is not None:
+            level = bundle.uncertainty.level
+            for prediction, raw, prob, lo, hi in zip(predictions, probs, calibrated, low, high):
+                prediction["probability"] = float(prob)
+                prediction["uncalibrated_probability"] = float(raw)
+                prediction["interval"] = {"low": float(lo), "high": float(hi), "level": level}
+        return jsonify({
+            "season": season, "spieltag": spieltag, "model_version": bundle.version, "predictions": predictions,
+        })
+
+    @app.route("/api/scenario", methods=["GET", "POST"])
+    def api_scenario():
+        """
+        Was-wäre-wenn-Szenario für die offenen Partien der laufenden Saison.
+
+        GET liefert die offenen Partien. POST erwartet {"results": [...]} mit je home_goals,
+        away_goals und fixture (Index aus GET) oder home_team/away_team; zurück kommen die
+        Wahrscheinlichkeiten aller Teams vor und nach dem Szenario samt neuem Tabellenstand
+        (kalibriert und mit Intervall wie /api/predict, falls ein Unsicherheits-Artefakt vorliegt).
+        Identische Szenarien werden aus dem Antwort-Cache bedient.
+        """
+        state, bundle = feed.state, model_store.bundle
+        scenarios = state.extras
+        if request.method == "GET":
+            return jsonify({"fixtures": scenarios.fixture_list()})
+        try:
+            params = json_object_body() or {}
+            scenario = scenarios.parse(params.get("results"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 404
+        return cached(("api_scenario", scenario.key), state, bundle, lambda: scenario_prediction(scenarios, scenario, bundle))
+
+    def scenario_prediction(scenarios, scenario, bundle):
+        with stage("scenario_evaluate"):
+            table, before, after, interval = scenarios.evaluate(scenario, bundle.model, bundle.scaler, bundle.uncertainty)
+        fixtures = scenarios.fixture_list()
+        results = [
+            dict(fixtures[fixture], home_goals=home_goals, away_goals=away_goals)
+            for fixture, home_goals, away_goals in scenario.key
+        ]
+        predictions = []
+        for pos in map(int, table["Rank"].argsort()):
+            team_data = {col: values[pos].item() for col, values in table.items()}
+            for col in ["Points", "Rank", "Restspiele", "Spieltag"]:
+                team_data[col] = int(team_data[col])
+            prediction = {
+                "team": scenarios.teams[pos],
+                "probability": float(after[pos]),
+                "baseline_probability": float(before[pos]),
+                "details": build_details(team_data),
+            }
+            if interval is not None:
+                # Kalibriert wie /api/predict; Intervall für den Stand nach dem Szenario
+                uncalibrated, low, high = interval
+                prediction["uncalibrated_probability"] = float(uncalibrated[pos])
+                prediction["interval"] = {"low": float(low[pos]), "high": float(high[pos]), "level": bundle.uncertainty.level}
+            predictions.append(prediction)
+        return jsonify({"model_version": bundle.version, "results": results, "predictions": predictions})
+
+    @app.route("/api/simulation", methods=["GET"])
+    def api_simulation():
+        """
+        Monte-Carlo-Simulation der Restsaison als JSON.
+
+        Ohne Parameter wird das beim Start berechnete Ergebnis geliefert. Mit n_sims (höchstens
+        SIMULATION_MAX_RUNS), seed oder season wird die Simulation mit den bereits geschätzten
+        Teamstärken neu gerechnet; das Ergebnis wird pro (season, n_sims, seed) zwischengespeichert.
+        """
+        if simulation is None:
+            return jsonify({"error": "Keine Spieldaten vorhanden."}), 404
+        try:
+            n_sims = parse_optional_int(request.args.get("n_sims"), "n_sims")
+            seed = parse_optional_int(request.args.get("seed"), "seed")
+            season = parse_optional_int(request.args.get("season"), "season")
+            if n_sims is not None and not 1 <= n_sims <= simulation_max_runs:
+                raise ValueError(f"n_sims muss zwischen 1 und {simulation_max_runs} liegen.")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if n_sims is None and seed is None and season is None:
+            return jsonify(simulation.to_dict())
+        n_sims = n_sims or simulation_runs
+        seed = simulation_seed if seed is None else seed
+        state, bundle = feed.state, model_store.bundle
+        return cached(("api_simulation", season, n_sims, seed), state, bundle,
+                      lambda: run_simulation(season, n_sims, seed))
+
+    def run_simulation(season, n_sims, seed):
+        with stage("simulation"):
+            result = simulate_season(matches_df, season=season, n_sims=n_sims, seed=seed, strengths=strengths)
+        return jsonify(result.to_dict())
+
+    @app.route("/version", methods=["GET"])
+    def version():
+        bundle = model_store.bundle
+        return jsonify({"model_version": bundle.version, "loaded_at": bundle.loaded_at.isoformat()})
+
+    @app.route("/health", methods=["GET"])
+    def health():
+        state, bundle = feed.state, model_store.bundle
+        return jsonify({
+            "status": "ok",
+            "model_version": bundle.version,
+            "model_loaded_at": bundle.loaded_at.isoformat(),
+            "model_load_timings": bundle.timings,
+            "data_snapshot_id": state.data_id,
+            "league_feed": feed.summary(),
+            "response_cache": response_cache.summary(),
+            "teams": len(bundle.extras),
+            "uncertainty": bundle.uncertainty.summary() if bundle.uncertainty is not None else None,
+        })
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics_endpoint():
+        """Zähler und Histogramme dieses Worker-Prozesses im Prometheus-Textformat."""
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    # Werte, die erst beim Abruf von /metrics gelesen werden
+    metrics.collect("model_version", "gauge", "Geladene Modellversion.", lambda: model_store.bundle.version)
+    metrics.collect("model_load_seconds", "gauge", "Dauer der Phasen beim Laden der aktuellen Modellversion.", lambda: [
+        ({"phase": phase}, value) for phase, value in model_store.bundle.timings.items()
+        if isinstance(value, float)
+    ])
+    metrics.collect("model_age_seconds", "gauge", "Sekunden seit dem Laden der aktuellen Modellversion.",
+                    lambda: (datetime.now(timezone.utc) - model_store.bundle.loaded_at).total_seconds())
+    metrics.collect("data_snapshot_age_seconds", "gauge", "Sekunden seit dem letzten Wechsel des Datenstands.",
+                    lambda: (datetime.now(timezone.utc) - feed.state.loaded_at).total_seconds())
+    metrics.collect("teams", "gauge", "Teams im Index der aktuellen Modellversion.", lambda: len(model_store.bundle.extras))
+    metrics.collect("response_cache_total", "counter", "Ereignisse des Antwort-Caches.", lambda: [
+        ({"event": event}, count) for event, count in response_cache.stats.items()
+    ])
+    metrics.collect("response_cache_entries", "gauge", "Einträge im Antwort-Cache.", lambda: len(response_cache))
+    metrics.collect("league_feed_total", "counter", "Übernommene Aktualisierungen, Zeilen und Fehler des LeagueFeed.", lambda: [
+        ({"event": event}, feed.stats[event]) for event in ["updates", "rows", "errors"]
+    ])
+    metrics.collect("league_feed_visible_seconds", "gauge", "Letzte Verzögerung bis zur Sichtbarkeit neuer Spieltage.", lambda: [
+        ({"since": "write"}, feed.write_to_visible.last), ({"since": "detect"}, feed.detect_to_visible.last),
+    ])
 
+    instrument(app, metrics, SlowRequestProfiler())
     return app
 
 if __name__ == "__main__":
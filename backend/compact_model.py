@@ -0,0 +1,205 @@
+"""
+compact_model.py – Kompaktes Inferenz-Artefakt für Modell und Skalierer
+------------------------------------------------------------------------
+Statt des gepickelten sklearn-Modells wird eine einzelne Binärdatei mit reinen NumPy-Arrays
+abgelegt (model-<n>.compact). Sie wird per np.memmap geöffnet: Laden kostet nur das Lesen des
+Headers, und alle Worker-Prozesse teilen sich die Seiten über den Page-Cache.
+
+Unterstützte Modelle:
+  - linear: LogisticRegression (binär). Koeffizienten und Achsenabschnitt werden mit Mittelwert
+    und Skalierung des StandardScaler verrechnet; die Vorhersage arbeitet direkt auf den
+    unskalierten Features.
+  - forest: RandomForestClassifier bzw. DecisionTreeClassifier. Alle Bäume werden zu flachen
+    Knoten-Arrays (linkes/rechtes Kind, Feature, Schwellenwert, Anteil der positiven Klasse)
+    zusammengefasst und für alle Zeilen und Bäume gleichzeitig Ebene für Ebene durchlaufen.
+    Wie in sklearn wird auf float32-skalierten Features verglichen.
+Andere Modelle (z. B. SVC) werden nicht exportiert; dann bleibt das joblib-Artefakt maßgeblich.
+
+Dateiformat: MAGIC, 8 Byte Header-Länge (little endian), JSON-Header mit Art und Array-
+Beschreibungen (dtype, shape, offset), danach die Arrays, jeweils auf 64 Byte ausgerichtet.
+"""
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+MAGIC = b"SLPCMP1\n"
+ALIGNMENT = 64
+# Maximale Abweichung zu predict_proba, die beim Export geprüft wird
+EXPORT_TOLERANCE = 1e-6
+
+
+def write_arrays(path, kind, arrays, **meta):
+    """Schreibt die Arrays (Dictionary Name -> ndarray) samt Metadaten in eine Datei (atomar)."""
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    descriptions = {}
+    offset = 0
+    for name, array in arrays.items():
+        descriptions[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({"kind": kind, "arrays": descriptions, "meta": meta}).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+            for name, array in arrays.items():
+                f.seek(data_start + descriptions[name]["offset"])
+                f.write(array.tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_arrays(path):
+    """Öffnet eine Datei aus write_arrays; gibt (kind, Arrays als np.memmap, meta) zurück."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' ist kein kompaktes Modell-Artefakt!")
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length))
+    data_start = -(-(len(MAGIC) + 8 + length) // ALIGNMENT) * ALIGNMENT
+    arrays = {}
+    for name, desc in header["arrays"].items():
+        shape = tuple(desc["shape"])
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=desc["dtype"])
+            continue
+        arrays[name] = np.memmap(path, dtype=desc["dtype"], mode="r", offset=data_start + desc["offset"], shape=shape)
+    return header["kind"], arrays, header["meta"]
+
+
+class IdentityScaler:
+    """Platzhalter-Skalierer, wenn die Skalierung bereits im Modell verrechnet ist."""
+
+    def transform(self, X):
+        return np.asarray(X, dtype=np.float64)
+
+
+class CompactScaler:
+    """StandardScaler-Ersatz: (X - mean) / scale."""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class CompactLinearModel:
+    """Logistische Regression mit verrechneter Skalierung; predict_proba wie in sklearn."""
+
+    def __init__(self, coef, intercept):
+        self.coef = coef
+        self.intercept = float(intercept)
+
+    def predict_proba(self, X):
+        logit = np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+        positive = 1.0 / (1.0 + np.exp(-logit))
+        return np.column_stack([1.0 - positive, positive])
+
+
+class CompactForest:
+    """Ensemble flacher Entscheidungsbäume; roots enthält den Wurzelknoten jedes Baums."""
+
+    def __init__(self, roots, left, right, feature, threshold, positive, depth):
+        self.roots = roots
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.positive = positive
+        self.depth = int(depth)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.depth):
+            left = self.left[node]
+            inner = left >= 0
+            if not inner.any():
+                break
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(inner, np.where(go_left, left, self.right[node]), node)
+        positive = self.positive[node].mean(axis=1)
+        return np.column_stack([1.0 - positive, positive])
+
+
+def _forest_arrays(model, positive_class):
+    trees = [est.tree_ for est in getattr(model, "estimators_", [model])]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+    left, right, feature, threshold, positive = [], [], [], [], []
+    for offset, tree in zip(offsets, trees):
+        is_leaf = tree.children_left < 0
+        left.append(np.where(is_leaf, -1, tree.children_left + offset))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset))
+        # Blätter erhalten Feature 0, damit der Index beim Durchlaufen gültig bleibt
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        value = tree.value[:, 0, :]
+        positive.append(value[:, positive_class] / value.sum(axis=1))
+    return {
+        "roots": offsets.astype(np.int64),
+        "left": np.concatenate(left).astype(np.int64),
+        "right": np.concatenate(right).astype(np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "positive": np.concatenate(positive).astype(np.float64),
+    }, max(tree.max_depth for tree in trees)
+
+
+def export_compact(model, scaler, path, X_check=None):
+    """
+    Schreibt das kompakte Artefakt für model und scaler (StandardScaler) nach path.
+
+    Mit X_check (unskalierte Features) wird geprüft, dass die Wahrscheinlichkeiten höchstens
+    EXPORT_TOLERANCE von model.predict_proba abweichen. Nicht unterstützte Modelle lösen
+    einen ValueError aus.
+    """
+    classes = list(getattr(model, "classes_", []))
+    if len(classes) != 2:
+        raise ValueError("Nur binäre Klassifikatoren werden unterstützt!")
+    name = type(model).__name__
+    mean = np.asarray(scaler.mean_, dtype=np.float64)
+    scale = np.asarray(scaler.scale_, dtype=np.float64)
+    if name == "LogisticRegression":
+        coef = np.asarray(model.coef_, dtype=np.float64)[0]
+        folded = coef / scale
+        intercept = float(model.intercept_[0]) - float(folded @ mean)
+        write_arrays(path, "linear", {"coef": folded, "intercept": np.array([intercept])}, model=name)
+    elif name in ("RandomForestClassifier", "DecisionTreeClassifier"):
+        arrays, depth = _forest_arrays(model, classes.index(1) if 1 in classes else 1)
+        arrays.update(mean=mean, scale=scale)
+        write_arrays(path, "forest", arrays, model=name, depth=depth)
+    else:
+        raise ValueError(f"Kein kompakter Export für {name} verfügbar!")
+
+    if X_check is not None:
+        compact_model, compact_scaler = load_compact(path)
+        expected = model.predict_proba(scaler.transform(X_check))[:, 1]
+        actual = compact_model.predict_proba(compact_scaler.transform(X_check))[:, 1]
+        deviation = float(np.max(np.abs(expected - actual))) if len(expected) else 0.0
+        if deviation > EXPORT_TOLERANCE:
+            os.remove(path)
+            raise ValueError(f"Kompaktes Modell weicht um {deviation:.2e} von predict_proba ab!")
+    return path
+
+
+def load_compact(path):
+    """Lädt ein kompaktes Artefakt als (model, scaler) mit transform bzw. predict_proba wie in sklearn."""
+    kind, arrays, meta = read_arrays(path)
+    if kind == "linear":
+        return CompactLinearModel(arrays["coef"], arrays["intercept"][0]), IdentityScaler()
+    if kind == "forest":
+        model = CompactForest(arrays["roots"], arrays["left"], arrays["right"], arrays["feature"],
+                              arrays["threshold"], arrays["positive"], meta["depth"])
+        return model, CompactScaler(arrays["mean"], arrays["scale"])
+    raise ValueError(f"Unbekannte Artefakt-Art '{kind}'!")
@@ -0,0 +1,263 @@
+"""
+data_source.py – Austauschbare Datenquellen für Liga-Tabellen und Spielresultate
+---------------------------------------------------------------------------------
+Backend, Training und Backtest laden ihre Rohdaten über eine Datenquelle mit einheitlicher
+Schnittstelle:
+  - league_table(after=None):  gespielte Tabellenzeilen, optional nur nach (Season, Spieltag),
+  - latest_rows():             aktuellste gespielte Zeile pro Team,
+  - matches():                 alle Partien der "matches"-Collection (auch noch nicht gespielte),
+  - close(),
+  - name und location:         Art und Ort der Quelle (Host/Datenbank bzw. Datei), z. B. für das
+                               Manifest des Feature-Stores.
+
+Implementierungen:
+  - MongoDataSource:   "league-tables" und "matches" in MongoDB (MONGODB_URI),
+  - CsvDataSource:     data/df_league_table_raw.csv und data/df_matches_raw.csv (Export des Spiders),
+  - ParquetDataSource: kompakte Umwandlung der CSV-Dateien (league_table.parquet, matches.parquet).
+
+Alle Quellen liefern dieselben schmalen Typen: Team- und Datumsspalten kategorial, Spieltag,
+Rang und Spielzahlen als int8, Season, Punkte und Tore als int16, Tore ("3:0") zerlegt in
+Goals_For und Goals_Against; fehlende Werte sind -1. DATA_SOURCE wählt die Quelle (auto,
+mongo, csv, parquet); auto verwendet MongoDB, falls MONGODB_URI gesetzt ist, sonst Parquet
+und zuletzt CSV aus DATA_DIR.
+
+Aufruf (CSV nach Parquet umwandeln):
+    python backend/data_source.py
+    python backend/data_source.py --input data --output /tmp/daten
+"""
+import argparse
+import os
+from abc import ABC, abstractmethod
+from urllib.parse import urlsplit
+
+import pandas as pd
+from pymongo import MongoClient
+
+from league_data import league_query, load_latest_rows, load_league_table, split_goals
+
+DATA_SOURCE = os.getenv("DATA_SOURCE", "auto")  # auto, mongo, csv oder parquet
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+DATABASE = "mdm-project1"
+
+LEAGUE_CSV = "df_league_table_raw.csv"
+MATCHES_CSV = "df_matches_raw.csv"
+LEAGUE_PARQUET = "league_table.parquet"
+MATCHES_PARQUET = "matches.parquet"
+
+LEAGUE_DTYPES = {
+    "Season": "int16", "Spieltag": "int8", "Future": "bool", "Rank": "int8", "Team": "category",
+    "Spiele": "int8", "G": "int8", "U": "int8", "V": "int8",
+    "Goals_For": "int16", "Goals_Against": "int16", "Goal_Diff": "int16", "Points": "int16",
+}
+MATCH_DTYPES = {
+    "Season": "int16", "Spieltag": "int8", "date": "category", "time": "category",
+    "home_rank": "int8", "home_team": "category", "home_goals": "int8",
+    "away_goals": "int8", "away_rank": "int8", "away_team": "category",
+}
+
+
+def _typed(df, dtypes):
+    """Spalten in die Zieltypen umwandeln; fehlende numerische Werte werden zu -1."""
+    columns = {}
+    for column, dtype in dtypes.items():
+        values = df[column] if column in df.columns else pd.Series([None] * len(df), dtype=object)
+        if dtype == "category":
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype(str).where(values.notna()).astype("category")
+            columns[column] = values
+        elif dtype == "bool":
+            if values.dtype != bool:
+                values = values.astype(str).str.lower() == "true"
+            columns[column] = values.to_numpy()
+        else:
+            columns[column] = pd.to_numeric(values, errors="coerce").fillna(-1).astype(dtype)
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(df)))
+
+
+def narrow_league_table(df):
+    """Rohzeilen der "league-tables"-Collection (Tore als Text) in schmale Typen umwandeln."""
+    df = df.reset_index(drop=True)
+    if "Tore" in df.columns:
+        df = df.drop(columns="Tore").assign(**dict(zip(["Goals_For", "Goals_Against"], split_goals(df["Tore"]))))
+    return _typed(df, LEAGUE_DTYPES)
+
+
+def narrow_matches(df):
+    """Partien der "matches"-Collection in schmale Typen umwandeln."""
+    return _typed(df.reset_index(drop=True), MATCH_DTYPES)
+
+
+def _after(df, after):
+    """Zeilen nach (Season, Spieltag) wie league_query(after=...)."""
+    if after is None:
+        return df
+    season, spieltag = after
+    later = (df["Season"] > season) | ((df["Season"] == season) & (df["Spieltag"] > spieltag))
+    return df[later.to_numpy()].reset_index(drop=True)
+
+
+class MongoDataSource:
+    """Liga-Tabellen und Spiele aus MongoDB; Filter und Projektion laufen serverseitig."""
+
+    name = "mongo"
+
+    def __init__(self, uri, database=DATABASE):
+        self.uri = uri
+        self.database = database
+        self.client = MongoClient(uri)
+        self.db = self.client[database]
+
+    @property
+    def location(self):
+        # Host(s) und Datenbank ohne Zugangsdaten aus der URI
+        parts = urlsplit(self.uri)
+        return f"{parts.scheme}://{parts.netloc.rsplit('@', 1)[-1]}/{self.database}"
+
+    def league_table(self, after=None):
+        return narrow_league_table(load_league_table(self.db["league-tables"], league_query(after=after)))
+
+    def latest_rows(self):
+        return narrow_league_table(load_latest_rows(self.db["league-tables"]))
+
+    def matches(self):
+        return narrow_matches(pd.DataFrame(list(self.db["matches"].find({}, {"_id": 0}))))
+
+    def connect_league_tables(self):
+        """Eigene Verbindung für Hintergrund-Threads (z. B. LeagueFeed); gibt (client, collection) zurück."""
+        client = MongoClient(self.uri)
+        return client, client[self.database]["league-tables"]
+
+    def close(self):
+        self.client.close()
+
+
+class FileDataSource(ABC):
+    """
+    Gemeinsame Logik der dateibasierten Quellen; die Dateien werden einmal gelesen.
+    Unterklassen setzen name, league_file und matches_file und lesen die Dateien ein.
+    """
+
+    name = None
+    league_file = None
+    matches_file = None
+
+    def __init__(self, directory=DATA_DIR):
+        self.directory = directory
+        self._league = None
+
+    @property
+    def location(self):
+        return os.path.abspath(os.path.join(self.directory, self.league_file))
+
+    @abstractmethod
+    def _read_league(self, path):
+        """Tabellenzeilen aus path in den schmalen Typen von narrow_league_table."""
+
+    @abstractmethod
+    def _read_matches(self, path):
+        """Partien aus path in den schmalen Typen von narrow_matches."""
+
+    def _played(self):
+        if self._league is None:
+            league = self._read_league(os.path.join(self.directory, self.league_file))
+            self._league = league[~league["Future"].to_numpy()].reset_index(drop=True)
+        return self._league
+
+    def league_table(self, after=None):
+        return _after(self._played(), after)
+
+    def latest_rows(self):
+        league = self._played().sort_values(["Season", "Spieltag"], kind="stable")
+        return league.drop_duplicates("Team", keep="last").reset_index(drop=True)
+
+    def matches(self):
+        path = os.path.join(self.directory, self.matches_file)
+        if not os.path.exists(path):
+            return narrow_matches(pd.DataFrame(columns=list(MATCH_DTYPES)))
+        return self._read_matches(path)
+
+    def close(self):
+        self._league = None
+
+
+class CsvDataSource(FileDataSource):
+    """CSV-Export des Spiders (--export-csv); Tore werden beim Lesen zerlegt."""
+
+    name = "csv"
+    league_file = LEAGUE_CSV
+    matches_file = MATCHES_CSV
+
+    def _read_league(self, path):
+        return narrow_league_table(pd.read_csv(path, dtype={"Team": "category", "Tore": object}))
+
+    def _read_matches(self, path):
+        return narrow_matches(pd.read_csv(path, dtype={col: "category" for col in ["date", "time", "home_team", "away_team"]}))
+
+
+class ParquetDataSource(FileDataSource):
+    """Mit convert_csv_to_parquet erzeugte Dateien; die Typen sind bereits gespeichert."""
+
+    name = "parquet"
+    league_file = LEAGUE_PARQUET
+    matches_file = MATCHES_PARQUET
+
+    def _read_league(self, path):
+        return pd.read_parquet(path)
+
+    def _read_matches(self, path):
+        return pd.read_parquet(path)
+
+
+def convert_csv_to_parquet(input_dir=DATA_DIR, output_dir=DATA_DIR):
+    """Wandelt beide CSV-Dateien in schmal typisierte Parquet-Dateien um; gibt die Pfade zurück."""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for csv_name, parquet_name, narrow in [
+        (LEAGUE_CSV, LEAGUE_PARQUET, narrow_league_table),
+        (MATCHES_CSV, MATCHES_PARQUET, narrow_matches),
+    ]:
+        df = narrow(pd.read_csv(os.path.join(input_dir, csv_name), dtype=object))
+        path = os.path.join(output_dir, parquet_name)
+        df.to_parquet(path, index=False, compression="zstd")
+        paths.append(path)
+    return paths
+
+
+def data_source_from_env():
+    """Datenquelle gemäß DATA_SOURCE (auto: MongoDB, falls MONGODB_URI gesetzt ist, sonst Dateien in DATA_DIR)."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    mode = DATA_SOURCE
+    if mode == "auto":
+        if mongodb_uri:
+            mode = "mongo"
+        elif os.path.exists(os.path.join(DATA_DIR, LEAGUE_PARQUET)):
+            mode = "parquet"
+        elif os.path.exists(os.path.join(DATA_DIR, LEAGUE_CSV)):
+            mode = "csv"
+        else:
+            raise ValueError(f"MONGODB_URI nicht gesetzt und keine Daten in {DATA_DIR} gefunden!")
+    if mode == "mongo":
+        if not mongodb_uri:
+            raise ValueError("MONGODB_URI nicht gesetzt!")
+        return MongoDataSource(mongodb_uri)
+    if mode == "csv":
+        return CsvDataSource(DATA_DIR)
+    if mode == "parquet":
+        return ParquetDataSource(DATA_DIR)
+    raise ValueError(f"Unbekannte Datenquelle DATA_SOURCE={mode!r} (auto, mongo, csv oder parquet).")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV-Export des Spiders in Parquet umwandeln.")
+    parser.add_argument("--input", default=DATA_DIR, help="Ordner mit den CSV-Dateien")
+    parser.add_argument("--output", default=DATA_DIR, help="Zielordner der Parquet-Dateien")
+    args = parser.parse_args(argv)
+
+    for path in convert_csv_to_parquet(args.input, args.output):
+        df = pd.read_parquet(path)
+        print(f"{path}: {len(df)} Zeilen, {os.path.getsize(path) / 1024:.1f} KB, "
+              f"{df.memory_usage(deep=True).sum() / 1024:.1f} KB im Speicher")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+features.py – Gemeinsame Feature-Berechnung und versionierter Feature-Store
+----------------------------------------------------------------------------
+Backend (app.py) und Training (model/model_generator.py) verwenden dieselben Features aus der
+"league-tables"-Collection. build_features berechnet sie spaltenweise (vektorisiert):
+  - numerische Spalten (pd.to_numeric, danach int64), fehlende Werte = -1,
+  - Tore ("3:0") zerlegt in Goals_For und Goals_Against,
+  - nur bereits gespielte Spieltage (Future == False),
+  - Restspiele, Estimated_Extra_Points und die Zielvariable relegated (Rang 11 oder 12).
+
+Der FeatureStore legt das Ergebnis als Arrow-IPC-Datei (Feather v2, unkomprimiert und damit
+per Memory-Map lesbar) unter <directory>/league_features-<n>.arrow ab. manifest.json verweist
+auf die aktuelle Version, den zuletzt enthaltenen Spieltag (high_water) und die Datenquelle
+(Name und Ort). refresh lädt aus der Datenquelle nur Zeilen ab diesem Spieltag (bei MongoDB
+projiziert und serverseitig gefiltert, siehe league_data.py). Der Spieltag high_water wird
+erneut gelesen, falls er erst teilweise geschrieben war, und seine Zeilen ersetzen die
+gespeicherten (Upsert nach Team); neue Spieltage werden angehängt und als neue Version
+geschrieben. Ohne Änderungen wird die vorhandene Datei direkt geladen. Als Datenquelle dient
+MongoDB, CSV oder Parquet (data_source.py). Fehlen im gespeicherten Store Spalten des aktuellen
+Schemas oder stammt er aus einer anderen Datenquelle, wird er neu aufgebaut.
+
+Aufruf (z.B. nach einer Korrektur bereits gespeicherter Spieltage):
+    python backend/features.py --rebuild
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from league_data import split_goals
+
+SEASON_LENGTH = 38
+EXTRA_POINTS_PER_GAME = 1.2
+RELEGATION_RANKS = [11, 12]
+
+NUMERIC_COLS = ['Spieltag', 'Rank', 'Spiele', 'G', 'U', 'V', 'Goals_For', 'Goals_Against', 'Goal_Diff', 'Points']
+FEATURES = ['Points', 'Goal_Diff', 'G', 'U', 'V', 'Restspiele', 'Estimated_Extra_Points']
+
+FEATURE_STORE_DIR = os.getenv(
+    "FEATURE_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "features")
+)
+# Anzahl älterer Versionen, die beim Schreiben einer neuen Version erhalten bleiben
+FEATURE_STORE_KEEP = int(os.getenv("FEATURE_STORE_KEEP", "3"))
+
+
+def build_features(df):
+    """
+    Berechnet die Modell-Features aus Rohdokumenten der "league-tables"-Collection (mit Tore
+    als Text) oder aus einer typisierten Tabelle (data_source.narrow_league_table).
+    Gibt nur abgeschlossene Spieltage zurück (Future == False).
+    """
+    df = df.drop(columns=['_id'], errors='ignore').copy()
+    if 'Tore' in df.columns:
+        df['Goals_For'], df['Goals_Against'] = split_goals(df.pop('Tore'))
+    # Teams als Text (auch aus kategorialen Spalten), damit angehängte Blöcke zum Schema passen
+    df['Team'] = df['Team'].astype(str)
+    df[NUMERIC_COLS] = df[NUMERIC_COLS].apply(pd.to_numeric, errors='coerce')
+    df.fillna(-1, inplace=True)
+    # Feste Ganzzahl-Typen, damit inkrementell angehängte Blöcke zum gespeicherten Schema passen
+    df[['Season'] + NUMERIC_COLS] = df[['Season'] + NUMERIC_COLS].astype('int64')
+    df = df[df['Future'] == False].copy()
+    df['Restspiele'] = SEASON_LENGTH - df['Spieltag']
+    df['Estimated_Extra_Points'] = df['Restspiele'] * EXTRA_POINTS_PER_GAME
+    df['relegated'] = df['Rank'].isin(RELEGATION_RANKS).astype(int)
+    return df.reset_index(drop=True)
+
+
+def high_water_mark(df):
+    """Letzter enthaltener (Season, Spieltag) oder None für einen leeren DataFrame."""
+    if df.empty:
+        return None
+    last = df.sort_values(['Season', 'Spieltag']).iloc[-1]
+    return [int(last['Season']), int(last['Spieltag'])]
+
+
+def source_identity(source):
+    """Name und Ort einer Datenquelle, wie sie im Manifest gespeichert werden."""
+    return {"name": source.name, "location": source.location}
+
+
+def changed_rows(existing, new_features, high_water):
+    """
+    Neue oder geänderte Zeilen aus new_features (ab dem Spieltag high_water geladen):
+    Zeilen dieses Spieltags, die mit der gespeicherten Zeile desselben Teams übereinstimmen,
+    entfallen; alle übrigen werden zurückgegeben.
+    """
+    stored_mark = ((existing["Season"] == high_water[0]) & (existing["Spieltag"] == high_water[1])).to_numpy()
+    new_mark = ((new_features["Season"] == high_water[0]) & (new_features["Spieltag"] == high_water[1])).to_numpy()
+    stored = existing[stored_mark].drop_duplicates("Team", keep="last").set_index("Team")
+    reread = new_features[new_mark].set_index("Team")
+    common = reread.index.intersection(stored.index)
+    same = (stored.loc[common, NUMERIC_COLS].to_numpy() == reread.loc[common, NUMERIC_COLS].to_numpy()).all(axis=1)
+    unchanged = new_mark & new_features["Team"].isin(common[same]).to_numpy()
+    return new_features[~unchanged].reset_index(drop=True)
+
+
+def upsert_rows(existing, rows):
+    """Ersetzt Zeilen mit gleichem (Season, Spieltag, Team) durch rows und hängt die übrigen an."""
+    keys = ["Season", "Spieltag", "Team"]
+    replaced = pd.MultiIndex.from_frame(existing[keys]).isin(pd.MultiIndex.from_frame(rows[keys]))
+    return pd.concat([existing[~replaced], rows], ignore_index=True)
+
+
+def merge_reread_rows(existing, new_features, high_water):
+    """
+    Führt die ab dem Spieltag high_water geladenen Features mit den gespeicherten zusammen:
+    Zeilen dieses Spieltags ersetzen gespeicherte Zeilen desselben Teams, spätere werden
+    angehängt. Gibt (DataFrame, Anzahl neuer oder geänderter Zeilen) zurück.
+    """
+    changed = changed_rows(existing, new_features, high_water)
+    if changed.empty:
+        return existing, 0
+    return upsert_rows(existing, changed), len(changed)
+
+
+def _atomic_write_json(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class FeatureStore:
+    """Versionierte, per Memory-Map lesbare Feature-Tabelle auf der Festplatte."""
+
+    def __init__(self, directory=FEATURE_STORE_DIR, keep=FEATURE_STORE_KEEP):
+        self.directory = directory
+        self.keep = keep
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        os.makedirs(directory, exist_ok=True)
+
+    def manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @property
+    def version(self):
+        manifest = self.manifest()
+        return manifest["version"] if manifest else None
+
+    def _path(self, version):
+        return os.path.join(self.directory, f"league_features-{version}.arrow")
+
+    def load(self):
+        """Lädt die aktuelle Version (Memory-Map) als DataFrame oder None, falls keine existiert."""
+        manifest = self.manifest()
+        if manifest is None or not os.path.exists(self._path(manifest["version"])):
+            return None
+        with pa.memory_map(self._path(manifest["version"]), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.to_pandas()
+
+    def write(self, df, source=None):
+        """Schreibt df als neue Version (aus der Datenquelle source) und gibt die Versionsnummer zurück."""
+        version = (self.version or 0) + 1
+        path = self._path(version)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        _atomic_write_json(self.manifest_path, {
+            "version": version,
+            "file": os.path.basename(path),
+            "rows": len(df),
+            "high_water": high_water_mark(df),
+            "source": None if source is None else source_identity(source),
+            "created_at": time.time(),
+        })
+        self._prune(version)
+        return version
+
+    def _prune(self, current):
+        for old in range(current - self.keep, 0, -1):
+            if not os.path.exists(self._path(old)):
+                break
+            os.remove(self._path(old))
+
+    def refresh(self, source, rebuild=False):
+        """
+        Aktualisiert den Store aus einer Datenquelle (data_source.py) und gibt die aktuellen
+        Features zurück.
+
+        Ohne rebuild werden nur Spieltage ab dem high_water des Manifests geladen; der Spieltag
+        high_water selbst wird erneut gelesen und übernommen, falls sich seine Zeilen geändert haben.
+        """
+        existing = None if rebuild else self.load()
+        if existing is not None and not set(NUMERIC_COLS) <= set(existing.columns):
+            print("Feature-Store: Schema geändert, alle Spieltage werden neu berechnet.")
+            existing = None
+        if existing is not None and self.manifest().get("source") != source_identity(source):
+            print(f"Feature-Store: Datenquelle geändert ({source.name}: {source.location}), "
+                  "alle Spieltage werden neu berechnet.")
+            existing = None
+        high_water = None if existing is None else self.manifest()["high_water"]
+        after = None if high_water is None else (high_water[0], high_water[1] - 1)
+        new_rows = source.league_table(after=after)
+        if new_rows.empty:
+            if existing is not None:
+                return existing
+            raise ValueError(f"Keine abgeschlossenen Spieltage in der Datenquelle ({source.name}) gefunden!")
+        new_features = build_features(new_rows)
+        if existing is None:
+            df, changed = new_features, len(new_features)
+        else:
+            df, changed = merge_reread_rows(existing, new_features, high_water)
+            if changed == 0:
+                return existing
+        version = self.write(df, source)
+        print(f"Feature-Store: Version {version} mit {changed} neuen oder geänderten Zeilen ({len(df)} gesamt).")
+        return df
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Feature-Store aus der Datenquelle (DATA_SOURCE) aktualisieren.")
+    parser.add_argument("--directory", default=FEATURE_STORE_DIR, help="Ordner des Feature-Stores")
+    parser.add_argument("--rebuild", action="store_true", help="Alle Spieltage neu berechnen statt nur neue")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from data_source import data_source_from_env
+
+    args = parse_args(argv)
+    source = data_source_from_env()
+    try:
+        df = FeatureStore(args.directory).refresh(source, rebuild=args.rebuild)
+    finally:
+        source.close()
+    print(f"{len(df)} Zeilen, letzter Spieltag {high_water_mark(df)}")
+
+
+if __name__ == "__main__":
+    main()
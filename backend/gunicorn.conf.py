@@ -0,0 +1,32 @@
+"""
+gunicorn.conf.py – Gunicorn-Konfiguration für backend/wsgi.py
+--------------------------------------------------------------
+Umgebungsvariablen:
+  - WEB_CONCURRENCY:     Anzahl Worker-Prozesse (Standard: Anzahl CPU-Kerne)
+  - GUNICORN_THREADS:    Threads pro Worker (Standard 4, Worker-Klasse gthread)
+  - GUNICORN_TIMEOUT:    Timeout pro Anfrage in Sekunden (Standard 120, /api/simulation kann dauern)
+  - PORT:                Port (Standard 5000)
+  - MODEL_POLL_INTERVAL: Intervall der Suche nach neuen Modellversionen pro Worker (Standard 300)
+  - LEAGUE_FEED:         Übernahme neuer Spieltage pro Worker (auto, changestream, poll, off)
+"""
+import multiprocessing
+import os
+
+# Module des Backends werden flach importiert (from app import ...)
+chdir = os.path.dirname(os.path.abspath(__file__))
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+# App einmal im Master laden; Worker teilen Modell und Daten copy-on-write
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Jeder Worker sucht selbst nach neuen Modellversionen und Spieltagen (Threads überleben
+    # fork nicht; der LeagueFeed öffnet dafür eine eigene MongoDB-Verbindung)
+    app = server.app.wsgi()
+    app.config["MODEL_STORE"].start_watcher(float(os.getenv("MODEL_POLL_INTERVAL", "300")))
+    app.config["LEAGUE_FEED"].start()
@@ -0,0 +1,112 @@
+"""
+league_data.py – Projizierte, gefilterte Lesezugriffe auf die "league-tables"-Collection
+-----------------------------------------------------------------------------------------
+Statt alle Dokumente mit find() als Liste zu laden und erst in pandas zu filtern, werden
+Future-Filter, Saisonbereich und Spaltenprojektion an MongoDB übergeben. Der Cursor wird in
+Blöcken (batch_size) gelesen und jeder Block direkt in typisierte NumPy-Spalten umgewandelt;
+es liegen also nie alle Dokumente gleichzeitig als Python-Dicts im Speicher.
+
+Für den Betrieb ohne historische Tabellenstände liefert load_latest_rows per Aggregation nur
+die aktuellste Zeile pro Team.
+
+Die Spalte Tore liegt im Format des Spiders als Text vor ("3:0"); split_goals zerlegt sie in
+erzielte und erhaltene Tore.
+"""
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+LEAGUE_COLUMNS = ["Season", "Spieltag", "Future", "Rank", "Team", "Spiele", "G", "U", "V", "Tore", "Goal_Diff", "Points"]
+# Spalten, die als Text bleiben (Tore im Format "3:0"); Future ist boolesch, der Rest numerisch
+TEXT_COLUMNS = {"Team", "Tore"}
+BOOL_COLUMNS = {"Future"}
+LEAGUE_BATCH_SIZE = 5000
+
+
+def league_query(future=False, season_from=None, season_to=None, after=None):
+    """
+    MongoDB-Filter für die "league-tables"-Collection.
+
+    Args:
+        future:      False = nur gespielte Spieltage, True = nur zukünftige, None = alle.
+        season_from: erste Saison (inklusive) oder None.
+        season_to:   letzte Saison (inklusive) oder None.
+        after:       (Season, Spieltag); nur spätere Spieltage werden geliefert.
+    """
+    query = {}
+    if future is not None:
+        query["Future"] = future
+    season = {}
+    if season_from is not None:
+        season["$gte"] = season_from
+    if season_to is not None:
+        season["$lte"] = season_to
+    if season:
+        query["Season"] = season
+    if after is not None:
+        last_season, last_spieltag = after
+        query["$or"] = [{"Season": {"$gt": last_season}}, {"Season": last_season, "Spieltag": {"$gt": last_spieltag}}]
+    return query
+
+
+def split_goals(tore):
+    """
+    Zerlegt Tore im Format "3:0" in zwei Ganzzahl-Arrays (erzielte, erhaltene Tore).
+    Fehlende oder ungültige Werte (z. B. zukünftige Spieltage) werden zu -1.
+    """
+    # Es gibt nur wenige verschiedene Spielstände; zerlegt wird jeder davon nur einmal
+    codes, uniques = pd.factorize(pd.Series(tore, dtype=object))
+    parts = pd.Series(uniques, dtype=object).astype("string").str.extract(r"^\s*(\d+)\s*:\s*(\d+)\s*$")
+    goals = parts.apply(pd.to_numeric, errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+    # Fehlende Werte haben den Code -1 und landen auf der angehängten Zeile (-1, -1)
+    goals = np.vstack([goals.reshape(-1, 2), [[-1, -1]]])[codes]
+    return goals[:, 0], goals[:, 1]
+
+
+def _convert(column, values):
+    if column in TEXT_COLUMNS:
+        return np.array(values, dtype=object)
+    if column in BOOL_COLUMNS:
+        return np.array([bool(v) for v in values], dtype=bool)
+    return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy()
+
+
+def load_league_table(collection, query=None, columns=LEAGUE_COLUMNS, batch_size=LEAGUE_BATCH_SIZE):
+    """
+    Lädt die Dokumente zu query (siehe league_query) mit Projektion auf columns und gibt sie
+    als DataFrame mit typisierten Spalten zurück.
+    """
+    projection = {column: 1 for column in columns}
+    projection["_id"] = 0
+    cursor = collection.find(query if query is not None else league_query(), projection, batch_size=batch_size)
+    blocks = {column: [] for column in columns}
+    while True:
+        batch = list(islice(cursor, batch_size))
+        if not batch:
+            break
+        for column in columns:
+            blocks[column].append(_convert(column, [doc.get(column) for doc in batch]))
+    return pd.DataFrame({
+        column: np.concatenate(parts) if parts else np.array([], dtype=object if column in TEXT_COLUMNS else float)
+        for column, parts in blocks.items()
+    })
+
+
+def latest_rows_pipeline(season=None, columns=LEAGUE_COLUMNS):
+    """Aggregation: aktuellste gespielte Zeile (höchste Season, dann Spieltag) pro Team."""
+    match = league_query(season_from=season, season_to=season)
+    return [
+        {"$match": match},
+        {"$project": {column: 1 for column in columns}},
+        {"$sort": {"Season": -1, "Spieltag": -1}},
+        {"$group": {"_id": "$Team", "doc": {"$first": "$$ROOT"}}},
+        {"$replaceRoot": {"newRoot": "$doc"}},
+        {"$project": {"_id": 0}},
+    ]
+
+
+def load_latest_rows(collection, season=None, columns=LEAGUE_COLUMNS):
+    """Aktuellste Tabellenzeile pro Team als DataFrame (typisiert wie load_league_table)."""
+    docs = list(collection.aggregate(latest_rows_pipeline(season, columns), allowDiskUse=True))
+    return pd.DataFrame({column: _convert(column, [doc.get(column) for doc in docs]) for column in columns})
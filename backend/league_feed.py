@@ -0,0 +1,219 @@
+"""
+league_feed.py – Neue Spieltage aus der "league-tables"-Collection im laufenden Betrieb übernehmen
+-----------------------------------------------------------------------------------------------
+Der Spider schreibt neue Spieltage per Upsert in MongoDB. Statt erst beim nächsten Neustart
+werden sie vom LeagueFeed in einem Hintergrund-Thread übernommen:
+  - changestream: collection.watch() meldet Inserts und Updates; kurz nacheinander eintreffende
+    Änderungen (ein Spieltag = ein Bulk-Upsert) werden über LEAGUE_FEED_DEBOUNCE Sekunden
+    gesammelt,
+  - poll: alle LEAGUE_POLL_INTERVAL Sekunden wird nach Dokumenten ab der Hochwassermarke
+    (Season, Spieltag) gefragt,
+  - auto (Standard): Change Streams, falls der Server sie unterstützt (Replica Set), sonst poll,
+  - off: keine Aktualisierung.
+
+In beiden Fällen werden nur Zeilen ab dem zuletzt enthaltenen Spieltag geladen (projiziert und
+gefiltert, siehe league_data.py) und unveränderte Zeilen verworfen; korrigierte Zeilen dieses
+Spieltags ersetzen die bisherigen desselben Teams. apply(state, new_rows)
+baut daraus einen neuen LeagueState; Lesende Anfragen greifen ohne Sperre auf feed.state zu,
+der in einem Schritt ersetzt wird.
+
+Gemessen wird die Verzögerung bis zur Sichtbarkeit in den Vorhersagen: ab dem Schreibzeitpunkt
+laut Change-Event (wallTime bzw. clusterTime) und ab dem Erkennen der Änderung (beide Modi).
+"""
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from features import build_features, changed_rows, high_water_mark
+from league_data import league_query, load_league_table
+
+LEAGUE_FEED = os.getenv("LEAGUE_FEED", "auto")  # auto, changestream, poll oder off
+LEAGUE_POLL_INTERVAL = float(os.getenv("LEAGUE_POLL_INTERVAL", "60"))
+LEAGUE_FEED_DEBOUNCE = float(os.getenv("LEAGUE_FEED_DEBOUNCE", "1.0"))
+
+
+class LeagueState:
+    """Unveränderlicher Datenstand: Feature-Frame, Teams, Snapshot-ID und abgeleitete Daten (extras)."""
+
+    def __init__(self, league_df, data_id, extras=None, loaded_at=None):
+        self.league_df = league_df
+        self.teams = league_df["Team"].unique().tolist()
+        self.data_id = data_id
+        self.extras = extras
+        self.loaded_at = loaded_at or datetime.now(timezone.utc)
+        self.high_water = high_water_mark(league_df)
+
+
+def extend_snapshot_id(data_id, new_rows):
+    """Snapshot-ID nach dem Anhängen von new_rows, ohne den gesamten Datenstand neu zu hashen."""
+    digest = hashlib.sha1(data_id.encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(new_rows, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:12]
+
+
+def new_league_rows(collection, league_df):
+    """
+    Features der gespielten Tabellenzeilen, die neu oder geändert sind gegenüber league_df.
+    Der letzte enthaltene Spieltag wird erneut abgefragt, falls er erst teilweise geschrieben
+    oder danach korrigiert wurde; geänderte Zeilen ersetzen beim Übernehmen die bisherigen
+    desselben Teams (features.upsert_rows), wie beim Feature-Store.
+    """
+    high_water = high_water_mark(league_df)
+    after = None if high_water is None else (high_water[0], high_water[1] - 1)
+    docs = load_league_table(collection, league_query(after=after))
+    if docs.empty:
+        return docs
+    rows = build_features(docs)
+    if high_water is not None:
+        rows = changed_rows(league_df, rows, high_water)
+    return rows
+
+
+class LatencyStats:
+    """Anzahl, letzter, mittlerer und maximaler Wert einer Verzögerung in Sekunden."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = None
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "last": self.last,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+
+class LeagueFeed:
+    """
+    Hält den aktuellen LeagueState und ergänzt ihn im Hintergrund um neue Spieltage.
+
+    connect():             liefert (client, collection); eigene Verbindung im Hintergrund-Thread,
+                           die Verbindung vom Start ist dann bereits geschlossen.
+    apply(state, rows):    baut den neuen LeagueState; läuft unter lock, zusammen mit dem Tausch.
+    """
+
+    def __init__(self, state, connect, apply, lock=None, mode=LEAGUE_FEED,
+                 poll_interval=LEAGUE_POLL_INTERVAL, debounce=LEAGUE_FEED_DEBOUNCE):
+        self.state = state
+        self.connect = connect
+        self.apply = apply
+        self.lock = lock or threading.RLock()
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.active_mode = None
+        self.stats = {"updates": 0, "rows": 0, "errors": 0, "last_update_at": None, "last_apply_s": None}
+        self.write_to_visible = LatencyStats()
+        self.detect_to_visible = LatencyStats()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def ingest(self, collection, detected_at=None, written_at=None):
+        """Lädt neue Zeilen und tauscht den Datenstand; gibt die Anzahl übernommener Zeilen zurück."""
+        detected_at = detected_at or time.perf_counter()
+        with self.lock:
+            rows = new_league_rows(collection, self.state.league_df)
+            if rows.empty:
+                return 0
+            start = time.perf_counter()
+            self.state = self.apply(self.state, rows)
+            visible = time.perf_counter()
+        self.stats["updates"] += 1
+        self.stats["rows"] += len(rows)
+        self.stats["last_update_at"] = self.state.loaded_at.isoformat()
+        self.stats["last_apply_s"] = visible - start
+        self.detect_to_visible.add(visible - detected_at)
+        if written_at is not None:
+            self.write_to_visible.add(max(0.0, (datetime.now(timezone.utc) - written_at).total_seconds()))
+        print(f"Liga-Daten: {len(rows)} neue Zeilen, Stand {self.state.high_water}, "
+              f"sichtbar nach {visible - detected_at:.3f}s")
+        return len(rows)
+
+    def _poll(self, collection):
+        self.active_mode = "poll"
+        while not self._stop.wait(self.poll_interval):
+            self._ingest_safely(collection)
+
+    def _watch(self, collection):
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        with collection.watch(pipeline, max_await_time_ms=1000) as stream:
+            self.active_mode = "changestream"
+            # Änderungen zwischen dem Laden beim Start und dem Öffnen des Streams nachholen
+            self._ingest_safely(collection)
+            while not self._stop.is_set():
+                change = stream.try_next()
+                if change is None:
+                    continue
+                detected_at = time.perf_counter()
+                written_at = self._written_at(change)
+                deadline = time.monotonic() + self.debounce
+                while time.monotonic() < deadline and not self._stop.is_set():
+                    stream.try_next()
+                self._ingest_safely(collection, detected_at, written_at)
+
+    @staticmethod
+    def _written_at(change):
+        if change.get("wallTime") is not None:
+            return change["wallTime"].replace(tzinfo=timezone.utc)
+        if change.get("clusterTime") is not None:
+            return change["clusterTime"].as_datetime()
+        return None
+
+    def _ingest_safely(self, collection, detected_at=None, written_at=None):
+        try:
+            self.ingest(collection, detected_at, written_at)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"Fehler beim Übernehmen neuer Liga-Daten: {e}")
+
+    def _run(self):
+        client, collection = self.connect()
+        try:
+            if self.mode in ("auto", "changestream"):
+                try:
+                    self._watch(collection)
+                    return
+                except Exception as e:
+                    if self.mode == "changestream" or self._stop.is_set():
+                        raise
+                    print(f"Change Streams nicht verfügbar ({e}); Polling alle {self.poll_interval}s.")
+            self._poll(collection)
+        finally:
+            client.close()
+
+    def start(self):
+        """Startet den Hintergrund-Thread (nicht bei mode="off")."""
+        if self._thread is not None or self.mode == "off":
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="league-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def summary(self):
+        return dict(
+            self.stats,
+            mode=self.active_mode or self.mode,
+            high_water=self.state.high_water,
+            write_to_visible_s=self.write_to_visible.summary(),
+            detect_to_visible_s=self.detect_to_visible.summary(),
+        )
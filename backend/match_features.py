@@ -0,0 +1,231 @@
+"""
+match_features.py – Inkrementelle Spiel-Features aus der "matches"-Collection
+------------------------------------------------------------------------------
+Die MatchFeatureEngine geht die Spiele einmal chronologisch (Season, Spieltag) durch und führt
+pro Team in NumPy-Arrays fester Größe:
+  - Elo-Rating (Heimvorteil, Gewichtung nach Tordifferenz wie beim World-Football-Elo,
+    zu Saisonbeginn teilweise Rückführung zum Mittelwert),
+  - Form: Punkte der letzten form_window Spiele (Ringpuffer),
+  - Heim- und Auswärts-Torraten (erzielt/erhalten, exponentiell gewichtet).
+
+Pro verarbeitetem Spieltag wird eine Zeile pro Team mit dem Stand nach diesem Spieltag
+ausgegeben. process() verarbeitet nur Spieltage nach dem zuletzt verarbeiteten; ein neuer
+Spieltag kostet also nur dessen eigene Aktualisierung. Mit save/load bleibt der Zustand
+zwischen Läufen erhalten.
+
+Ein Spieltag gilt als abgeschlossen, sobald alle Spiele gespielt sind oder bereits Resultate
+eines späteren Spieltags vorliegen. Nachholspiele, die erst danach gespielt werden, fließen
+nicht mehr ein.
+
+Die Kurznamen der Spielresultate (z. B. "GCZ", "FCSG") werden über eine aus TEAM_CODES
+vorberechnete Zuordnung Name -> Array-Position aufgelöst.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from teams import TEAM_CODES
+
+MATCH_FEATURE_COLUMNS = [
+    "Elo", "Form_Points", "Form_Games",
+    "Home_Goals_For", "Home_Goals_Against", "Away_Goals_For", "Away_Goals_Against",
+]
+
+
+def _empty_features():
+    return pd.DataFrame(columns=["Season", "Spieltag", "Team"] + MATCH_FEATURE_COLUMNS)
+
+
+class MatchFeatureEngine:
+    """Laufende Spiel-Features pro Team; Zustand in Arrays der Länge capacity."""
+
+    def __init__(self, form_window=5, k_factor=20.0, home_advantage=60.0, initial_elo=1500.0,
+                 season_regression=0.25, goal_decay=0.9, capacity=32):
+        self.form_window = form_window
+        self.k_factor = k_factor
+        self.home_advantage = home_advantage
+        self.initial_elo = initial_elo
+        self.season_regression = season_regression
+        self.goal_decay = goal_decay
+
+        # Vorberechnete Zuordnung: volle Namen und Kurznamen zeigen auf dieselbe Position
+        self.teams = sorted(set(TEAM_CODES.values()))
+        self.positions = {team: i for i, team in enumerate(self.teams)}
+        self.positions.update({code: self.positions[name] for code, name in TEAM_CODES.items()})
+
+        capacity = max(capacity, len(self.teams))
+        self.elo = np.full(capacity, initial_elo)
+        self.form = np.zeros((capacity, form_window))
+        self.form_games = np.zeros(capacity, dtype=int)
+        # Exponentiell gewichtete Summen (Tore) und Gewichte; Rate = Summe / Gewicht
+        self.goal_sums = np.zeros((capacity, 4))  # Heim erzielt, Heim erhalten, Auswärts erzielt, Auswärts erhalten
+        self.goal_weights = np.zeros((capacity, 2))  # Heimspiele, Auswärtsspiele
+        self.season_teams = set()
+        self.last_processed = None
+
+    def _grow(self, size):
+        capacity = len(self.elo)
+        if size <= capacity:
+            return
+        extra = max(size, 2 * capacity) - capacity
+        self.elo = np.concatenate([self.elo, np.full(extra, self.initial_elo)])
+        self.form = np.concatenate([self.form, np.zeros((extra, self.form_window))])
+        self.form_games = np.concatenate([self.form_games, np.zeros(extra, dtype=int)])
+        self.goal_sums = np.concatenate([self.goal_sums, np.zeros((extra, 4))])
+        self.goal_weights = np.concatenate([self.goal_weights, np.zeros((extra, 2))])
+
+    def team_positions(self, names):
+        """Array-Positionen zu Team- oder Kurznamen; unbekannte Namen werden neu angelegt."""
+        for name in pd.unique(names):
+            if name not in self.positions:
+                self.positions[name] = len(self.teams)
+                self.teams.append(name)
+        self._grow(len(self.teams))
+        return pd.Series(names).map(self.positions).to_numpy(dtype=int)
+
+    def _start_season(self):
+        # Ratings teilweise zum Mittelwert zurückführen; Form beginnt neu
+        active = np.array(sorted(self.season_teams), dtype=int)
+        if len(active):
+            mean = self.elo[active].mean()
+            self.elo[active] = mean + (1 - self.season_regression) * (self.elo[active] - mean)
+        self.form[:] = 0
+        self.form_games[:] = 0
+        self.season_teams = set()
+
+    def update(self, home, away, home_goals, away_goals):
+        """
+        Verarbeitet die gespielten Partien eines Spieltags (Positionen und Tore als Arrays).
+        Jedes Team spielt höchstens einmal pro Spieltag, daher sind alle Updates vektorisiert.
+        """
+        self.season_teams.update(home.tolist())
+        self.season_teams.update(away.tolist())
+
+        # Elo mit den Ratings vor dem Spieltag
+        expected_home = 1.0 / (1.0 + 10 ** ((self.elo[away] - self.elo[home] - self.home_advantage) / 400.0))
+        result_home = np.sign(home_goals - away_goals) * 0.5 + 0.5
+        margin = np.abs(home_goals - away_goals)
+        weight = np.where(margin <= 1, 1.0, np.where(margin == 2, 1.5, (11.0 + margin) / 8.0))
+        delta = self.k_factor * weight * (result_home - expected_home)
+        self.elo[home] += delta
+        self.elo[away] -= delta
+
+        # Form: Punkte in den Ringpuffer schreiben
+        points_home = np.select([home_goals > away_goals, home_goals == away_goals], [3.0, 1.0], 0.0)
+        points_away = np.select([away_goals > home_goals, home_goals == away_goals], [3.0, 1.0], 0.0)
+        teams = np.concatenate([home, away])
+        self.form[teams, self.form_games[teams] % self.form_window] = np.concatenate([points_home, points_away])
+        self.form_games[teams] += 1
+
+        # Torraten
+        self.goal_sums *= self.goal_decay
+        self.goal_weights *= self.goal_decay
+        self.goal_sums[home, 0] += home_goals
+        self.goal_sums[home, 1] += away_goals
+        self.goal_sums[away, 2] += away_goals
+        self.goal_sums[away, 3] += home_goals
+        self.goal_weights[home, 0] += 1
+        self.goal_weights[away, 1] += 1
+
+    def snapshot(self, season, spieltag):
+        """Zeile pro Team der laufenden Saison mit dem aktuellen Stand der Features."""
+        active = np.array(sorted(self.season_teams), dtype=int)
+        games = np.minimum(self.form_games[active], self.form_window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rates = self.goal_sums[active] / np.repeat(self.goal_weights[active], 2, axis=1)
+        return pd.DataFrame({
+            "Season": season,
+            "Spieltag": spieltag,
+            "Team": [self.teams[i] for i in active],
+            "Elo": self.elo[active],
+            "Form_Points": self.form[active].sum(axis=1),
+            "Form_Games": games,
+            "Home_Goals_For": rates[:, 0],
+            "Home_Goals_Against": rates[:, 1],
+            "Away_Goals_For": rates[:, 2],
+            "Away_Goals_Against": rates[:, 3],
+        })
+
+    def process(self, matches):
+        """
+        Verarbeitet alle abgeschlossenen Spieltage nach last_processed und gibt deren
+        Features (eine Zeile pro Season, Spieltag und Team, volle Teamnamen) zurück.
+        """
+        matches = matches[["Season", "Spieltag", "home_team", "away_team", "home_goals", "away_goals"]].copy()
+        for col in ["home_goals", "away_goals"]:
+            matches[col] = pd.to_numeric(matches[col], errors="coerce").fillna(-1).astype(int)
+        if self.last_processed is not None:
+            season, spieltag = self.last_processed
+            matches = matches[(matches["Season"] > season) | ((matches["Season"] == season) & (matches["Spieltag"] > spieltag))]
+        played = matches["home_goals"] >= 0
+        if not played.any():
+            return _empty_features()
+
+        # Abgeschlossen: alle Spiele gespielt oder ein späterer Spieltag hat bereits Resultate
+        day_key = matches["Season"].to_numpy() * 1000 + matches["Spieltag"].to_numpy()
+        last_played = day_key[played.to_numpy()].max()
+        complete = pd.Series(played.to_numpy()).groupby(day_key).all()
+        closed = complete[complete.to_numpy() | (complete.index < last_played)].index
+        matches = matches[np.isin(day_key, closed) & played.to_numpy()]
+        if matches.empty:
+            # Nur ein teilweise gespielter Spieltag (z. B. laufende Runde im LeagueFeed)
+            return _empty_features()
+        matches = matches.sort_values(["Season", "Spieltag"], kind="stable")
+
+        home = self.team_positions(matches["home_team"].to_numpy())
+        away = self.team_positions(matches["away_team"].to_numpy())
+        home_goals = matches["home_goals"].to_numpy()
+        away_goals = matches["away_goals"].to_numpy()
+        keys = matches["Season"].to_numpy() * 1000 + matches["Spieltag"].to_numpy()
+        bounds = np.flatnonzero(np.diff(keys)) + 1
+        starts = np.concatenate([[0], bounds])
+        ends = np.concatenate([bounds, [len(keys)]])
+
+        rows = []
+        for start, end in zip(starts, ends):
+            season, spieltag = int(keys[start] // 1000), int(keys[start] % 1000)
+            if self.last_processed is not None and season != self.last_processed[0]:
+                self._start_season()
+            day = slice(start, end)
+            self.update(home[day], away[day], home_goals[day], away_goals[day])
+            self.last_processed = (season, spieltag)
+            rows.append(self.snapshot(season, spieltag))
+        return pd.concat(rows, ignore_index=True)
+
+    def latest(self):
+        """Aktueller Stand pro Team als Dictionary Team -> Features (leer vor dem ersten Spieltag)."""
+        if self.last_processed is None:
+            return {}
+        df = self.snapshot(*self.last_processed).set_index("Team")
+        return df[MATCH_FEATURE_COLUMNS].to_dict(orient="index")
+
+    def save(self, path):
+        """Speichert den Zustand (Arrays als .npz, Metadaten im selben Archiv als JSON)."""
+        meta = {
+            "teams": self.teams,
+            "season_teams": sorted(int(i) for i in self.season_teams),
+            "last_processed": self.last_processed,
+            "params": [self.form_window, self.k_factor, self.home_advantage, self.initial_elo,
+                       self.season_regression, self.goal_decay],
+        }
+        with open(path, "wb") as f:
+            np.savez(f, elo=self.elo, form=self.form, form_games=self.form_games, goal_sums=self.goal_sums,
+                     goal_weights=self.goal_weights, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            engine = cls(*meta["params"])
+            engine.elo = data["elo"]
+            engine.form = data["form"]
+            engine.form_games = data["form_games"]
+            engine.goal_sums = data["goal_sums"]
+            engine.goal_weights = data["goal_weights"]
+        engine.teams = meta["teams"]
+        engine.positions = {team: i for i, team in enumerate(engine.teams)}
+        engine.positions.update({code: engine.positions[name] for code, name in TEAM_CODES.items() if name in engine.positions})
+        engine.season_teams = set(meta["season_teams"])
+        engine.last_processed = tuple(meta["last_processed"]) if meta["last_processed"] else None
+        return engine
@@ -0,0 +1,300 @@
+"""
+metrics.py – Laufzeitmessung pro Verarbeitungsschritt und /metrics im Prometheus-Textformat
+-------------------------------------------------------------------------------------------
+Metrics sammelt mit geringem Aufwand:
+  - Histogramme pro Schritt (stage), z. B. predict_proba oder render_template,
+  - Dauer und Anzahl der Anfragen pro Endpunkt und Statuscode (über instrument(app, ...)),
+  - einmalige Startzeiten (startup), z. B. das Laden der Liga-Daten,
+  - Werte, die erst beim Abruf berechnet werden (gauge/counter mit Callback), z. B.
+    Cache-Treffer, Modellversion oder Alter des Datenstands.
+render() liefert alles im Prometheus-Textformat (Version 0.0.4). Jeder Gunicorn-Worker zählt
+für sich; ein Abruf von /metrics zeigt die Werte des Workers, der ihn bearbeitet.
+
+Mit METRICS_ENABLED=0 liefert stage() einen gemeinsamen No-op-Kontextmanager und die
+Anfrage-Hooks kehren sofort zurück (siehe benchmarks/bench_metrics.py).
+
+Der SlowRequestProfiler (opt-in über PROFILE_SLOW_MS) tastet die Stacks ausgewählter
+Anfragen im Abstand von PROFILE_INTERVAL_MS ab. Dauert eine Anfrage länger als der
+Schwellenwert, wird das Profil im Collapsed-Stack-Format (eine Zeile "a;b;c Anzahl", lesbar
+z. B. mit flamegraph.pl oder speedscope) unter PROFILE_DIR abgelegt.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_PREFIX = "superleague_"
+# Obergrenzen der Histogramm-Buckets in Sekunden (100 µs bis 10 s)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))  # 0 = Profiler aus
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "1.0"))
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "profiles")
+)
+
+_DISABLED = nullcontext()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _value(value):
+    return "NaN" if value is None else repr(float(value))
+
+
+class Histogram:
+    """Histogramm mit festen Buckets; observe hält nur eine kurze Sperre."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def samples(self, name, labels):
+        """Zeilen im Prometheus-Format (kumulierte Buckets, _sum, _count)."""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(list(self.buckets) + ["+Inf"], counts):
+            cumulative += bucket_count
+            le = bound if bound == "+Inf" else repr(float(bound))
+            lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {_value(total)}")
+        lines.append(f"{name}_count{_labels(labels)} {count}")
+        return lines
+
+
+class _Stage:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """Sammelt Histogramme, Startzeiten und beim Abruf berechnete Werte einer App."""
+
+    def __init__(self, enabled=METRICS_ENABLED, prefix=METRICS_PREFIX, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.buckets = buckets
+        self.stages = {}
+        self.requests = {}
+        self.startup_seconds = {}
+        self.collectors = []
+        self._lock = threading.Lock()
+
+    def _histogram(self, registry, key):
+        histogram = registry.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = registry.setdefault(key, Histogram(self.buckets))
+        return histogram
+
+    def stage(self, name):
+        """Kontextmanager, der die Dauer eines Schritts im Histogramm name erfasst."""
+        if not self.enabled:
+            return _DISABLED
+        return _Stage(self._histogram(self.stages, name))
+
+    def observe_request(self, endpoint, method, status, seconds):
+        self._histogram(self.requests, (endpoint, method, status)).observe(seconds)
+
+    def startup(self, name):
+        """Kontextmanager für einmalige Schritte beim Start (immer erfasst)."""
+        return _Startup(self.startup_seconds, name)
+
+    def collect(self, name, kind, help_text, fn):
+        """
+        Registriert einen Wert, der erst beim Abruf berechnet wird.
+        fn() liefert eine Zahl oder eine Liste von (Labels als Dictionary, Zahl).
+        """
+        self.collectors.append((kind, self.prefix + name, help_text, fn))
+
+    def render(self):
+        """Alle Werte im Prometheus-Textformat."""
+        lines = []
+        sections = [
+            ("stage_duration_seconds", "Dauer einzelner Verarbeitungsschritte.",
+             [((("stage", name),), h) for name, h in sorted(self.stages.items())]),
+            ("http_request_duration_seconds", "Dauer der Anfragen pro Endpunkt, Methode und Status.",
+             [((("endpoint", e), ("method", m), ("status", s)), h) for (e, m, s), h in sorted(self.requests.items())]),
+        ]
+        for name, help_text, histograms in sections:
+            full_name = self.prefix + name
+            lines += [f"# HELP {full_name} {help_text}", f"# TYPE {full_name} histogram"]
+            for labels, histogram in histograms:
+                lines += histogram.samples(full_name, labels)
+
+        full_name = self.prefix + "startup_seconds"
+        lines += [f"# HELP {full_name} Dauer der Schritte beim Start.", f"# TYPE {full_name} gauge"]
+        lines += [f"{full_name}{_labels((('stage', k),))} {_value(v)}" for k, v in self.startup_seconds.items()]
+
+        for kind, full_name, help_text, fn in self.collectors:
+            lines += [f"# HELP {full_name} {help_text}", f"# TYPE {full_name} {kind}"]
+            value = fn()
+            samples = value if isinstance(value, list) else [({}, value)]
+            lines += [f"{full_name}{_labels(tuple(labels.items()))} {_value(v)}" for labels, v in samples]
+        return "\n".join(lines) + "\n"
+
+
+class _Startup:
+    __slots__ = ("target", "name", "start")
+
+    def __init__(self, target, name):
+        self.target = target
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.target[self.name] = time.perf_counter() - self.start
+        return False
+
+
+class SlowRequestProfiler:
+    """
+    Stichproben-Profiler für einzelne Anfragen. Ein Hintergrund-Thread (erst bei der ersten
+    profilierten Anfrage gestartet, also nach einem fork) liest alle interval Sekunden die
+    Stacks der registrierten Threads über sys._current_frames(). Ohne registrierte Threads
+    wartet er auf ein Event, statt weiter im Takt von interval aufzuwachen.
+    """
+
+    def __init__(self, slow_ms=PROFILE_SLOW_MS, interval_ms=PROFILE_INTERVAL_MS,
+                 sample_rate=PROFILE_SAMPLE_RATE, directory=PROFILE_DIR):
+        self.slow_s = slow_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.written = 0
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return self.slow_s > 0
+
+    def begin(self):
+        """Beginnt die Abtastung des aktuellen Threads; None, falls diese Anfrage nicht ausgewählt ist."""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._active[thread_id] = Counter()
+            self._wake.set()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+                self._thread.start()
+        return thread_id
+
+    def end(self, thread_id, seconds, label):
+        """Beendet die Abtastung; speichert das Profil, falls die Anfrage langsam war. Gibt den Pfad zurück."""
+        with self._lock:
+            stacks = self._active.pop(thread_id, None)
+        if not stacks or seconds < self.slow_s:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        safe_label = "".join(ch if ch.isalnum() else "_" for ch in label)
+        path = os.path.join(self.directory, f"{stamp}-{os.getpid()}-{safe_label}-{seconds * 1000:.0f}ms.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        self.written += 1
+        return path
+
+    def _sample(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    # Zurücksetzen unter dem Lock, damit ein gleichzeitiges begin() nicht verloren geht
+                    self._wake.clear()
+                    continue
+                frames = sys._current_frames()
+                for thread_id, stacks in self._active.items():
+                    frame = frames.get(thread_id)
+                    names = []
+                    while frame is not None:
+                        code = frame.f_code
+                        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                        frame = frame.f_back
+                    stacks[";".join(reversed(names))] += 1
+
+
+def instrument(app, metrics, profiler=None):
+    """
+    Registriert before_request/after_request-Hooks: Dauer pro Endpunkt, Methode und Status
+    sowie (falls aktiviert) der Profiler für langsame Anfragen; gespeicherte Profile werden
+    über app.logger gemeldet. Der Profiler wird in teardown_request beendet, das Flask auch
+    nach einer unbehandelten Ausnahme aufruft (after_request wird dann übersprungen).
+    """
+    from flask import g, request
+
+    profiling = profiler is not None and profiler.enabled
+    if not metrics.enabled and not profiling:
+        return
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+        if profiling:
+            g.profile_thread = profiler.begin()
+
+    @app.after_request
+    def _stop_timer(response):
+        start = g.get("metrics_start")
+        if start is not None and metrics.enabled:
+            seconds = time.perf_counter() - start
+            metrics.observe_request(request.endpoint or "unknown", request.method, response.status_code, seconds)
+        return response
+
+    @app.teardown_request
+    def _stop_profiler(exc):
+        start = g.pop("metrics_start", None)
+        thread_id = g.pop("profile_thread", None)
+        if thread_id is None:
+            return
+        seconds = time.perf_counter() - start
+        endpoint = request.endpoint or "unknown"
+        path = profiler.end(thread_id, seconds, endpoint)
+        if path is not None:
+            app.logger.warning("Langsame Anfrage %s (%.0f ms), Profil: %s", endpoint, seconds * 1000, path)
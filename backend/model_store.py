@@ -0,0 +1,356 @@
+"""
+model_store.py – Versioniertes Laden und Hot-Reload von Modell und Skalierer
+-----------------------------------------------------------------------------
+save.py legt Modell und Skalierer als "model-<n>.pkl" bzw. "scaler-<n>.pkl" im Blob-Container
+"models" ab. Der ModelStore lädt die höchste Version, für die beide Dateien existieren, und
+prüft optional in einem Hintergrund-Thread periodisch, ob eine neuere Version vorliegt.
+
+Modell, Skalierer und alle davon abgeleiteten Daten (z.B. der TeamIndex mit bereits skalierten
+Features) bilden ein unveränderliches ModelBundle. Ein Update ersetzt nur die Referenz auf das
+Bundle; eine Anfrage, die sich das Bundle einmal holt, sieht daher nie ein gemischtes Paar.
+
+Heruntergeladene Blobs werden lokal zusammen mit einer Metadaten-Datei (<datei>.meta.json mit
+ETag, MD5 und Größe) abgelegt. Stimmen diese beim nächsten Start mit dem Blob überein, entfällt
+der Download. Die Dauer der Phasen list, download und load wird pro Ladevorgang gemessen.
+
+Liegt zur Version zusätzlich ein kompaktes Artefakt (model-<n>.compact, siehe compact_model.py)
+vor, wird standardmäßig dieses statt der beiden Pickle-Dateien geladen. MODEL_FORMAT=joblib
+erzwingt die Pickle-Dateien, MODEL_FORMAT=compact verlangt das kompakte Artefakt.
+Ein optionales model-<n>.uncertainty (Kalibrierung und Bootstrap-Ensemble, siehe
+uncertainty.py) wird unabhängig vom Format mitgeladen und liegt als bundle.uncertainty vor.
+
+Statt Azure Blob Storage kann über MODEL_SOURCE_DIR ein lokaler Ordner mit denselben
+Dateinamen verwendet werden (z.B. für Tests oder lokale Entwicklung).
+"""
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import joblib
+from azure.storage.blob import BlobServiceClient
+
+from compact_model import load_compact
+from uncertainty import load_uncertainty
+
+MODEL_DIR = os.path.join("..", "model")
+BLOB_CONTAINER_NAME = "models"  # Containername, wie im save.py verwendet
+MODEL_FORMAT = os.getenv("MODEL_FORMAT", "auto")  # auto, compact oder joblib
+
+
+def blob_version(name):
+    """Versionsnummer aus einem Namen der Form "<basis>-<n>.pkl" (None, falls keine Zahl)."""
+    try:
+        return int(os.path.basename(name).split("-")[-1].replace(".pkl", ""))
+    except ValueError:
+        return None
+
+
+def latest_common_version(model_names, scaler_names):
+    """Höchste Version, für die sowohl ein Modell als auch ein Skalierer existiert."""
+    model_versions = {blob_version(n) for n in model_names} - {None}
+    scaler_versions = {blob_version(n) for n in scaler_names} - {None}
+    common = model_versions & scaler_versions
+    return max(common) if common else None
+
+
+def get_container_client(container_name=BLOB_CONTAINER_NAME):
+    """ContainerClient über den Connection-String aus AZURE_STORAGE_CONNECTION_STRING."""
+    connection_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+    if not connection_str:
+        raise ValueError("AZURE_STORAGE_CONNECTION_STRING ist nicht gesetzt!")
+    blob_service_client = BlobServiceClient.from_connection_string(connection_str)
+    return blob_service_client.get_container_client(container_name)
+
+
+def _md5_hex(content_md5):
+    """MD5 aus den Blob-Eigenschaften (bytes/bytearray) als Hex-String, None falls nicht gesetzt."""
+    return bytes(content_md5).hex() if content_md5 else None
+
+
+def _read_meta(local_path):
+    try:
+        with open(local_path + ".meta.json", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def is_cached(local_path, blob_name, etag, md5, size):
+    """
+    Prüft, ob local_path bereits genau diesen Blob enthält: gleicher Blob-Name, gleiche Größe
+    und gleicher ETag bzw. (falls vorhanden) gleiche MD5-Prüfsumme.
+    """
+    meta = _read_meta(local_path)
+    if meta is None or meta.get("blob_name") != blob_name or not os.path.exists(local_path):
+        return False
+    if os.path.getsize(local_path) != size:
+        return False
+    if md5 and meta.get("md5"):
+        return meta["md5"] == md5
+    return meta.get("etag") == etag
+
+
+def download_file_from_blob(container_client, blob_name, local_path, properties=None):
+    """
+    Lädt einen Blob nach local_path herunter, sofern dort nicht bereits dieselbe Version liegt.
+
+    Der Inhalt wird in Blöcken in eine temporäre Datei im Zielordner gestreamt, gegen die
+    MD5-Prüfsumme des Blobs geprüft und erst dann per os.replace an seinen Platz verschoben.
+
+    Returns:
+        (local_path, downloaded) – downloaded ist False bei einem Cache-Treffer.
+    """
+    if properties is None:
+        properties = container_client.get_blob_client(blob_name).get_blob_properties()
+    md5 = _md5_hex(properties.content_settings.content_md5)
+    if is_cached(local_path, blob_name, properties.etag, md5, properties.size):
+        return local_path, False
+
+    # Sicherstellen, dass das Verzeichnis existiert
+    directory = os.path.dirname(local_path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    hasher = hashlib.md5()
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in container_client.download_blob(blob_name).chunks():
+                hasher.update(chunk)
+                f.write(chunk)
+        if md5 and hasher.hexdigest() != md5:
+            raise IOError(f"MD5-Prüfsumme von '{blob_name}' stimmt nicht überein!")
+        os.replace(tmp_path, local_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    meta = {"blob_name": blob_name, "etag": properties.etag, "md5": hasher.hexdigest(), "size": properties.size}
+    with open(local_path + ".meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return local_path, True
+
+
+class BlobModelSource:
+    """Modellversionen im Azure-Blob-Container; Downloads landen versioniert in local_dir."""
+
+    def __init__(self, container_name=BLOB_CONTAINER_NAME, local_dir=MODEL_DIR):
+        self.container_client = get_container_client(container_name)
+        self.local_dir = local_dir
+        self.timings = {}
+        self._properties = {}
+
+    def latest_version(self):
+        start = time.perf_counter()
+        blobs = list(self.container_client.list_blobs(name_starts_with="model-"))
+        blobs += list(self.container_client.list_blobs(name_starts_with="scaler-"))
+        # Die Eigenschaften aus dem Listing (ETag, MD5, Größe) ersparen beim Download eine Abfrage
+        self._properties = {b.name: b for b in blobs}
+        self.timings["list"] = time.perf_counter() - start
+        return latest_common_version(
+            [b.name for b in blobs if b.name.startswith("model-")],
+            [b.name for b in blobs if b.name.startswith("scaler-")],
+        )
+
+    def fetch(self, version):
+        """Lädt Modell und Skalierer der Version (falls nötig) herunter und gibt die lokalen Pfade zurück."""
+        start = time.perf_counter()
+        paths = []
+        downloaded = 0
+        for base in ["model", "scaler"]:
+            name = f"{base}-{version}.pkl"
+            path, fresh = download_file_from_blob(
+                self.container_client, name, os.path.join(self.local_dir, name), self._properties.get(name)
+            )
+            paths.append(path)
+            downloaded += fresh
+        self.timings["download"] = time.perf_counter() - start
+        self.timings["cache_hits"] = 2 - downloaded
+        return tuple(paths)
+
+    def fetch_compact(self, version):
+        """Lädt model-<version>.compact (falls nötig) herunter; None, falls es nicht existiert."""
+        name = f"model-{version}.compact"
+        properties = self._properties.get(name)
+        if properties is None:
+            return None
+        start = time.perf_counter()
+        path, fresh = download_file_from_blob(self.container_client, name, os.path.join(self.local_dir, name), properties)
+        self.timings["download_compact"] = time.perf_counter() - start
+        self.timings["cache_hits_compact"] = int(not fresh)
+        return path
+
+    def fetch_uncertainty(self, version):
+        """Lädt model-<version>.uncertainty (falls nötig) herunter; None, falls es nicht existiert."""
+        name = f"model-{version}.uncertainty"
+        properties = self._properties.get(name)
+        if properties is None:
+            return None
+        start = time.perf_counter()
+        path, _ = download_file_from_blob(self.container_client, name, os.path.join(self.local_dir, name), properties)
+        self.timings["download_uncertainty"] = time.perf_counter() - start
+        return path
+
+
+class LocalModelSource:
+    """Modellversionen als model-<n>.pkl / scaler-<n>.pkl in einem lokalen Ordner."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.timings = {}
+
+    def latest_version(self):
+        start = time.perf_counter()
+        version = latest_common_version(
+            glob.glob(os.path.join(self.directory, "model-*.pkl")),
+            glob.glob(os.path.join(self.directory, "scaler-*.pkl")),
+        )
+        self.timings["list"] = time.perf_counter() - start
+        return version
+
+    def fetch(self, version):
+        return (
+            os.path.join(self.directory, f"model-{version}.pkl"),
+            os.path.join(self.directory, f"scaler-{version}.pkl"),
+        )
+
+    def fetch_compact(self, version):
+        path = os.path.join(self.directory, f"model-{version}.compact")
+        return path if os.path.exists(path) else None
+
+    def fetch_uncertainty(self, version):
+        path = os.path.join(self.directory, f"model-{version}.uncertainty")
+        return path if os.path.exists(path) else None
+
+
+def model_source_from_env():
+    """LocalModelSource, falls MODEL_SOURCE_DIR gesetzt ist, sonst BlobModelSource."""
+    directory = os.getenv("MODEL_SOURCE_DIR")
+    return LocalModelSource(directory) if directory else BlobModelSource()
+
+
+class ModelBundle:
+    """
+    Unveränderliches Paar aus Modell und Skalierer einer Version plus abgeleitete Daten.
+    uncertainty ist das UncertaintyModel der Version oder None.
+    """
+
+    def __init__(self, version, model, scaler, extras=None, timings=None, loaded_at=None, uncertainty=None):
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+        self.extras = extras
+        self.uncertainty = uncertainty
+        self.timings = timings or {}
+        self.loaded_at = loaded_at or datetime.now(timezone.utc)
+
+
+class ModelStore:
+    """
+    Hält das aktuell geladene ModelBundle.
+
+    build_extras(model, scaler) wird beim Laden jeder Version aufgerufen (außerhalb des
+    Request-Pfads); das Ergebnis wird als bundle.extras mitgetauscht. update_extras tauscht nur
+    die abgeleiteten Daten (z. B. nach neuen Liga-Daten). Beide laufen unter update_lock; wer
+    davon abhängige Daten veröffentlicht, kann die Sperre dafür ebenfalls halten.
+    """
+
+    def __init__(self, source, build_extras=None, model_format=MODEL_FORMAT):
+        self.source = source
+        self.build_extras = build_extras
+        self.model_format = model_format
+        self.bundle = None
+        self.update_lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def version(self):
+        return self.bundle.version if self.bundle else None
+
+    def load(self, version):
+        """Lädt eine Version vollständig und tauscht sie danach in einem Schritt ein."""
+        compact_path = self.source.fetch_compact(version) if self.model_format != "joblib" else None
+        if compact_path is None and self.model_format == "compact":
+            raise FileNotFoundError(f"Kein kompaktes Artefakt für Version {version} gefunden!")
+        if compact_path is not None:
+            start = time.perf_counter()
+            model, scaler = load_compact(compact_path)
+        else:
+            model_path, scaler_path = self.source.fetch(version)
+            start = time.perf_counter()
+            model = joblib.load(model_path)
+            scaler = joblib.load(scaler_path)
+        load_seconds = time.perf_counter() - start
+        uncertainty_path = self.source.fetch_uncertainty(version)
+        start = time.perf_counter()
+        uncertainty = load_uncertainty(uncertainty_path) if uncertainty_path else None
+        timings = dict(getattr(self.source, "timings", {}))
+        timings["load"] = load_seconds
+        timings["load_uncertainty"] = time.perf_counter() - start
+        timings["format"] = "joblib" if compact_path is None else "compact"
+        extras = self.build_extras(model, scaler) if self.build_extras else None
+        bundle = ModelBundle(version, model, scaler, extras, timings, uncertainty=uncertainty)
+        self.bundle = bundle  # Referenzzuweisung ist atomar
+        print(f"Modellversion {version}: " + ", ".join(
+            f"{phase} {value:.3f}s" if isinstance(value, float) else f"{phase} {value}"
+            for phase, value in timings.items()
+        ))
+        return bundle
+
+    def update_extras(self, update):
+        """
+        Ersetzt bundle.extras durch update(bundle); Modell, Skalierer und Version bleiben.
+        Das bisherige Bundle bleibt unverändert, laufende Anfragen lesen es weiter.
+        """
+        with self.update_lock:
+            bundle = self.bundle
+            self.bundle = ModelBundle(
+                bundle.version, bundle.model, bundle.scaler, update(bundle), bundle.timings, bundle.loaded_at,
+                bundle.uncertainty,
+            )
+            return self.bundle
+
+    def load_latest(self):
+        version = self.source.latest_version()
+        if version is None:
+            raise FileNotFoundError("Keine Modellversion mit passendem Skalierer gefunden!")
+        return self.load(version)
+
+    def check_for_update(self):
+        """
+        Lädt eine neuere Version, falls vorhanden. Fehler werden protokolliert; die bisher
+        geladene Version bleibt dann aktiv. Gibt True zurück, wenn getauscht wurde.
+        """
+        with self.update_lock:
+            try:
+                latest = self.source.latest_version()
+                if latest is None or (self.version is not None and latest <= self.version):
+                    return False
+                self.load(latest)
+                return True
+            except Exception as e:
+                print(f"Fehler beim Aktualisieren des Modells: {e}")
+                return False
+
+    def start_watcher(self, interval):
+        """Startet den Hintergrund-Thread, der alle interval Sekunden nach neuen Versionen sucht."""
+        if self._thread is not None or interval <= 0:
+            return
+        self._stop.clear()
+
+        def watch():
+            while not self._stop.wait(interval):
+                self.check_for_update()
+
+        self._thread = threading.Thread(target=watch, name="model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,116 @@
+"""
+response_cache.py – Zwischenspeicher für gerenderte Antworten und Vorhersagen
+------------------------------------------------------------------------------
+Die Seiten und Vorhersagen ändern sich nur, wenn neue Liga-Daten oder eine neue Modellversion
+geladen werden. Der ResponseCache speichert daher fertige Antworten unter einem Schlüssel,
+der die Anfrage (z. B. das Team) sowie die Generation (Daten-Snapshot-ID, Modellversion)
+enthält:
+  - LRU-Verdrängung ab maxsize Einträgen und Ablauf nach ttl Sekunden,
+  - Wechsel der Generation leert den Cache vollständig (Invalidierung),
+  - jeder Eintrag trägt einen ETag (Hash des Inhalts) und Last-Modified (Zeitpunkt, ab dem
+    die Generation gilt), damit Browser und CDNs per If-None-Match/If-Modified-Since
+    günstig revalidieren können (304 Not Modified),
+  - stats zählt Treffer, Fehlzugriffe, Verdrängungen, Abläufe und Invalidierungen.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, make_response
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+
+
+class CachedResponse:
+    """Unveränderlicher Inhalt einer Antwort samt Validatoren."""
+
+    def __init__(self, body, status, mimetype, last_modified):
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.last_modified = last_modified
+        self.created = time.monotonic()
+
+    def to_response(self, request, hit):
+        response = Response(self.body, status=self.status, mimetype=self.mimetype)
+        response.set_etag(self.etag)
+        response.last_modified = self.last_modified
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Cache"] = "HIT" if hit else "MISS"
+        # Liefert 304 ohne Inhalt, falls der Client die aktuelle Version bereits hat (nur GET/HEAD)
+        return response.make_conditional(request)
+
+
+class ResponseCache:
+    """Thread-sicherer LRU-/TTL-Cache für CachedResponse-Einträge."""
+
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = None
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def invalidate(self):
+        """Leert den Cache (z. B. nach neuen Daten oder einem Modellwechsel)."""
+        with self._lock:
+            self._entries.clear()
+            self.stats["invalidations"] += 1
+
+    def _lookup(self, key, generation):
+        with self._lock:
+            if generation != self.generation:
+                if self._entries:
+                    self.stats["invalidations"] += 1
+                self._entries.clear()
+                self.generation = generation
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.created > self.ttl:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def _store(self, key, generation, entry):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def respond(self, request, key, generation, last_modified, create):
+        """
+        Liefert die Antwort zu key aus dem Cache oder erzeugt sie über create() (alles, was eine
+        Flask-View zurückgeben darf). Nur Antworten mit Status 200 werden gespeichert.
+        """
+        entry = self._lookup(key, generation)
+        if entry is not None:
+            return entry.to_response(request, hit=True)
+        response = make_response(create())
+        if response.status_code != 200:
+            return response
+        entry = CachedResponse(response.get_data(), response.status_code, response.mimetype, last_modified)
+        self._store(key, generation, entry)
+        return entry.to_response(request, hit=False)
+
+    def summary(self):
+        stats = dict(self.stats, size=len(self._entries), maxsize=self.maxsize, ttl=self.ttl)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,180 @@
+"""
+scenario.py – Was-wäre-wenn-Szenarien für die verbleibenden Spiele
+-------------------------------------------------------------------
+Die ScenarioEngine hält den aktuellen Tabellenstand der laufenden Saison als NumPy-Arrays
+(eine Position pro Team) sowie die noch nicht gespielten Partien der "matches"-Collection.
+
+Ein Szenario ist eine Liste hypothetischer Resultate für einzelne dieser Partien. Daraus werden
+nur die Änderungen berechnet (Punkte, G/U/V, Tordifferenz, Spieltag und Restspiele der
+beteiligten Teams, per np.bincount über die Partien) und auf den Ausgangsstand addiert; die
+Rangfolge ergibt sich aus Punkten, Tordifferenz und bisherigem Rang. Danach werden alle Teams
+mit einem einzigen scaler.transform- und predict_proba-Aufruf neu bewertet, zusammen mit dem
+Ausgangsstand für den Vergleich. Liegt zur Modellversion ein Unsicherheits-Artefakt vor, werden
+beide wie in /api/predict kalibriert (uncertainty.py).
+
+Identische Szenarien (unabhängig von der Reihenfolge der Resultate) ergeben denselben
+Schlüssel (Scenario.key) und können so zwischengespeichert werden.
+"""
+import numpy as np
+import pandas as pd
+
+from features import EXTRA_POINTS_PER_GAME
+from simulation import split_matches
+from teams import full_team_name
+
+# Obergrenze für hypothetische Tore pro Team und Spiel
+MAX_GOALS = 20
+
+
+class Scenario:
+    """Validiertes Szenario: Positionen der Partien und Tore als Arrays, sortiert nach Partie."""
+
+    def __init__(self, fixtures, home_goals, away_goals):
+        order = np.argsort(fixtures, kind="stable")
+        self.fixtures = np.asarray(fixtures, dtype=int)[order]
+        self.home_goals = np.asarray(home_goals, dtype=int)[order]
+        self.away_goals = np.asarray(away_goals, dtype=int)[order]
+
+    def __len__(self):
+        return len(self.fixtures)
+
+    @property
+    def key(self):
+        return tuple(zip(self.fixtures.tolist(), self.home_goals.tolist(), self.away_goals.tolist()))
+
+
+class ScenarioEngine:
+    """
+    Ausgangsstand und offene Partien einer Saison.
+
+    rows:     Dictionary Team -> aktuellste Tabellenzeile (wie im TeamIndex).
+    fixtures: DataFrame der offenen Partien (Spieltag, home_team, away_team mit vollen Namen).
+    """
+
+    def __init__(self, rows, fixtures, features):
+        self.features = features
+        self.rows = rows
+        self.teams = list(rows)
+        self.positions = {team: i for i, team in enumerate(self.teams)}
+        self.base = {
+            col: np.array([rows[team][col] for team in self.teams], dtype=float)
+            for col in ["Points", "Goal_Diff", "G", "U", "V", "Rank", "Spieltag", "Restspiele"]
+        }
+        self.X_base = np.array(
+            [[rows[team][col] for col in features] for team in self.teams], dtype=float
+        ).reshape(len(self.teams), len(features))
+
+        # Nur Partien zwischen Teams der Tabelle; home/away als Positionen
+        known = fixtures["home_team"].isin(self.positions) & fixtures["away_team"].isin(self.positions)
+        self.fixtures = fixtures[known].reset_index(drop=True)
+        self.home = self.fixtures["home_team"].map(self.positions).to_numpy(dtype=int)
+        self.away = self.fixtures["away_team"].map(self.positions).to_numpy(dtype=int)
+        self.fixture_positions = {
+            (home, away): i for i, (home, away) in enumerate(zip(self.fixtures["home_team"], self.fixtures["away_team"]))
+        }
+
+    @classmethod
+    def from_data(cls, rows, matches, features):
+        """Baut die Engine aus den aktuellsten Tabellenzeilen (laufende Saison) und der "matches"-Collection."""
+        columns = ["Spieltag", "home_team", "away_team"]
+        fixtures = pd.DataFrame(columns=columns)
+        if rows:
+            season = max(row["Season"] for row in rows.values())
+            rows = {team: row for team, row in rows.items() if row["Season"] == season}
+            if not matches.empty:
+                remaining = split_matches(matches)[1]
+                remaining = remaining[remaining["Season"] == season]
+                # Partien, deren Spieltag beide Teams laut Anzahl gespielter Spiele bereits erreicht
+                # haben, gelten als gespielt (nicht der Spieltag der Zeile: Seiten künftiger Spieltage
+                # zeigen teils schon die aktuelle Tabelle und sind nicht als Future markiert)
+                played = {team: row["Spiele"] for team, row in rows.items()}
+                reached = np.minimum(remaining["home_team"].map(played), remaining["away_team"].map(played))
+                remaining = remaining[~(remaining["Spieltag"] <= reached)]
+                fixtures = remaining.sort_values("Spieltag", kind="stable")[columns]
+        return cls(rows, fixtures, features)
+
+    def fixture_list(self):
+        """Offene Partien als Liste von Dictionaries (für die API)."""
+        return [
+            {"fixture": i, "spieltag": int(spieltag), "home_team": home, "away_team": away}
+            for i, (spieltag, home, away) in enumerate(
+                zip(self.fixtures["Spieltag"], self.fixtures["home_team"], self.fixtures["away_team"])
+            )
+        ]
+
+    def parse(self, results):
+        """
+        Prüft hypothetische Resultate und gibt ein Scenario zurück.
+
+        Jedes Resultat ist ein Dictionary mit home_goals, away_goals und entweder fixture
+        (Index aus fixture_list) oder home_team/away_team (volle Namen oder Kurznamen).
+        Ungültige Werte lösen ValueError, unbekannte Partien LookupError aus.
+        """
+        if not isinstance(results, list) or not results:
+            raise ValueError("'results' muss eine nicht-leere Liste von Resultaten sein.")
+        fixtures, home_goals, away_goals = [], [], []
+        for result in results:
+            if not isinstance(result, dict):
+                raise ValueError(f"Ungültiges Resultat: {result!r}")
+            if "fixture" in result:
+                fixture = result["fixture"]
+                if isinstance(fixture, bool) or not isinstance(fixture, int) or not 0 <= fixture < len(self.fixtures):
+                    raise LookupError(f"Partie nicht gefunden: {fixture!r}")
+            else:
+                pair = (full_team_name(result.get("home_team")), full_team_name(result.get("away_team")))
+                fixture = self.fixture_positions.get(pair)
+                if fixture is None:
+                    raise LookupError(f"Keine offene Partie {pair[0]} - {pair[1]} gefunden.")
+            goals = [result.get("home_goals"), result.get("away_goals")]
+            if any(isinstance(g, bool) or not isinstance(g, int) or not 0 <= g <= MAX_GOALS for g in goals):
+                raise ValueError(f"Tore müssen ganze Zahlen zwischen 0 und {MAX_GOALS} sein: {result!r}")
+            fixtures.append(fixture)
+            home_goals.append(goals[0])
+            away_goals.append(goals[1])
+        if len(set(fixtures)) != len(fixtures):
+            raise ValueError("Jede Partie darf nur einmal im Szenario vorkommen.")
+        return Scenario(fixtures, home_goals, away_goals)
+
+    def apply(self, scenario):
+        """Tabellenstand nach dem Szenario als Dictionary Spalte -> Array (eine Position pro Team)."""
+        n = len(self.teams)
+        home, away = self.home[scenario.fixtures], self.away[scenario.fixtures]
+        hg, ag = scenario.home_goals, scenario.away_goals
+        teams = np.concatenate([home, away])
+
+        def per_team(home_values, away_values):
+            return np.bincount(teams, np.concatenate([home_values, away_values]), minlength=n)
+
+        win, draw, loss = hg > ag, hg == ag, hg < ag
+        table = {
+            "G": self.base["G"] + per_team(win, loss),
+            "U": self.base["U"] + per_team(draw, draw),
+            "V": self.base["V"] + per_team(loss, win),
+            "Points": self.base["Points"] + per_team(3 * win + draw, 3 * loss + draw),
+            "Goal_Diff": self.base["Goal_Diff"] + per_team(hg - ag, ag - hg),
+        }
+        games = np.bincount(teams, minlength=n)
+        table["Spieltag"] = self.base["Spieltag"] + games
+        table["Restspiele"] = self.base["Restspiele"] - games
+        table["Estimated_Extra_Points"] = table["Restspiele"] * EXTRA_POINTS_PER_GAME
+        # Rang: Punkte, dann Tordifferenz, bei Gleichstand bleibt die bisherige Reihenfolge
+        order = np.lexsort((self.base["Rank"], -table["Goal_Diff"], -table["Points"]))
+        table["Rank"] = np.empty(n)
+        table["Rank"][order] = np.arange(1, n + 1)
+        return table
+
+    def evaluate(self, scenario, model, scaler, uncertainty=None):
+        """
+        Bewertet Ausgangsstand und Szenario in einem Modellaufruf.
+        Gibt (Tabelle nach dem Szenario, Wahrscheinlichkeiten vorher, Wahrscheinlichkeiten nachher,
+        Intervall) zurück. Mit uncertainty (UncertaintyModel) sind beide Wahrscheinlichkeiten
+        kalibriert und Intervall ist (unkalibriert nachher, untere Grenze, obere Grenze), sonst None.
+        """
+        table = self.apply(scenario)
+        n = len(self.teams)
+        X = np.vstack([self.X_base, np.column_stack([table[col] for col in self.features])])
+        probs = model.predict_proba(scaler.transform(X))[:, 1]
+        if uncertainty is None:
+            return table, probs[:n], probs[n:], None
+        calibrated, low, high = uncertainty.predict(probs, X)
+        return table, calibrated[:n], calibrated[n:], (probs[n:], low[n:], high[n:])
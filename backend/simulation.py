@@ -0,0 +1,321 @@
+"""
+simulation.py – Monte-Carlo-Simulation der Restsaison
+-----------------------------------------------------
+Die verbleibenden Spiele (Zeilen der "matches"-Collection mit home_goals == -1) werden
+n_sims-mal simuliert. Die Tore eines Spiels sind Poisson-verteilt; die Torraten werden
+aus den bisherigen Resultaten als Angriffs- und Abwehrstärke pro Team geschätzt.
+
+Alle Simulationen eines Blocks werden gemeinsam als NumPy-Matrizen (Simulation x Spiel)
+berechnet; es gibt keine Python-Schleife über einzelne Spiele oder Spieltage.
+"""
+import numpy as np
+import pandas as pd
+
+from teams import full_team_name
+
+
+class TeamStrengths:
+    """
+    Angriffs- und Abwehrstärke pro Team (multiplikativ, Mittelwert 1) sowie die
+    durchschnittlichen Torraten des Heim- bzw. Auswärtsteams.
+    """
+
+    def __init__(self, teams, attack, defense, mu_home, mu_away):
+        self.teams = list(teams)
+        self.attack = attack
+        self.defense = defense
+        self.mu_home = mu_home
+        self.mu_away = mu_away
+        self.positions = {team: i for i, team in enumerate(self.teams)}
+
+    def _lookup(self, values, names):
+        # Unbekannte Teams (z. B. Aufsteiger ohne Resultate) erhalten durchschnittliche Stärke
+        pos = np.array([self.positions.get(name, -1) for name in names], dtype=int)
+        return np.where(pos >= 0, values[np.maximum(pos, 0)], 1.0)
+
+    def goal_rates(self, home_teams, away_teams):
+        """Erwartete Tore (lambda) des Heim- und des Auswärtsteams pro Spiel."""
+        att_h, def_h = self._lookup(self.attack, home_teams), self._lookup(self.defense, home_teams)
+        att_a, def_a = self._lookup(self.attack, away_teams), self._lookup(self.defense, away_teams)
+        return self.mu_home * att_h * def_a, self.mu_away * att_a * def_h
+
+
+class SimulationResult:
+    """
+    Ergebnis einer Simulation.
+
+    summary:             DataFrame pro Team mit aktuellen und erwarteten Punkten sowie den
+                         Wahrscheinlichkeiten für Meistertitel, Barrage und Abstieg.
+    rank_probs:          Matrix (Team x Rang) der Wahrscheinlichkeiten für jeden Schlussrang.
+    points_distribution: Matrix (Team x Punkte) der Wahrscheinlichkeiten für die Schlusspunktzahl,
+                         beginnend bei points_offset Punkten.
+    """
+
+    def __init__(self, summary, rank_probs, points_distribution, points_offset, n_sims):
+        self.summary = summary
+        self.rank_probs = rank_probs
+        self.points_distribution = points_distribution
+        self.points_offset = points_offset
+        self.n_sims = n_sims
+        self.positions = {team: i for i, team in enumerate(summary["Team"])}
+
+    def team(self, team):
+        """Zusammenfassung eines Teams als Dictionary (None, falls unbekannt)."""
+        pos = self.positions.get(team)
+        if pos is None:
+            return None
+        return self.summary.iloc[pos].to_dict()
+
+    def to_dict(self):
+        """JSON-taugliche Darstellung inklusive Punkteverteilung pro Team."""
+        teams = []
+        for i, row in enumerate(self.summary.to_dict(orient="records")):
+            dist = self.points_distribution[i]
+            nonzero = np.nonzero(dist)[0]
+            row["Points_Distribution"] = {
+                int(p + self.points_offset): float(dist[p]) for p in nonzero
+            }
+            teams.append(row)
+        return {"n_sims": self.n_sims, "teams": teams}
+
+
+def split_matches(matches):
+    """Teilt die Spiele in gespielte (Tore >= 0) und verbleibende (home_goals == -1) auf."""
+    matches = matches.copy()
+    for col in ["home_goals", "away_goals"]:
+        matches[col] = pd.to_numeric(matches[col], errors="coerce").fillna(-1).astype(int)
+    matches["home_team"] = matches["home_team"].map(full_team_name)
+    matches["away_team"] = matches["away_team"].map(full_team_name)
+    remaining = matches["home_goals"] == -1
+    return matches[~remaining], matches[remaining]
+
+
+def fit_team_strengths(played, n_iter=25, prior_matches=5.0):
+    """
+    Schätzt Angriffs- und Abwehrstärken aus gespielten Partien (Poisson-Modell ohne Korrelation).
+
+    Die Stärken werden iterativ so bestimmt, dass die erwarteten Tore jedes Teams den
+    tatsächlich erzielten bzw. erhaltenen Toren entsprechen. prior_matches zieht Teams mit
+    wenigen Spielen in Richtung Durchschnitt (1.0).
+    """
+    codes, teams = pd.factorize(pd.concat([played["home_team"], played["away_team"]], ignore_index=True))
+    n = len(played)
+    n_teams = len(teams)
+    h, a = codes[:n], codes[n:]
+    hg = played["home_goals"].to_numpy(dtype=float)
+    ag = played["away_goals"].to_numpy(dtype=float)
+    if n == 0:
+        return TeamStrengths([], np.ones(0), np.ones(0), 1.5, 1.2)
+
+    mu_home, mu_away = hg.mean(), ag.mean()
+    prior = prior_matches * (mu_home + mu_away) / 2.0
+    scored = np.bincount(h, hg, n_teams) + np.bincount(a, ag, n_teams)
+    conceded = np.bincount(h, ag, n_teams) + np.bincount(a, hg, n_teams)
+    attack = np.ones(n_teams)
+    defense = np.ones(n_teams)
+    for _ in range(n_iter):
+        exp_scored = np.bincount(h, mu_home * defense[a], n_teams) + np.bincount(a, mu_away * defense[h], n_teams)
+        attack = (scored + prior) / (exp_scored + prior)
+        attack /= attack.mean()
+        exp_conceded = np.bincount(h, mu_away * attack[a], n_teams) + np.bincount(a, mu_home * attack[h], n_teams)
+        defense = (conceded + prior) / (exp_conceded + prior)
+        defense /= defense.mean()
+    return TeamStrengths(teams, attack, defense, mu_home, mu_away)
+
+
+def current_standings(played, teams):
+    """Punkte, Tordifferenz und erzielte Tore pro Team aus den gespielten Partien einer Saison."""
+    pos = {team: i for i, team in enumerate(teams)}
+    n_teams = len(teams)
+    h = played["home_team"].map(pos).to_numpy(dtype=int)
+    a = played["away_team"].map(pos).to_numpy(dtype=int)
+    hg = played["home_goals"].to_numpy(dtype=int)
+    ag = played["away_goals"].to_numpy(dtype=int)
+    home_pts = np.where(hg > ag, 3, np.where(hg == ag, 1, 0))
+    away_pts = np.where(ag > hg, 3, np.where(hg == ag, 1, 0))
+    points = np.bincount(h, home_pts, n_teams) + np.bincount(a, away_pts, n_teams)
+    goals_for = np.bincount(h, hg, n_teams) + np.bincount(a, ag, n_teams)
+    goals_against = np.bincount(h, ag, n_teams) + np.bincount(a, hg, n_teams)
+    return points.astype(int), (goals_for - goals_against).astype(int), goals_for.astype(int)
+
+
+def poisson_cdf_table(lam, tail=1e-9, max_goals=30):
+    """
+    Kumulierte Poisson-Verteilung pro Spiel (Zeile) für 0, 1, 2, ... Tore (Spalte),
+    so weit berechnet, bis die Restwahrscheinlichkeit aller Spiele unter tail liegt.
+    """
+    lam = np.asarray(lam, dtype=float)
+    pmf = np.exp(-lam)
+    cdf = [pmf]
+    for k in range(1, max_goals + 1):
+        if cdf[-1].min(initial=1.0) >= 1.0 - tail:
+            break
+        pmf = pmf * lam / k
+        cdf.append(cdf[-1] + pmf)
+    return np.stack(cdf, axis=1).astype(np.float32)
+
+
+def sample_goals(rng, cdf, size):
+    """
+    Zieht Tore per Inversionsmethode: Tore = Anzahl der CDF-Stufen unterhalb einer
+    gleichverteilten Zufallszahl. Schneller als Generator.poisson für kleine Raten.
+    Stufen, die keine Zufallszahl des Blocks erreicht, werden übersprungen.
+    """
+    u = rng.random((size, cdf.shape[0]), dtype=np.float32)
+    goals = np.zeros((size, cdf.shape[0]), dtype=np.int8)
+    top = u.max(axis=0)
+    for k in range(cdf.shape[1]):
+        if not (top >= cdf[:, k]).any():
+            break
+        goals += u >= cdf[:, k]
+    return goals
+
+
+def outcome_weights(home_idx, away_idx, n_teams):
+    """
+    Gewichte, mit denen ein Matrixprodukt aus den Spielausgängen aller Spiele Punkte,
+    Tordifferenz und erzielte Tore pro Team berechnet.
+
+    Zeilen: [Heimsieg | Remis | Heimtore | Auswärtstore] je Spiel (4 M),
+    Spalten: [Punkte | Tordifferenz | Tore] je Team (3 T). Eine Auswärtsniederlage ergibt sich
+    aus 1 - Heimsieg - Remis; deren 3 Punkte pro Auswärtsspiel stehen im konstanten Anteil.
+    Returns:
+        (weights, constant)
+    """
+    n_matches = len(home_idx)
+    home = np.zeros((n_matches, n_teams), dtype=np.float32)
+    away = np.zeros((n_matches, n_teams), dtype=np.float32)
+    home[np.arange(n_matches), home_idx] = 1.0
+    away[np.arange(n_matches), away_idx] = 1.0
+    diff = home - away
+    weights = np.zeros((4 * n_matches, 3 * n_teams), dtype=np.float32)
+    m, t = n_matches, n_teams
+    weights[:m, :t] = 3.0 * diff
+    weights[m:2 * m, :t] = home - 2.0 * away
+    weights[2 * m:3 * m, t:2 * t] = diff
+    weights[2 * m:3 * m, 2 * t:] = home
+    weights[3 * m:, t:2 * t] = -diff
+    weights[3 * m:, 2 * t:] = away
+    constant = np.zeros(3 * n_teams, dtype=np.float32)
+    constant[:t] = 3.0 * away.sum(axis=0)
+    return weights, constant
+
+
+def simulate_remaining(points, goal_diff, goals_for, home_idx, away_idx, lam_home, lam_away,
+                       n_sims=100_000, seed=None, max_block_cells=500_000):
+    """
+    Simuliert die verbleibenden Spiele n_sims-mal.
+
+    points, goal_diff, goals_for: aktueller Stand pro Team (Länge T).
+    home_idx, away_idx:           Teamindizes der verbleibenden Spiele (Länge M).
+    lam_home, lam_away:           erwartete Tore pro Spiel (Länge M).
+
+    Alle verbleibenden Spiele (über alle Spieltage) eines Blocks werden gemeinsam gezogen; ein
+    einziges Matrixprodukt mit outcome_weights liefert Punkte, Tordifferenz und Tore pro Team.
+    Die Blockgröße (Simulationen x Spiele <= max_block_cells) hält die Matrizen im Cache.
+
+    Returns:
+        (rank_counts, final_points_counts, points_offset)
+        rank_counts[t, r]: Anzahl Simulationen, in denen Team t auf Rang r+1 endet.
+        final_points_counts[t, p]: Anzahl Simulationen mit points_offset + p Schlusspunkten.
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(points)
+    n_matches = len(home_idx)
+    max_points = int(points.max(initial=0)) + 3 * n_matches
+    points_offset = int(points.min(initial=0))
+    n_bins = max_points - points_offset + 1
+
+    weights, constant = outcome_weights(home_idx, away_idx, n_teams)
+    cdf_home = poisson_cdf_table(lam_home)
+    cdf_away = poisson_cdf_table(lam_away)
+    current = np.concatenate([points, goal_diff, goals_for]).astype(np.int64)
+
+    rank_counts = np.zeros((n_teams, n_teams), dtype=np.int64)
+    points_counts = np.zeros((n_teams, n_bins), dtype=np.int64)
+    team_offsets = np.arange(n_teams)
+    block = max(1, max_block_cells // max(n_matches, 1))
+
+    done = 0
+    while done < n_sims:
+        size = min(block, n_sims - done)
+        done += size
+        final = np.broadcast_to(current, (size, 3 * n_teams)).copy()
+        if n_matches:
+            m = n_matches
+            hg = sample_goals(rng, cdf_home, size)
+            ag = sample_goals(rng, cdf_away, size)
+            outcomes = np.empty((size, 4 * m), dtype=np.float32)
+            margin = hg - ag
+            outcomes[:, :m] = margin > 0
+            outcomes[:, m:2 * m] = margin == 0
+            outcomes[:, 2 * m:3 * m] = hg
+            outcomes[:, 3 * m:] = ag
+            final += np.rint(outcomes @ weights + constant).astype(np.int64)
+        final_points = final[:, :n_teams]
+        final_diff = final[:, n_teams:2 * n_teams]
+        final_for = final[:, 2 * n_teams:]
+
+        # Rangfolge: Punkte, Tordifferenz, erzielte Tore, danach Zufall
+        key = (final_points * 2048 + (final_diff + 512)) * 2048 + np.minimum(final_for, 2047)
+        key = key + rng.random((size, n_teams))
+        order = np.argsort(-key, axis=1)
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.broadcast_to(team_offsets, order.shape), axis=1)
+
+        rank_counts += np.bincount(
+            (team_offsets * n_teams + ranks).ravel(), minlength=n_teams * n_teams
+        ).reshape(n_teams, n_teams)
+        points_counts += np.bincount(
+            (team_offsets * n_bins + (final_points - points_offset)).ravel(), minlength=n_teams * n_bins
+        ).reshape(n_teams, n_bins)
+    return rank_counts, points_counts, points_offset
+
+
+def simulate_season(matches, season=None, n_sims=100_000, seed=None, strengths=None):
+    """
+    Simuliert die Restsaison auf Basis der "matches"-Daten.
+
+    - season: zu simulierende Saison (Standard: aktuellste Saison).
+    - strengths: bereits geschätzte TeamStrengths; sonst aus allen gespielten Partien geschätzt.
+    Der Letzte steigt direkt ab, der Zweitletzte spielt die Barrage.
+    """
+    played, remaining = split_matches(matches)
+    if season is None:
+        season = matches["Season"].max()
+    if strengths is None:
+        strengths = fit_team_strengths(played)
+    played_season = played[played["Season"] == season]
+    remaining_season = remaining[remaining["Season"] == season]
+
+    season_teams = pd.concat([
+        played_season["home_team"], played_season["away_team"],
+        remaining_season["home_team"], remaining_season["away_team"],
+    ])
+    teams = list(pd.unique(season_teams))
+    points, goal_diff, goals_for = current_standings(played_season, teams)
+    pos = {team: i for i, team in enumerate(teams)}
+    home_idx = remaining_season["home_team"].map(pos).to_numpy(dtype=int)
+    away_idx = remaining_season["away_team"].map(pos).to_numpy(dtype=int)
+    lam_home, lam_away = strengths.goal_rates(remaining_season["home_team"], remaining_season["away_team"])
+
+    rank_counts, points_counts, points_offset = simulate_remaining(
+        points, goal_diff, goals_for, home_idx, away_idx, lam_home, lam_away, n_sims=n_sims, seed=seed
+    )
+    rank_probs = rank_counts / n_sims
+    points_distribution = points_counts / n_sims
+    bins = np.arange(points_counts.shape[1]) + points_offset
+    expected_points = points_distribution @ bins
+    n_teams = len(teams)
+    summary = pd.DataFrame({
+        "Team": teams,
+        "Points": points,
+        "Remaining_Games": np.bincount(home_idx, minlength=n_teams) + np.bincount(away_idx, minlength=n_teams),
+        "Expected_Points": expected_points,
+        "Expected_Extra_Points": expected_points - points,
+        "Expected_Rank": rank_probs @ np.arange(1, n_teams + 1),
+        "Title": rank_probs[:, 0],
+        "Playoff": rank_probs[:, n_teams - 2] if n_teams > 1 else 0.0,
+        "Relegation": rank_probs[:, n_teams - 1],
+    })
+    return SimulationResult(summary, rank_probs, points_distribution, points_offset, n_sims)
@@ -0,0 +1,128 @@
+"""
+team_index.py – Vorberechneter Index der aktuellsten Tabellenzeile pro Team
+----------------------------------------------------------------------------
+Beim Laden der Liga-Daten wird für jedes Team einmalig die Zeile des letzten
+gespielten Spieltags bestimmt und deren Feature-Vektor bereits mit dem Skalierer
+transformiert. Eine Vorhersage besteht danach nur noch aus einem Dictionary-Lookup
+und einem einzigen Aufruf von predict_proba.
+"""
+import numpy as np
+
+
+class TeamIndex:
+    """
+    Unveränderlicher Index: Team -> (aktuellste Tabellenzeile, skalierter Feature-Vektor).
+
+    rows:     Dictionary Team -> Dictionary der Spaltenwerte der aktuellsten Zeile.
+    X_scaled: Matrix (Anzahl Teams x Anzahl Features) in derselben Reihenfolge wie rows.
+    X:        dieselben Features unskaliert (z. B. für uncertainty.py).
+    """
+
+    def __init__(self, rows, X_scaled, X):
+        self.rows = rows
+        self.teams = list(rows)
+        self.X_scaled = X_scaled
+        self.X = X
+        self.positions = {team: i for i, team in enumerate(self.teams)}
+
+    def __contains__(self, team):
+        return team in self.positions
+
+    def __len__(self):
+        return len(self.teams)
+
+    def get(self, team):
+        """
+        Gibt (Tabellenzeile, skalierter Feature-Vektor der Form 1 x n) zurück,
+        oder None, falls das Team nicht im Index enthalten ist.
+        """
+        pos = self.positions.get(team)
+        if pos is None:
+            return None
+        return self.rows[team], self.X_scaled[pos:pos + 1]
+
+    def scaled(self, teams=None):
+        """Skalierte Feature-Vektoren (Anzahl Teams x n) in der Reihenfolge von teams (Standard: alle)."""
+        if teams is None:
+            return self.X_scaled
+        return self.X_scaled[[self.positions[team] for team in teams]]
+
+    def raw(self, teams=None):
+        """Unskalierte Feature-Vektoren (Anzahl Teams x n) in der Reihenfolge von teams (Standard: alle)."""
+        if teams is None:
+            return self.X
+        return self.X[[self.positions[team] for team in teams]]
+
+    def predict_proba(self, model, teams=None):
+        """
+        Abstiegswahrscheinlichkeiten für mehrere Teams in einem einzigen predict_proba-Aufruf.
+        Ohne Angabe von teams werden alle Teams des Index bewertet.
+        """
+        if teams is None:
+            teams = self.teams
+        if not teams:
+            return np.empty(0)
+        return model.predict_proba(self.scaled(teams))[:, 1]
+
+    def updated(self, new_rows, scaler, features):
+        """
+        Neuer Index, in dem die Teams aus new_rows (DataFrame neuer Tabellenzeilen) ihre
+        aktuellere oder korrigierte Zeile (gleicher Spieltag) erhalten; nur diese Zeilen werden skaliert. Unbekannte Teams werden
+        angehängt. Der bisherige Index bleibt unverändert (laufende Anfragen lesen ihn weiter).
+        """
+        updates = []
+        for row in latest_rows(new_rows).to_dict(orient="records"):
+            current = self.rows.get(row["Team"])
+            if current is None or (row["Season"], row["Spieltag"]) >= (current["Season"], current["Spieltag"]):
+                updates.append(row)
+        if not updates:
+            return self
+        rows = dict(self.rows)
+        rows.update((row["Team"], row) for row in updates)
+        X_scaled = np.zeros((len(rows), len(features)))
+        X_scaled[:len(self)] = self.X_scaled
+        X = np.zeros((len(rows), len(features)))
+        X[:len(self)] = self.X
+        changed = [{team: i for i, team in enumerate(rows)}[row["Team"]] for row in updates]
+        X[changed] = np.array([[row[f] for f in features] for row in updates], dtype=np.float64)
+        X_scaled[changed] = scaler.transform(X[changed])
+        return TeamIndex(rows, X_scaled, X)
+
+
+def latest_rows(league_df):
+    """
+    Liefert pro Team die Zeile des aktuellsten Spieltags (höchste Saison, dann höchster Spieltag).
+    """
+    latest = league_df.sort_values(by=["Season", "Spieltag"], kind="stable")
+    return latest.drop_duplicates(subset="Team", keep="last")
+
+
+def snapshot_rows(league_df, season=None, spieltag=None):
+    """
+    Schränkt den Liga-DataFrame auf einen Tabellenstand ein.
+      - season: Saison (Standard: aktuellste Saison, sobald ein Spieltag angegeben ist).
+      - spieltag: Spieltag innerhalb der Saison; ohne Angabe gilt der letzte Spieltag je Team.
+    Ohne beide Parameter bleibt der DataFrame unverändert.
+    """
+    if season is None and spieltag is None:
+        return league_df
+    if season is None:
+        season = league_df["Season"].max()
+    mask = league_df["Season"] == season
+    if spieltag is not None:
+        mask &= league_df["Spieltag"] == spieltag
+    return league_df[mask]
+
+
+def build_team_index(league_df, scaler, features):
+    """
+    Baut den TeamIndex einmalig aus dem vorbereiteten Liga-DataFrame auf.
+    Die Features aller Teams werden in einem einzigen scaler.transform-Aufruf skaliert.
+    """
+    latest = latest_rows(league_df)
+    if latest.empty:
+        return TeamIndex({}, np.empty((0, len(features))), np.empty((0, len(features))))
+    X = latest[features].to_numpy(dtype=np.float64)
+    X_scaled = scaler.transform(X)
+    rows = {row["Team"]: row for row in latest.to_dict(orient="records")}
+    return TeamIndex(rows, np.ascontiguousarray(X_scaled), X)
@@ -0,0 +1,27 @@
+"""
+teams.py – Zuordnung der Transfermarkt-Kurznamen zu den vollen Teamnamen
+------------------------------------------------------------------------
+In den Spielresultaten (Collection "matches") verwendet Transfermarkt Kurzbezeichnungen
+wie "GCZ" oder "FCSG", während die Liga-Tabelle die vollen Vereinsnamen enthält.
+"""
+
+TEAM_CODES = {
+    "BSC YB": "BSC Young Boys",
+    "FCB": "FC Basel",
+    "FCL": "FC Luzern",
+    "FCSG": "FC St. Gallen",
+    "FCW": "FC Winterthur",
+    "FCZ": "FC Zürich",
+    "FC SLO": "FC Stade-Lausanne-Ouchy",
+    "GCZ": "Grasshoppers",
+    "LS": "Lausanne-Sport",
+    "Lugano": "FC Lugano",
+    "SFC": "Servette FC",
+    "Sion": "FC Sion",
+    "YS FC": "Yverdon Sport",
+}
+
+
+def full_team_name(name):
+    """Liefert den vollen Teamnamen; bereits volle oder unbekannte Namen bleiben unverändert."""
+    return TEAM_CODES.get(name, name)
@@ -0,0 +1,230 @@
+"""
+uncertainty.py – Kalibrierte Wahrscheinlichkeiten und Bootstrap-Intervalle
+---------------------------------------------------------------------------
+Mit class_weight="balanced" trainierte Modelle überschätzen die Abstiegswahrscheinlichkeit
+systematisch. model_generator.py legt daher zu jeder Version ein zusätzliches Artefakt ab
+(best_model.uncertainty, hochgeladen als model-<n>.uncertainty, Format wie compact_model.py):
+  - calibration:        monotone Abbildung der Modellwahrscheinlichkeit auf eine kalibrierte
+                        (isotonic oder platt), gefittet auf den Out-of-Fold-Wahrscheinlichkeiten
+                        der saisonweisen Kreuzvalidierung,
+  - Bootstrap-Ensemble: B logistische Regressionen, jeweils auf einer Bootstrap-Stichprobe der
+                        Trainingszeilen gefittet, samt eigener Kalibrierung (member_calibration).
+
+Das Artefakt enthält Mittelwert und Standardabweichung des StandardScalers, mit dem die
+Mitglieder gefittet wurden, und erwartet unskalierte Features (TeamIndex.raw). Es ist damit
+unabhängig davon, ob das Modell als Pickle oder kompakt (Skalierung in die Koeffizienten
+verrechnet) geladen wird. Die Koeffizienten der Mitglieder bilden eine Matrix (Features x B);
+ein Intervall für beliebig viele Teams kostet damit eine Matrixmultiplikation und eine
+Quantilberechnung statt B Modellaufrufe.
+
+Das Ensemble besteht immer aus logistischen Regressionen, auch wenn ein anderes Modell
+ausgeliefert wird. Das Intervall wird daher um die kalibrierte Wahrscheinlichkeit des
+ausgelieferten Modells zentriert: Die Quantile der (kalibrierten) Mitglieder werden im
+Logit-Raum um die Differenz zwischen dieser Wahrscheinlichkeit und dem Median des Ensembles
+verschoben. Die Breite stammt so aus dem Ensemble, die Lage vom Modell, und die ausgelieferte
+Wahrscheinlichkeit liegt immer im Intervall.
+
+Training (nur in model_generator.py): fit_calibrator, fit_bootstrap_ensemble, export_uncertainty.
+"""
+import os
+
+import numpy as np
+
+from compact_model import read_arrays, write_arrays
+
+PREDICTION_INTERVAL = float(os.getenv("PREDICTION_INTERVAL", "0.9"))
+CALIBRATION_METHODS = ("isotonic", "platt")
+# Abstand von 0 und 1, damit der Logit bei Platt endlich bleibt
+_EPS = 1e-12
+
+
+def _logit(p):
+    p = np.clip(np.asarray(p, dtype=np.float64), _EPS, 1.0 - _EPS)
+    return np.log(p / (1.0 - p))
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+class Calibrator:
+    """
+    Monotone Kalibrierung roher Wahrscheinlichkeiten.
+
+    isotonic: stückweise linear zwischen den Stützstellen (x, y), außerhalb konstant.
+    platt:    sigmoid(a * logit(p) + b), params = [a, b].
+    none:     unverändert.
+    """
+
+    def __init__(self, method, x=None, y=None, params=None):
+        self.method = method
+        self.x = x
+        self.y = y
+        self.params = params
+
+    def __call__(self, p):
+        if self.method == "isotonic":
+            return np.interp(p, self.x, self.y)
+        if self.method == "platt":
+            return _sigmoid(self.params[0] * _logit(p) + self.params[1])
+        return np.asarray(p, dtype=np.float64)
+
+    def arrays(self, prefix):
+        if self.method == "isotonic":
+            return {f"{prefix}_x": np.asarray(self.x, dtype=np.float64), f"{prefix}_y": np.asarray(self.y, dtype=np.float64)}
+        if self.method == "platt":
+            return {f"{prefix}_params": np.asarray(self.params, dtype=np.float64)}
+        return {}
+
+    @classmethod
+    def from_arrays(cls, method, arrays, prefix):
+        return cls(method, arrays.get(f"{prefix}_x"), arrays.get(f"{prefix}_y"), arrays.get(f"{prefix}_params"))
+
+
+class UncertaintyModel:
+    """Kalibrierung der Modellwahrscheinlichkeit und gestapeltes Bootstrap-Ensemble einer Version."""
+
+    def __init__(self, calibration, member_calibration, mean, scale, coef, intercept, level=PREDICTION_INTERVAL):
+        self.calibration = calibration
+        self.member_calibration = member_calibration
+        self.mean = mean
+        self.scale = scale
+        self.coef = coef
+        self.intercept = intercept
+        self.level = level
+
+    @property
+    def members(self):
+        return len(self.intercept)
+
+    def member_proba(self, X):
+        """Wahrscheinlichkeiten aller Mitglieder (Zeilen x Mitglieder) für unskalierte Features X."""
+        X_scaled = (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+        return _sigmoid(X_scaled @ self.coef + self.intercept)
+
+    def interval(self, calibrated, X):
+        """
+        Intervallgrenzen (low, high) zum Niveau level um die kalibrierten Wahrscheinlichkeiten
+        calibrated; X sind die unskalierten Features derselben Zeilen.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return np.empty(0), np.empty(0)
+        tail = (1.0 - self.level) / 2.0
+        member_logit = _logit(self.member_calibration(self.member_proba(X)))
+        low, median, high = np.quantile(member_logit, [tail, 0.5, 1.0 - tail], axis=1)
+        shift = _logit(calibrated) - median
+        # Minimum/Maximum nur gegen Rundung an den Rändern (Logit bei 0 bzw. 1 abgeschnitten)
+        return np.minimum(_sigmoid(low + shift), calibrated), np.maximum(_sigmoid(high + shift), calibrated)
+
+    def predict(self, proba, X):
+        """
+        Gibt (kalibrierte Wahrscheinlichkeit, untere Grenze, obere Grenze) zurück; proba ist die
+        Modellwahrscheinlichkeit, X die unskalierten Features derselben Zeilen.
+        """
+        calibrated = self.calibration(np.asarray(proba, dtype=np.float64))
+        low, high = self.interval(calibrated, X)
+        return calibrated, low, high
+
+    def summary(self):
+        return {
+            "calibration": self.calibration.method,
+            "member_calibration": self.member_calibration.method,
+            "members": self.members,
+            "level": self.level,
+        }
+
+
+def load_uncertainty(path, level=PREDICTION_INTERVAL):
+    """Lädt ein Artefakt aus export_uncertainty (Arrays per Memory-Map)."""
+    kind, arrays, meta = read_arrays(path)
+    if kind != "uncertainty":
+        raise ValueError(f"'{path}' ist kein Unsicherheits-Artefakt (Art '{kind}')!")
+    return UncertaintyModel(
+        Calibrator.from_arrays(meta["calibration"], arrays, "calibration"),
+        Calibrator.from_arrays(meta["member_calibration"], arrays, "member_calibration"),
+        arrays["mean"], arrays["scale"], arrays["coef"], arrays["intercept"], level,
+    )
+
+
+def export_uncertainty(path, calibration, member_calibration, scaler, coef, intercept):
+    """
+    Schreibt Kalibrierungen, Mittelwert und Standardabweichung von scaler (StandardScaler der
+    Mitglieder) und die Ensemble-Koeffizienten (Features x Mitglieder) nach path.
+    """
+    arrays = {
+        "mean": np.asarray(scaler.mean_, dtype=np.float64),
+        "scale": np.asarray(scaler.scale_, dtype=np.float64),
+        "coef": np.asarray(coef, dtype=np.float64),
+        "intercept": np.asarray(intercept, dtype=np.float64),
+    }
+    arrays.update(calibration.arrays("calibration"))
+    arrays.update(member_calibration.arrays("member_calibration"))
+    write_arrays(path, "uncertainty", arrays,
+                 calibration=calibration.method, member_calibration=member_calibration.method)
+    return path
+
+
+def _fit_method(method, proba, y):
+    from sklearn.isotonic import IsotonicRegression
+    from sklearn.linear_model import LogisticRegression
+
+    if method == "isotonic":
+        iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip").fit(proba, y)
+        return Calibrator("isotonic", iso.X_thresholds_, iso.y_thresholds_)
+    platt = LogisticRegression(C=1e6, max_iter=1000).fit(_logit(proba).reshape(-1, 1), y)
+    return Calibrator("platt", params=[float(platt.coef_[0, 0]), float(platt.intercept_[0])])
+
+
+def _held_out(method, proba, y, groups, folds):
+    """Kalibrierte Wahrscheinlichkeiten, wobei jede Saison in folds ohne sich selbst kalibriert wird."""
+    calibrated = proba.copy()
+    if method != "none":
+        for group in folds:
+            held_out = groups == group
+            calibrated[held_out] = _fit_method(method, proba[~held_out], y[~held_out])(proba[held_out])
+    return calibrated
+
+
+def fit_calibrator(proba, y, groups, methods=CALIBRATION_METHODS):
+    """
+    Wählt die Kalibrierung mit dem kleinsten Brier Score und fittet sie auf allen Zeilen.
+
+    proba sind Out-of-Fold-Wahrscheinlichkeiten; bewertet wird, indem die Kalibrierung jeweils
+    ohne eine Saison (groups) gefittet und auf dieser geprüft wird. Saisons, ohne die nur eine
+    Klasse übrig bleibt, werden übersprungen; bleibt keine übrig, wird auf allen Zeilen bewertet.
+    Gibt (Calibrator, Brier Score pro Methode inklusive "none") zurück.
+    """
+    proba, y, groups = np.asarray(proba, dtype=np.float64), np.asarray(y), np.asarray(groups)
+    folds = [group for group in np.unique(groups) if len(np.unique(y[groups != group])) == 2]
+    evaluated = np.isin(groups, folds) if folds else np.ones(len(y), dtype=bool)
+    scores = {}
+    for method in ("none",) + tuple(methods):
+        if folds:
+            calibrated = _held_out(method, proba, y, groups, folds)
+        else:
+            calibrated = proba if method == "none" else _fit_method(method, proba, y)(proba)
+        scores[method] = float(np.mean((calibrated[evaluated] - y[evaluated]) ** 2))
+    best = min(scores, key=scores.get)
+    calibrator = Calibrator("none") if best == "none" else _fit_method(best, proba, y)
+    return calibrator, scores
+
+
+def fit_bootstrap_ensemble(X_scaled, y, make_model, members=200, seed=42):
+    """
+    Fittet members Modelle aus make_model() (logistische Regression) auf Bootstrap-Stichproben
+    der Zeilen von X_scaled (mit dem an export_uncertainty übergebenen Skalierer transformiert);
+    Stichproben mit nur einer Klasse werden neu gezogen. Gibt die Koeffizienten (Features x
+    Mitglieder) und Achsenabschnitte zurück.
+    """
+    X_scaled, y = np.asarray(X_scaled, dtype=np.float64), np.asarray(y)
+    rng = np.random.default_rng(seed)
+    coef, intercept = [], []
+    while len(coef) < members:
+        sample = rng.integers(0, len(X_scaled), len(X_scaled))
+        if len(np.unique(y[sample])) < 2:
+            continue
+        model = make_model().fit(X_scaled[sample], y[sample])
+        coef.append(np.asarray(model.coef_, dtype=np.float64)[0])
+        intercept.append(float(model.intercept_[0]))
+    return np.column_stack(coef), np.array(intercept)
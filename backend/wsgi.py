@@ -0,0 +1,21 @@
+"""
+wsgi.py – Einstiegspunkt für den Produktivbetrieb mit Gunicorn
+---------------------------------------------------------------
+Mit preload_app (siehe gunicorn.conf.py) wird dieses Modul einmal im Master-Prozess importiert:
+MongoDB-Daten, Feature-Store, Modell und Skalierer werden nur dort geladen. Die Worker entstehen
+per fork und teilen sich diese Speicherseiten copy-on-write.
+
+gc.freeze() verschiebt alle bis dahin erzeugten Objekte in eine permanente Generation, damit
+der Garbage Collector der Worker diese Seiten nicht anfasst (und damit nicht kopiert).
+Die Threads für neue Modellversionen und neue Spieltage werden erst im Worker gestartet
+(post_fork), da Threads ein fork nicht überleben.
+
+Aufruf (aus dem Projektverzeichnis):
+    gunicorn --config backend/gunicorn.conf.py wsgi:app
+"""
+import gc
+
+from app import create_app
+
+app = create_app(start_watcher=False)
+gc.freeze()
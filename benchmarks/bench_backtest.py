@@ -0,0 +1,74 @@
+"""
+bench_backtest.py – Walk-forward-Backtest: Neu-Fit pro Spieltag vs. inkrementell und parallel
+---------------------------------------------------------------------------------------------
+Spielt die letzten --replay Saisons einer synthetischen Liga Spieltag für Spieltag durch:
+  - cold:        pro Tabellenstand neuer StandardScaler und neue logistische Regression, seriell,
+  - incremental: model/backtest.run_backtest (partial_fit des Skalierers, warm_start,
+                 zusammenhängende Blöcke im Prozess-Pool mit --workers Prozessen).
+Ausgegeben werden Laufzeit sowie mittlerer Brier Score und Log-Loss beider Varianten.
+
+Aufruf:
+    python benchmarks/bench_backtest.py --seasons 12 --replay 2 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import brier_score_loss, log_loss
+from sklearn.preprocessing import StandardScaler
+
+from synthetic import FEATURES, generate_league, prepare_league_df
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "model"))
+from backtest import final_relegation, run_backtest
+
+
+def cold_backtest(df, seasons):
+    """Referenz: jeder Tabellenstand wird mit frisch gefittetem Skalierer und Modell bewertet."""
+    df = df.sort_values(["Season", "Spieltag"], kind="stable").reset_index(drop=True)
+    row_keys = (df["Season"] * 1000 + df["Spieltag"]).to_numpy()
+    X = df[FEATURES].to_numpy(dtype=float)
+    y = df["relegated"].to_numpy()
+    final = final_relegation(df)
+    scores = []
+    for key in np.unique(row_keys[df["Season"].isin(seasons).to_numpy()]):
+        train_end, test_end = np.searchsorted(row_keys, [key, key + 1])
+        scaler = StandardScaler().fit(X[:train_end])
+        model = LogisticRegression(max_iter=1000, class_weight="balanced")
+        model.fit(scaler.transform(X[:train_end]), y[:train_end])
+        proba = model.predict_proba(scaler.transform(X[train_end:test_end]))[:, 1]
+        y_true = final[train_end:test_end]
+        scores.append([brier_score_loss(y_true, proba), log_loss(y_true, proba, labels=[0, 1])])
+    return np.array(scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, default=12, help="Saisons der synthetischen Liga")
+    parser.add_argument("--replay", type=int, default=2, help="Anzahl der durchgespielten letzten Saisons")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    df = prepare_league_df(generate_league(n_seasons=args.seasons)[0])
+    seasons = [int(s) for s in sorted(df["Season"].unique())[-args.replay:]]
+    print(f"{len(df)} Zeilen, Backtest der Saisons {seasons}")
+
+    start = time.perf_counter()
+    cold = cold_backtest(df, seasons)
+    cold_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = run_backtest(df, seasons, "logreg", args.workers)
+    incremental_s = time.perf_counter() - start
+
+    print(f"{'Variante':<14}{'Stände':>8}{'Laufzeit [s]':>14}{'Brier':>10}{'Log-Loss':>10}")
+    print(f"{'cold':<14}{len(cold):>8}{cold_s:>14.2f}{cold[:, 0].mean():>10.4f}{cold[:, 1].mean():>10.4f}")
+    print(f"{'incremental':<14}{len(results):>8}{incremental_s:>14.2f}"
+          f"{results['brier'].mean():>10.4f}{results['log_loss'].mean():>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+bench_compact_model.py – joblib-Pickle vs. kompaktes Inferenz-Artefakt
+-----------------------------------------------------------------------
+Trainiert auf synthetischen Daten eine logistische Regression und einen Random Forest,
+speichert jeweils Modell und Skalierer mit joblib sowie als kompaktes Artefakt
+(compact_model.export_compact) und vergleicht:
+  - Dateigröße,
+  - Ladezeit (joblib.load von Modell und Skalierer vs. load_compact),
+  - Latenz pro Aufruf (transform + predict_proba für alle Teams eines Spieltags),
+  - maximale Abweichung der Wahrscheinlichkeiten.
+
+Aufruf:
+    python benchmarks/bench_compact_model.py --seasons 12 --calls 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from synthetic import FEATURES, generate_league, percentiles, prepare_league_df
+from compact_model import export_compact, load_compact
+
+
+def candidates():
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+
+    return {
+        "Logistic Regression": LogisticRegression(max_iter=1000, class_weight="balanced"),
+        "Random Forest": RandomForestClassifier(random_state=42, class_weight="balanced"),
+    }
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def call_latencies(model, scaler, X, calls):
+    latencies = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        model.predict_proba(scaler.transform(X))
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+def main():
+    from sklearn.preprocessing import StandardScaler
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, default=12)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5, help="Wiederholungen der Ladezeitmessung")
+    args = parser.parse_args()
+
+    league_df = prepare_league_df(generate_league(n_seasons=args.seasons)[0])
+    X, y = league_df[FEATURES], league_df["relegated"]
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    # Ein Tabellenstand: alle Teams eines Spieltags
+    X_call = X.iloc[:12]
+
+    print(f"{len(X)} Trainingszeilen, {args.calls} Aufrufe mit {len(X_call)} Teams")
+    header = f"{'Modell':<22}{'Format':<9}{'Größe [KB]':>12}{'Laden [ms]':>12}{'p50 [ms]':>10}{'p99 [ms]':>10}"
+    print(header)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, model in candidates().items():
+            model.fit(X_scaled, y)
+            model_path = os.path.join(directory, "model.pkl")
+            scaler_path = os.path.join(directory, "scaler.pkl")
+            compact_path = os.path.join(directory, "model.compact")
+            joblib.dump(model, model_path)
+            joblib.dump(scaler, scaler_path)
+            export_compact(model, scaler, compact_path, X_check=X)
+
+            joblib_size = os.path.getsize(model_path) + os.path.getsize(scaler_path)
+            joblib_load = best_of(lambda: (joblib.load(model_path), joblib.load(scaler_path)), args.repeat)
+            compact_load = best_of(lambda: load_compact(compact_path), args.repeat)
+
+            compact_model, compact_scaler = load_compact(compact_path)
+            rows = [
+                ("joblib", joblib_size, joblib_load, call_latencies(model, scaler, X_call, args.calls)),
+                ("compact", os.path.getsize(compact_path), compact_load,
+                 call_latencies(compact_model, compact_scaler, X_call, args.calls)),
+            ]
+            for fmt, size, load, latencies in rows:
+                p50, p99 = percentiles(latencies)
+                print(f"{name:<22}{fmt:<9}{size / 1024:>12.1f}{load * 1000:>12.3f}{p50:>10.3f}{p99:>10.3f}")
+            deviation = np.abs(
+                model.predict_proba(scaler.transform(X))[:, 1]
+                - compact_model.predict_proba(compact_scaler.transform(X))[:, 1]
+            ).max()
+            print(f"{'':<22}max. Abweichung predict_proba: {deviation:.2e}")
+
+
+if __name__ == "__main__":
+    main()
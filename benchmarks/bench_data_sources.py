@@ -0,0 +1,104 @@
+"""
+bench_data_sources.py – Ladezeit und Speicherbedarf der Datenquellen (data_source.py)
+-------------------------------------------------------------------------------------
+Erzeugt eine synthetische Liga (Standard 20 Saisons), schreibt sie im Format des Spiders als
+CSV, wandelt sie mit convert_csv_to_parquet in Parquet um und befüllt eine MongoDB-Collection
+(ohne --mongodb-uri mongomock, die Daten liegen dann im selben Prozess). Verglichen werden:
+  - csv (untypisiert): pd.read_csv ohne Typangaben, wie bisher im Backtest,
+  - mongo, csv, parquet: league_table() und matches() der jeweiligen Datenquelle.
+Ausgegeben werden die beste Ladezeit aus --repeat Durchläufen (jeweils mit neuer Quelle) und
+der Speicherbedarf der geladenen DataFrames (memory_usage(deep=True)).
+
+Aufruf:
+    python benchmarks/bench_data_sources.py --seasons 20 --repeat 5
+    python benchmarks/bench_data_sources.py --mongodb-uri mongodb://localhost:27017
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from synthetic import generate_league
+import data_source
+from data_source import (
+    LEAGUE_CSV, MATCHES_CSV, CsvDataSource, MongoDataSource, ParquetDataSource, convert_csv_to_parquet,
+)
+
+DB_NAME = "bench-data-sources"
+
+
+def mongo_source(mongodb_uri, df_league, df_matches):
+    """MongoDataSource auf einer frisch befüllten Datenbank (echte MongoDB oder mongomock)."""
+    if not mongodb_uri:
+        import mongomock
+
+        client = mongomock.MongoClient()
+        data_source.MongoClient = lambda uri: client
+        mongodb_uri = "mongodb://mongomock"
+    source = MongoDataSource(mongodb_uri, DB_NAME)
+    source.db["league-tables"].drop()
+    source.db["matches"].drop()
+    source.db["league-tables"].insert_many(df_league.to_dict("records"))
+    source.db["matches"].insert_many(df_matches.to_dict("records"))
+    return lambda: MongoDataSource(mongodb_uri, DB_NAME)
+
+
+def load_untyped(directory):
+    league = pd.read_csv(os.path.join(directory, LEAGUE_CSV))
+    return league[league["Future"] == False], pd.read_csv(os.path.join(directory, MATCHES_CSV))
+
+
+def load_source(make_source):
+    source = make_source()
+    try:
+        return source.league_table(), source.matches()
+    finally:
+        source.close()
+
+
+def measure(load, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = load()
+        best = min(best, time.perf_counter() - start)
+    return best, frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, default=20)
+    parser.add_argument("--future-from", type=int, default=30, help="erster zukünftiger Spieltag der letzten Saison")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mongodb-uri", help="echte MongoDB statt mongomock")
+    args = parser.parse_args()
+
+    df_league, df_matches = generate_league(n_seasons=args.seasons, future_from=args.future_from)
+    with tempfile.TemporaryDirectory() as directory:
+        df_league.to_csv(os.path.join(directory, LEAGUE_CSV), index=False)
+        df_matches.to_csv(os.path.join(directory, MATCHES_CSV), index=False)
+        convert_csv_to_parquet(directory, directory)
+        sizes = {name: os.path.getsize(os.path.join(directory, name)) / 1024 for name in os.listdir(directory)}
+
+        backends = {
+            "csv (untypisiert)": lambda: load_untyped(directory),
+            "mongo": lambda: load_source(make_mongo),
+            "csv": lambda: load_source(lambda: CsvDataSource(directory)),
+            "parquet": lambda: load_source(lambda: ParquetDataSource(directory)),
+        }
+        make_mongo = mongo_source(args.mongodb_uri, df_league, df_matches)
+
+        print(f"{args.seasons} Saisons, {len(df_league)} Tabellenzeilen, {len(df_matches)} Partien, "
+              f"{'MongoDB' if args.mongodb_uri else 'mongomock'}")
+        print("Dateigrößen: " + ", ".join(f"{name} {kb:.0f} KB" for name, kb in sorted(sizes.items())))
+        print(f"{'Quelle':<20}{'Zeit [ms]':>12}{'Tabelle [KB]':>14}{'Partien [KB]':>14}")
+        for name, load in backends.items():
+            seconds, (league, matches) = measure(load, args.repeat)
+            print(f"{name:<20}{seconds * 1000:>12.1f}"
+                  f"{league.memory_usage(deep=True).sum() / 1024:>14.0f}{matches.memory_usage(deep=True).sum() / 1024:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+bench_fetcher.py – Seitenabruf des Spiders: Browser pro Spieltag vs. PageFetcher-Pool
+-------------------------------------------------------------------------------------
+Die Spieltagsseiten werden aus den CSV-Exporten gerendert und über einen lokalen
+HTTP-Server (FixtureServer) ausgeliefert. Verglichen werden:
+  - bisheriges Verfahren: neuer Browser pro Spieltag, feste Wartezeit, serieller Abruf
+  - PageFetcher: wiederverwendete Browser, Warten auf table.items, parallele Worker
+
+Standardmäßig wird StaticPageDriver verwendet (kein Chrome nötig); mit --chrome werden
+echte Headless-Chrome-Instanzen gestartet (CHROMEDRIVER_PATH muss gesetzt sein).
+
+Aufruf:
+    python benchmarks/bench_fetcher.py --pages 20 --workers 4 --latency 0.2 --sleep 1
+"""
+import argparse
+import tempfile
+import time
+
+from fixtures import FixtureServer, StaticPageDriver, load_raw_data, write_fixtures
+from fetcher import PageFetcher, create_driver, page_url
+from transfermarkt_spider import parse_page
+
+
+def fetch_serial_relaunch(pages, base_url, driver_factory, sleep):
+    """Bisheriges Verfahren aus get_table_and_match_results."""
+    results = []
+    for season, spieltag in pages:
+        driver = driver_factory()
+        driver.get(page_url(season, spieltag, base_url))
+        time.sleep(sleep)
+        results.append(driver.page_source)
+        driver.quit()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Anfragen pro Sekunde (0 = unbegrenzt)")
+    parser.add_argument("--latency", type=float, default=0.2, help="simulierte Serverlatenz in Sekunden")
+    parser.add_argument("--sleep", type=float, default=1.0, help="feste Wartezeit des bisherigen Verfahrens")
+    parser.add_argument("--chrome", action="store_true", help="echten Headless-Chrome verwenden")
+    args = parser.parse_args()
+
+    driver_factory = create_driver if args.chrome else StaticPageDriver
+    df_league, df_matches = load_raw_data()
+    with tempfile.TemporaryDirectory() as directory:
+        write_fixtures(directory, df_league, df_matches)
+        pages = list(df_league[["Season", "Spieltag"]].drop_duplicates().itertuples(index=False, name=None))
+        pages = [(int(s), int(d)) for s, d in pages[:args.pages]]
+
+        with FixtureServer(directory, latency=args.latency) as server:
+            start = time.perf_counter()
+            old = fetch_serial_relaunch(pages, server.base_url, driver_factory, args.sleep)
+            old_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with PageFetcher(workers=args.workers, rate_limit=args.rate_limit, base_url=server.base_url,
+                             driver_factory=driver_factory) as fetcher:
+                new = [html for _, _, html in fetcher.fetch_many(pages)]
+            new_s = time.perf_counter() - start
+
+    identical = all(
+        parse_page(a, s, d)[0] == parse_page(b, s, d)[0] for a, b, (s, d) in zip(old, new, pages)
+    )
+    print(f"{len(pages)} Seiten, Latenz {args.latency}s, Treiber: {'Chrome' if args.chrome else 'StaticPageDriver'}")
+    print(f"Browser pro Spieltag (seriell, {args.sleep}s Wartezeit): {old_s:8.2f} s")
+    print(f"PageFetcher ({args.workers} Worker):                     {new_s:8.2f} s")
+    print(f"Speedup: {old_s / new_s:.1f}x, identische Tabellen: {identical}")
+
+
+if __name__ == "__main__":
+    main()
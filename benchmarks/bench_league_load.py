@@ -0,0 +1,115 @@
+"""
+bench_league_load.py – Laden der Liga-Daten: find() ohne Filter vs. projizierte Blöcke
+---------------------------------------------------------------------------------------
+Befüllt eine Collection mit synthetischen Tabellen (Standard 20 Saisons, die letzte Saison
+ab --future-from als Future) und vergleicht:
+  - bisheriger Pfad:  find() ohne Filter/Projektion, DataFrame(list(cursor)), Filter in pandas
+  - league_data:      Future-Filter und Projektion in MongoDB, Blöcke in typisierte Spalten
+  - latest:           Aggregation mit der aktuellsten Zeile pro Team
+
+Jeder Pfad läuft in einem eigenen Prozess; gemessen werden Ladezeit und der Anstieg des
+Spitzen-RSS (ru_maxrss) gegenüber dem Zustand direkt vor dem Laden.
+Ohne --mongodb-uri wird mongomock verwendet (die Daten liegen dann im selben Prozess).
+
+Aufruf:
+    python benchmarks/bench_league_load.py --seasons 20
+    python benchmarks/bench_league_load.py --mongodb-uri mongodb://localhost:27017 --seasons 20
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from synthetic import generate_league
+
+DB_NAME = "bench-league-load"
+
+
+def peak_rss_mb():
+    # ru_maxrss ist unter Linux in KB angegeben
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def get_collection(mongodb_uri, seasons, future_from):
+    """Collection mit synthetischen Daten; bei einer echten MongoDB nur befüllt, falls leer."""
+    if mongodb_uri:
+        from pymongo import MongoClient
+
+        collection = MongoClient(mongodb_uri)[DB_NAME]["league-tables"]
+    else:
+        import mongomock
+
+        collection = mongomock.MongoClient()[DB_NAME]["league-tables"]
+    if collection.estimated_document_count() == 0:
+        df_league, _ = generate_league(n_seasons=seasons, future_from=future_from)
+        collection.insert_many(df_league.to_dict("records"))
+    return collection
+
+
+def load_find_all(collection):
+    """Bisheriger Pfad aus load_league_data / model_generator.py."""
+    import pandas as pd
+
+    df = pd.DataFrame(list(collection.find()))
+    if '_id' in df.columns:
+        df.drop('_id', axis=1, inplace=True)
+    numeric_cols = ['Spieltag', 'Rank', 'Spiele', 'G', 'U', 'V', 'Tore', 'Goal_Diff', 'Points']
+    for col in numeric_cols:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df.fillna(-1, inplace=True)
+    return df[df['Future'] == False].copy()
+
+
+def load_projected(collection):
+    from features import build_features
+    from league_data import league_query, load_league_table
+
+    return build_features(load_league_table(collection, league_query(future=False)))
+
+
+def load_latest(collection):
+    from features import build_features
+    from league_data import load_latest_rows
+
+    return build_features(load_latest_rows(collection))
+
+
+PATHS = {"find() + pandas": load_find_all, "league_data": load_projected, "latest (Aggregation)": load_latest}
+
+
+def run_single(path, mongodb_uri, seasons, future_from):
+    collection = get_collection(mongodb_uri, seasons, future_from)
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    df = PATHS[path](collection)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "rss_mb": peak_rss_mb() - before, "rows": len(df)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, default=20)
+    parser.add_argument("--future-from", type=int, default=30, help="erster zukünftiger Spieltag der letzten Saison")
+    parser.add_argument("--mongodb-uri", help="echte MongoDB statt mongomock")
+    parser.add_argument("--single", choices=list(PATHS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        run_single(args.single, args.mongodb_uri, args.seasons, args.future_from)
+        return
+
+    print(f"{args.seasons} Saisons, {'MongoDB' if args.mongodb_uri else 'mongomock'}")
+    print(f"{'Pfad':<24}{'Zeilen':>8}{'Zeit [s]':>10}{'Δ Spitzen-RSS [MB]':>20}")
+    for path in PATHS:
+        cmd = [sys.executable, __file__, "--single", path, "--seasons", str(args.seasons),
+               "--future-from", str(args.future_from)]
+        if args.mongodb_uri:
+            cmd += ["--mongodb-uri", args.mongodb_uri]
+        result = json.loads(subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.splitlines()[-1])
+        print(f"{path:<24}{result['rows']:>8}{result['seconds']:>10.3f}{result['rss_mb']:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
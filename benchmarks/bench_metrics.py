@@ -0,0 +1,103 @@
+"""
+bench_metrics.py – Mehraufwand der Instrumentierung (metrics.py)
+----------------------------------------------------------------
+Misst:
+  - ns pro Aufruf für eine leere Schleife, stage() ausgeschaltet (METRICS_ENABLED=0) und
+    stage() eingeschaltet,
+  - µs pro Anfrage an eine minimale Flask-App (Test-Client) ohne Hooks, mit ausgeschalteten
+    und mit eingeschalteten Metriken,
+  - die Dauer eines /metrics-Abrufs (render) mit typisch vielen Histogrammen.
+
+Aufruf:
+    python benchmarks/bench_metrics.py --calls 200000 --requests 5000
+"""
+import argparse
+import time
+
+from flask import Flask
+
+import synthetic  # noqa: F401  (ergänzt sys.path um backend/)
+from metrics import Metrics, instrument
+
+
+def per_call_ns(fn, calls):
+    start = time.perf_counter()
+    fn(calls)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def bare_loop(calls):
+    for _ in range(calls):
+        pass
+
+
+def stage_loop(metrics):
+    def run(calls):
+        stage = metrics.stage
+        for _ in range(calls):
+            with stage("predict_proba"):
+                pass
+    return run
+
+
+def flask_app(metrics):
+    app = Flask(__name__)
+
+    @app.route("/")
+    def index():
+        with metrics.stage("render_template"):
+            return "ok"
+
+    if metrics is not None:
+        instrument(app, metrics)
+    return app
+
+
+def per_request_us(app, requests):
+    client = app.test_client()
+    for _ in range(100):
+        client.get("/")
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get("/")
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'stage()':<22}{'ns/Aufruf':>12}")
+    for label, fn in [
+        ("leere Schleife", bare_loop),
+        ("ausgeschaltet", stage_loop(Metrics(enabled=False))),
+        ("eingeschaltet", stage_loop(Metrics(enabled=True))),
+    ]:
+        print(f"{label:<22}{per_call_ns(fn, args.calls):>12.0f}")
+
+    disabled = Metrics(enabled=False)
+    baseline = Flask(__name__)
+    baseline.add_url_rule("/", "index", lambda: "ok")
+    print(f"\n{'Flask-Anfrage':<22}{'µs/Anfrage':>12}")
+    for label, app in [
+        ("ohne Hooks", baseline),
+        ("ausgeschaltet", flask_app(disabled)),
+        ("eingeschaltet", flask_app(Metrics(enabled=True))),
+    ]:
+        print(f"{label:<22}{per_request_us(app, args.requests):>12.1f}")
+
+    metrics = Metrics(enabled=True)
+    for i in range(10):
+        for _ in range(100):
+            with metrics.stage(f"stage_{i}"):
+                pass
+            metrics.observe_request(f"endpoint_{i}", "GET", 200, 0.001)
+    start = time.perf_counter()
+    body = metrics.render()
+    print(f"\n/metrics mit 20 Histogrammen: {(time.perf_counter() - start) * 1000:.2f} ms, {len(body)} Bytes")
+
+
+if __name__ == "__main__":
+    main()
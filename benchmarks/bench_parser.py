@@ -0,0 +1,64 @@
+"""
+bench_parser.py – Seiten pro Sekunde der Parser-Backends (BeautifulSoup vs. lxml)
+----------------------------------------------------------------------------------
+Parst alle aus den CSV-Exporten gerenderten Spieltagsseiten mit beiden Backends von
+parse_page_data, prüft, dass Tabellenzeilen und Spielresultate identisch sind, und
+misst den Durchsatz.
+
+Aufruf:
+    python benchmarks/bench_parser.py --repeat 3
+    python benchmarks/bench_parser.py --fixtures-dir data/page_fixtures
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import time
+
+from fixtures import iter_pages, load_raw_data
+from transfermarkt_spider import parse_page_data
+
+
+def load_pages(fixtures_dir=None):
+    """Liefert (season, spieltag, html); aus fixtures_dir (<saison>_<spieltag>.html) oder frisch gerendert."""
+    if not fixtures_dir:
+        return list(iter_pages(*load_raw_data()))
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*_*.html"))):
+        season, spieltag = os.path.basename(path)[:-len(".html")].split("_")
+        with open(path, encoding="utf-8") as f:
+            pages.append((int(season), int(spieltag), f.read()))
+    return pages
+
+
+def parse_all(pages, backend):
+    # Die Statusausgaben des Spiders werden während der Messung unterdrückt
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [parse_page_data(html, season, spieltag, backend) for season, spieltag, html in pages]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fixtures-dir", help="Ordner mit gespeicherten Seiten (sonst aus data/*.csv gerendert)")
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures_dir)
+    size_kb = sum(len(html) for _, _, html in pages) / len(pages) / 1024
+    results = {}
+    print(f"{len(pages)} Seiten, durchschnittlich {size_kb:.0f} KB")
+    print(f"{'Backend':<10}{'Seiten/s':>12}{'ms/Seite':>12}")
+    for backend in ["bs4", "lxml"]:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results[backend] = parse_all(pages, backend)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{backend:<10}{len(pages) / best:>12.1f}{best / len(pages) * 1000:>12.2f}")
+    print("Identische Ausgabe:", results["bs4"] == results["lxml"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+bench_predict_index.py – Latenz von /predict: DataFrame-Scan vs. vorberechneter TeamIndex
+------------------------------------------------------------------------------------------
+Vergleicht p50/p99 der bisherigen Vorhersage (Maske über league_df, Sortierung, iloc[0],
+scaler.transform) mit dem Lookup im TeamIndex auf einer synthetischen Liga.
+
+Aufruf:
+    python benchmarks/bench_predict_index.py --seasons 12 --requests 2000
+"""
+import argparse
+import time
+import warnings
+
+from synthetic import FEATURES, TEAMS, fit_model_and_scaler, generate_league, percentiles, prepare_league_df
+from team_index import build_team_index
+
+
+def predict_old(league_df, model, scaler, team):
+    team_data = league_df[league_df['Team'] == team]
+    team_data = team_data.sort_values(by="Spieltag", ascending=False).iloc[0]
+    X_input = team_data[FEATURES].values.reshape(1, -1)
+    return model.predict_proba(scaler.transform(X_input))[0][1]
+
+
+def predict_new(team_index, model, team):
+    _, X_scaled = team_index.get(team)
+    return model.predict_proba(X_scaled)[0][1]
+
+
+def measure(fn, n_requests):
+    samples = []
+    for i in range(n_requests):
+        team = TEAMS[i % len(TEAMS)]
+        start = time.perf_counter()
+        fn(team)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, default=12)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    df_league, _ = generate_league(n_seasons=args.seasons)
+    league_df = prepare_league_df(df_league)
+    model, scaler = fit_model_and_scaler(league_df)
+
+    start = time.perf_counter()
+    team_index = build_team_index(league_df, scaler, FEATURES)
+    build_ms = (time.perf_counter() - start) * 1000.0
+
+    old = measure(lambda team: predict_old(league_df, model, scaler, team), args.requests)
+    new = measure(lambda team: predict_new(team_index, model, team), args.requests)
+
+    print(f"Synthetische Liga: {args.seasons} Saisons, {len(league_df)} Zeilen, {args.requests} Anfragen")
+    print(f"Aufbau TeamIndex: {build_ms:.2f} ms (einmalig)")
+    print(f"{'Pfad':<20}{'p50 [ms]':>12}{'p99 [ms]':>12}")
+    print(f"{'DataFrame-Scan':<20}{old[0]:>12.3f}{old[1]:>12.3f}")
+    print(f"{'TeamIndex':<20}{new[0]:>12.3f}{new[1]:>12.3f}")
+    print(f"Speedup p50: {old[0] / new[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+bench_serving.py – Lasttest für /predict: Flask-Entwicklungsserver vs. Gunicorn
+--------------------------------------------------------------------------------
+Schickt mit --concurrency parallelen Clients (je eine Keep-Alive-Verbindung) Anfragen an
+einen laufenden Server und misst Anfragen pro Sekunde sowie p50/p95/p99-Latenz.
+
+Mit --start startet das Skript den Server selbst (MONGODB_URI und Modellquelle müssen wie für
+den normalen Betrieb gesetzt sein):
+  - dev:      flask run (bisheriger Docker-Befehl, ein Prozess)
+  - gunicorn: gunicorn --config backend/gunicorn.conf.py wsgi:app (WEB_CONCURRENCY, GUNICORN_THREADS)
+
+Der Antwort-Cache lässt sich für den Test mit RESPONSE_CACHE_SIZE=0 abschalten; dann wird
+jede Vorhersage neu berechnet und gerendert.
+
+Aufruf:
+    python benchmarks/bench_serving.py --start dev --requests 2000 --concurrency 16
+    WEB_CONCURRENCY=4 python benchmarks/bench_serving.py --start gunicorn --requests 2000 --concurrency 16
+    python benchmarks/bench_serving.py --url http://localhost:5000 --requests 2000
+"""
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_TEAMS = ["FC Basel", "BSC Young Boys", "FC Zürich", "Grasshoppers", "FC Sion", "Servette FC"]
+
+
+def server_command(mode, port):
+    if mode == "dev":
+        return [sys.executable, "-m", "flask", "--app", "backend/app.py", "run", "--port", str(port), "--no-reload"]
+    return [sys.executable, "-m", "gunicorn", "--config", "backend/gunicorn.conf.py", "wsgi:app"]
+
+
+def start_server(mode, port, timeout=300):
+    env = dict(os.environ, PORT=str(port))
+    process = subprocess.Popen(server_command(mode, port), cwd=ROOT_DIR, env=env)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server ({mode}) wurde beendet (Code {process.returncode}).")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=2):
+                return process
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise TimeoutError(f"Server ({mode}) nicht innerhalb von {timeout}s erreichbar.")
+
+
+def run_load(url, path, teams, n_requests, concurrency):
+    """Liefert (Dauer in s, Latenzen in ms, Fehler, Cache-Treffer)."""
+    parsed = urllib.parse.urlparse(url)
+    counter = iter(range(n_requests))
+    lock = threading.Lock()
+    latencies, errors, hits = [], [0], [0]
+
+    def client():
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+        local = []
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            body = urllib.parse.urlencode({"team": teams[i % len(teams)]})
+            start = time.perf_counter()
+            try:
+                conn.request("POST", path, body, {"Content-Type": "application/x-www-form-urlencoded"})
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+                hit = response.getheader("X-Cache") == "HIT"
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+                ok, hit = False, False
+            local.append((time.perf_counter() - start) * 1000)
+            with lock:
+                errors[0] += not ok
+                hits[0] += hit
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    return time.perf_counter() - start, np.array(latencies), errors[0], hits[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--start", choices=["dev", "gunicorn"], help="Server selbst starten")
+    parser.add_argument("--path", default="/predict")
+    parser.add_argument("--teams", default=",".join(DEFAULT_TEAMS), help="kommagetrennt, werden reihum angefragt")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+
+    teams = [t.strip() for t in args.teams.split(",") if t.strip()]
+    process = None
+    url = args.url
+    if args.start:
+        port = urllib.parse.urlparse(args.url).port or 5000
+        process = start_server(args.start, port)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        run_load(url, args.path, teams, args.warmup, min(args.concurrency, args.warmup))
+        elapsed, latencies, errors, hits = run_load(url, args.path, teams, args.requests, args.concurrency)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"Modus: {args.start or url}, {args.requests} Anfragen, {args.concurrency} parallel")
+    print(f"Anfragen/s: {args.requests / elapsed:8.1f}")
+    print(f"Latenz p50/p95/p99 [ms]: {p50:.2f} / {p95:.2f} / {p99:.2f}")
+    print(f"Fehler: {errors}, Cache-Treffer: {hits}")
+
+
+if __name__ == "__main__":
+    main()
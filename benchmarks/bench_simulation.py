@@ -0,0 +1,47 @@
+"""
+bench_simulation.py – Durchsatz der Monte-Carlo-Simulation der Restsaison
+-------------------------------------------------------------------------
+Misst Laufzeit und Simulationen pro Sekunde von simulate_season für unterschiedlich
+viele verbleibende Spieltage auf synthetischen Spieldaten.
+
+Aufruf:
+    python benchmarks/bench_simulation.py --sims 100000 --repeat 3
+"""
+import argparse
+import time
+
+import numpy as np
+
+from synthetic import generate_league
+from simulation import fit_team_strengths, simulate_season, split_matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sims", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--remaining", type=int, nargs="+", default=[2, 5, 10, 38],
+                        help="Anzahl verbleibender Spieltage der aktuellen Saison")
+    args = parser.parse_args()
+
+    print(f"{'Restspieltage':>14}{'Spiele':>8}{'Zeit [ms]':>12}{'Sims/s':>14}")
+    for remaining in args.remaining:
+        _, df_matches = generate_league(n_seasons=3, future_from=38 - remaining + 1)
+        strengths = fit_team_strengths(split_matches(df_matches)[0])
+        n_fixtures = int((df_matches["home_goals"] == -1).sum())
+        timings = []
+        for r in range(args.repeat):
+            start = time.perf_counter()
+            simulate_season(df_matches, n_sims=args.sims, seed=r, strengths=strengths)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{remaining:>14}{n_fixtures:>8}{best * 1000:>12.1f}{args.sims / best:>14,.0f}")
+
+    # Gleicher Seed -> identisches Ergebnis
+    a = simulate_season(df_matches, n_sims=10_000, seed=7, strengths=strengths)
+    b = simulate_season(df_matches, n_sims=10_000, seed=7, strengths=strengths)
+    print("Reproduzierbar mit Seed:", bool(np.array_equal(a.rank_probs, b.rank_probs)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+bench_uncertainty.py – Kosten der Kalibrierung und Bootstrap-Intervalle pro Anfrage (uncertainty.py)
+----------------------------------------------------------------------------------------------------
+Trainiert auf synthetischen Daten eine logistische Regression, wählt die Kalibrierung auf
+saisonweisen Out-of-Fold-Wahrscheinlichkeiten (fit_calibrator) und fittet ein Bootstrap-Ensemble
+mit --members Mitgliedern. Verglichen wird die Latenz für alle Teams eines Spieltags:
+  - nur predict_proba (Punktvorhersage wie bisher),
+  - B einzelne predict_proba-Aufrufe der Mitglieder plus Quantile,
+  - UncertaintyModel.predict (eine Matrixmultiplikation, Quantile, Kalibrierung),
+sowie die maximale Abweichung der beiden Intervallberechnungen und der Brier Score (Out-of-Fold)
+vor und nach der Kalibrierung.
+
+Aufruf:
+    python benchmarks/bench_uncertainty.py --seasons 12 --members 200 --calls 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from synthetic import FEATURES, generate_league, percentiles, prepare_league_df
+from uncertainty import (
+    PREDICTION_INTERVAL, export_uncertainty, fit_bootstrap_ensemble, fit_calibrator, load_uncertainty,
+)
+
+
+def latencies(fn, calls):
+    samples = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    return samples
+
+
+def member_models(X_scaled, y, members, seed):
+    """Dieselben Bootstrap-Stichproben wie fit_bootstrap_ensemble, aber als einzelne Modelle."""
+    from sklearn.linear_model import LogisticRegression
+
+    rng = np.random.default_rng(seed)
+    models = []
+    while len(models) < members:
+        sample = rng.integers(0, len(X_scaled), len(X_scaled))
+        if len(np.unique(y[sample])) < 2:
+            continue
+        models.append(LogisticRegression(max_iter=1000, class_weight="balanced").fit(X_scaled[sample], y[sample]))
+    return models
+
+
+def main():
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import GroupKFold, cross_val_predict
+    from sklearn.preprocessing import StandardScaler
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, default=12)
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    league_df = prepare_league_df(generate_league(n_seasons=args.seasons)[0])
+    X, y, groups = league_df[FEATURES], league_df["relegated"].to_numpy(), league_df["Season"].to_numpy()
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    make_model = lambda: LogisticRegression(max_iter=1000, class_weight="balanced")
+    model = make_model().fit(X_scaled, y)
+
+    proba = cross_val_predict(make_model(), X_scaled, y, groups=groups, cv=GroupKFold(5), method="predict_proba")[:, 1]
+    start = time.perf_counter()
+    calibration, scores = fit_calibrator(proba, y, groups)
+    calibration_s = time.perf_counter() - start
+    start = time.perf_counter()
+    coef, intercept = fit_bootstrap_ensemble(X_scaled, y, make_model, members=args.members, seed=args.seed)
+    ensemble_s = time.perf_counter() - start
+    models = member_models(X_scaled, y, args.members, args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = export_uncertainty(
+            os.path.join(directory, "model.uncertainty"), calibration, calibration, scaler, coef, intercept,
+        )
+        size = os.path.getsize(path)
+        uncertainty = load_uncertainty(path)
+
+        # Ein Tabellenstand: alle Teams eines Spieltags (skaliert für die Modelle, roh für das Ensemble)
+        X_call = X_scaled[:12]
+        X_raw = X.to_numpy(dtype=np.float64)[:12]
+        tail = (1.0 - PREDICTION_INTERVAL) / 2.0
+
+        def separate():
+            member_proba = np.column_stack([m.predict_proba(X_call)[:, 1] for m in models])
+            return np.quantile(member_proba, [tail, 1.0 - tail], axis=1)
+
+        def stacked():
+            return uncertainty.predict(model.predict_proba(X_call)[:, 1], X_raw)
+
+        print(f"{len(X)} Trainingszeilen, {args.members} Mitglieder, Artefakt {size / 1024:.1f} KB, "
+              f"{len(X_call)} Teams pro Aufruf")
+        print(f"Fit: Kalibrierung {calibration_s:.2f}s, Ensemble {ensemble_s:.2f}s")
+        print("Brier Score (Out-of-Fold, je Saison kalibriert): "
+              + ", ".join(f"{method} {score:.4f}" for method, score in scores.items())
+              + f" -> gewählt: {calibration.method}")
+        print(f"{'Variante':<34}{'p50 [ms]':>10}{'p99 [ms]':>10}")
+        for label, fn in [
+            ("nur predict_proba", lambda: model.predict_proba(X_call)),
+            (f"{args.members} Aufrufe + Quantile", separate),
+            ("gestapelt (UncertaintyModel)", stacked),
+        ]:
+            p50, p99 = percentiles(latencies(fn, args.calls))
+            print(f"{label:<34}{p50:>10.3f}{p99:>10.3f}")
+
+        low, high = separate()
+        stacked_low, stacked_high = np.quantile(uncertainty.member_proba(X_raw), [tail, 1.0 - tail], axis=1)
+        deviation = max(np.abs(low - stacked_low).max(), np.abs(high - stacked_high).max())
+        print(f"max. Abweichung der Intervallgrenzen (unkalibriert): {deviation:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+fixtures.py – Gespeicherte Transfermarkt-Seiten für Offline-Läufe des Spiders
+------------------------------------------------------------------------------
+- render_page erzeugt aus Tabellen- und Spieldaten eine Spieltagsseite mit derselben
+  Struktur wie Transfermarkt (Datumslinks, div.responsive-table mit den Resultaten,
+  table.items mit der Tabelle) plus Navigations-Ballast in realistischer Größe.
+- write_fixtures legt die Seiten als <saison>_<spieltag>.html in einem Ordner ab.
+- FixtureServer liefert diese Seiten über einen lokalen HTTP-Server unter derselben URL
+  wie Transfermarkt aus (TRANSFERMARKT_BASE_URL bzw. base_url des PageFetchers).
+- StaticPageDriver ist ein minimaler WebDriver-Ersatz für statische Seiten (ohne Chrome).
+"""
+import os
+import sys
+import threading
+import time
+import urllib.request
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+SPIDER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "spider")
+if SPIDER_DIR not in sys.path:
+    sys.path.insert(0, SPIDER_DIR)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+
+def _cell(value, cls=""):
+    attr = f' class="{cls}"' if cls else ""
+    return f"<td{attr}>{escape(str(value))}</td>"
+
+
+def render_page(season, spieltag, league_rows, match_rows, date, filler_links=600):
+    """
+    Rendert eine Spieltagsseite.
+
+    league_rows: DataFrame-Zeilen der Tabelle (Rank, Team, Spiele, G, U, V, Tore, Goal_Diff, Points)
+    match_rows:  DataFrame-Zeilen der Spiele (time, home_rank, home_team, home_goals, away_goals, away_rank, away_team)
+    date:        Datum des Spieltags im Format dd.mm.yyyy
+    """
+    nav = "".join(
+        f'<li><a href="/verein/startseite/verein/{i}">Verein {i}</a><span class="info">Info {i}</span></li>'
+        for i in range(filler_links)
+    )
+    match_html = []
+    for time_str, group in match_rows.groupby("time", sort=False):
+        match_html.append(
+            f'<tr class="bg_blau_20"><td colspan="11">Sa., {date} {escape(str(time_str))} Uhr</td></tr>'
+        )
+        for _, m in group.iterrows():
+            result = "-:-" if m["home_goals"] == -1 else f'{m["home_goals"]}:{m["away_goals"]}'
+            match_html.append(
+                "<tr>" + _cell("") + _cell("") + _cell("")
+                + f'<td class="rechts"><span class="tabellenplatz">({m["home_rank"]}.)</span> '
+                f'<a href="/verein/{escape(str(m["home_team"]))}">{escape(str(m["home_team"]))}</a></td>'
+                + _cell("") + _cell("")
+                + f'<td class="zentriert"><a class="ergebnis-link" href="/spielbericht/1">{result}</a></td>'
+                + _cell("")
+                + f'<td class="links"><a href="/verein/{escape(str(m["away_team"]))}">{escape(str(m["away_team"]))}</a> '
+                f'<span class="tabellenplatz">({m["away_rank"]}.)</span></td>'
+                + _cell("") + _cell("") + "</tr>"
+            )
+    table_html = []
+    for _, r in league_rows.iterrows():
+        table_html.append(
+            "<tr>" + _cell(r["Rank"], "rechts hauptlink")
+            + '<td class="zentriert"><img src="/wappen.png" alt=""></td>'
+            + f'<td class="no-border-links hauptlink"><a href="/verein/{escape(str(r["Team"]))}">{escape(str(r["Team"]))}</a></td>'
+            + _cell(r["Spiele"], "zentriert") + _cell(r["G"], "zentriert") + _cell(r["U"], "zentriert")
+            + _cell(r["V"], "zentriert") + _cell(r["Tore"], "zentriert") + _cell(r["Goal_Diff"], "zentriert")
+            + _cell(r["Points"], "zentriert") + "</tr>"
+        )
+    return f"""<!DOCTYPE html>
+<html lang="de"><head><meta charset="utf-8"><title>Super League {season} Spieltag {spieltag}</title></head>
+<body>
+<header><nav><ul>{nav}</ul></nav></header>
+<div class="box">
+  <div class="table-header">{spieltag}. Spieltag
+    <a href="/aktuell/waspassiertheute/aktuell/new/datum/{date}">{date}</a>
+  </div>
+  <div class="responsive-table"><table><tbody>{''.join(match_html)}</tbody></table></div>
+</div>
+<div class="box">
+  <table class="items"><thead><tr><th>#</th><th></th><th>Verein</th><th>Sp.</th><th>S</th><th>U</th>
+  <th>N</th><th>Tore</th><th>+/-</th><th>Pkt.</th></tr></thead>
+  <tbody>{''.join(table_html)}</tbody></table>
+</div>
+<footer><ul>{nav}</ul></footer>
+</body></html>"""
+
+
+def load_raw_data(data_dir=DATA_DIR):
+    """Liest die exportierten CSV-Dateien des Spiders (Tabelle und Spiele) ein."""
+    df_league = pd.read_csv(os.path.join(data_dir, "df_league_table_raw.csv"), keep_default_na=False)
+    df_matches = pd.read_csv(os.path.join(data_dir, "df_matches_raw.csv"), keep_default_na=False)
+    return df_league, df_matches
+
+
+def iter_pages(df_league, df_matches):
+    """Liefert (season, spieltag, html) für alle Spieltage der übergebenen Daten."""
+    matches_by_day = dict(tuple(df_matches.groupby(["Season", "Spieltag"])))
+    for (season, spieltag), league_rows in df_league.groupby(["Season", "Spieltag"]):
+        match_rows = matches_by_day.get((season, spieltag), df_matches.iloc[:0])
+        date = match_rows["date"].iloc[0] if len(match_rows) else f"01.01.{season + 1}"
+        yield int(season), int(spieltag), render_page(season, spieltag, league_rows, match_rows, date)
+
+
+def fixture_filename(season, spieltag):
+    return f"{season}_{spieltag}.html"
+
+
+def write_fixtures(directory, df_league=None, df_matches=None):
+    """Schreibt alle Spieltagsseiten als HTML-Dateien in directory und gibt deren Anzahl zurück."""
+    if df_league is None or df_matches is None:
+        df_league, df_matches = load_raw_data()
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for season, spieltag, html in iter_pages(df_league, df_matches):
+        with open(os.path.join(directory, fixture_filename(season, spieltag)), "w", encoding="utf-8") as f:
+            f.write(html)
+        count += 1
+    return count
+
+
+class FixtureServer:
+    """
+    Lokaler HTTP-Server, der /super-league/spieltagtabelle/...?saison_id=..&spieltag=.. aus
+    einem Fixture-Ordner beantwortet. latency simuliert die Antwortzeit von Transfermarkt.
+
+        with FixtureServer(directory, latency=0.2) as server:
+            PageFetcher(base_url=server.base_url, ...)
+    """
+
+    def __init__(self, directory, latency=0.0):
+        self.directory = directory
+        self.latency = latency
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                name = fixture_filename(query.get("saison_id", [""])[0], query.get("spieltag", [""])[0])
+                path = os.path.join(server.directory, name)
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if not os.path.exists(path):
+                    self.send_error(404)
+                    return
+                with open(path, "rb") as f:
+                    body = f.read()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class StaticPageDriver:
+    """
+    Minimaler Ersatz für einen Selenium-WebDriver bei statischen Seiten: lädt die URL per
+    urllib und unterstützt die im PageFetcher verwendeten Aufrufe (get, page_source,
+    find_element für "table.items", quit).
+    """
+
+    def __init__(self):
+        self.page_source = ""
+
+    def get(self, url):
+        with urllib.request.urlopen(url) as response:
+            self.page_source = response.read().decode("utf-8")
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+
+        tag, _, cls = value.partition(".")
+        if f'<{tag} class="{cls}"' not in self.page_source:
+            raise NoSuchElementException(value)
+        return True
+
+    def quit(self):
+        self.page_source = ""
@@ -0,0 +1,131 @@
+"""
+synthetic.py – Synthetische Liga-Daten für Benchmarks
+------------------------------------------------------
+Erzeugt Tabellen- und Spieldaten im gleichen Format wie der Transfermarkt-Spider
+(Spalten von df_league_table und df_matches), jedoch für beliebig viele Saisons.
+Damit lassen sich Laufzeiten unabhängig von MongoDB und Transfermarkt messen.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Die Benchmarks verwenden die Module des Backends direkt
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+TEAMS = [
+    "BSC Young Boys", "FC Basel", "FC Lugano", "FC Luzern", "FC Sion", "FC St. Gallen",
+    "FC Winterthur", "FC Zürich", "Grasshoppers", "Lausanne-Sport", "Servette FC", "Yverdon Sport",
+]
+LEAGUE_COLUMNS = ["Season", "Spieltag", "Future", "Rank", "Team", "Spiele", "G", "U", "V", "Tore", "Goal_Diff", "Points"]
+MATCH_COLUMNS = ["Season", "Spieltag", "date", "time", "home_rank", "home_team", "home_goals", "away_goals", "away_rank", "away_team"]
+FEATURES = ['Points', 'Goal_Diff', 'G', 'U', 'V', 'Restspiele', 'Estimated_Extra_Points']
+
+
+def round_robin(n_teams):
+    """Spielplan nach der Kreismethode: Liste von Runden mit (Heim, Auswärts)-Indizes."""
+    order = list(range(n_teams))
+    rounds = []
+    for r in range(n_teams - 1):
+        pairs = []
+        for i in range(n_teams // 2):
+            a, b = order[i], order[n_teams - 1 - i]
+            pairs.append((a, b) if r % 2 == 0 else (b, a))
+        rounds.append(pairs)
+        order = [order[0]] + [order[-1]] + order[1:-1]
+    return rounds
+
+
+def generate_league(n_seasons=12, n_spieltage=38, start_season=2010, future_from=None, seed=0):
+    """
+    Simuliert n_seasons Saisons mit Poisson-verteilten Toren.
+
+    future_from: Spieltag der letzten Saison, ab dem die Zeilen als Future markiert werden
+                 (Ergebnisfelder leer bzw. Tore -1 wie im Spider).
+    Returns:
+        (df_league_table, df_matches) im Rohformat des Spiders.
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(TEAMS)
+    base_rounds = round_robin(n_teams)
+    league_rows = []
+    match_rows = []
+    for s in range(n_seasons):
+        season = start_season + s
+        strength = rng.normal(0.0, 0.35, n_teams)
+        stats = np.zeros((n_teams, 5), dtype=int)  # G, U, V, Tore, Gegentore
+        ranks = np.arange(1, n_teams + 1)
+        last_season = s == n_seasons - 1
+        for spieltag in range(1, n_spieltage + 1):
+            future = bool(last_season and future_from is not None and spieltag >= future_from)
+            pairs = base_rounds[(spieltag - 1) % len(base_rounds)]
+            if (spieltag - 1) // len(base_rounds) % 2 == 1:
+                pairs = [(b, a) for a, b in pairs]
+            for home, away in pairs:
+                if future:
+                    hg, ag = -1, -1
+                else:
+                    hg = int(rng.poisson(np.exp(0.35 + strength[home] - strength[away])))
+                    ag = int(rng.poisson(np.exp(0.1 + strength[away] - strength[home])))
+                    stats[home, 3] += hg
+                    stats[home, 4] += ag
+                    stats[away, 3] += ag
+                    stats[away, 4] += hg
+                    if hg > ag:
+                        stats[home, 0] += 1
+                        stats[away, 2] += 1
+                    elif hg < ag:
+                        stats[away, 0] += 1
+                        stats[home, 2] += 1
+                    else:
+                        stats[home, 1] += 1
+                        stats[away, 1] += 1
+                match_rows.append([
+                    season, spieltag, f"01.01.{season + 1}", "18:00", int(ranks[home]), TEAMS[home],
+                    hg, ag, int(ranks[away]), TEAMS[away],
+                ])
+            points = stats[:, 0] * 3 + stats[:, 1]
+            diff = stats[:, 3] - stats[:, 4]
+            order = np.lexsort((-stats[:, 3], -diff, -points))
+            ranks[order] = np.arange(1, n_teams + 1)
+            for t in order:
+                g, u, v, gf, ga = (int(x) for x in stats[t])
+                if future:
+                    tore, goal_diff, pts = "", "", ""
+                else:
+                    tore, goal_diff, pts = f"{gf}:{ga}", gf - ga, g * 3 + u
+                league_rows.append([
+                    season, spieltag, future, int(ranks[t]), TEAMS[t], g + u + v, g, u, v, tore, goal_diff, pts,
+                ])
+    df_league = pd.DataFrame(league_rows, columns=LEAGUE_COLUMNS)
+    df_matches = pd.DataFrame(match_rows, columns=MATCH_COLUMNS)
+    return df_league, df_matches
+
+
+def prepare_league_df(df):
+    """Gleiche Vorbereitung wie im Backend (features.build_features)."""
+    from features import build_features
+
+    return build_features(df)
+
+
+def fit_model_and_scaler(league_df):
+    """Trainiert eine logistische Regression samt StandardScaler auf den vorbereiteten Daten."""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    X = league_df[FEATURES]
+    y = league_df['relegated']
+    scaler = StandardScaler()
+    model = LogisticRegression(max_iter=1000, class_weight='balanced')
+    model.fit(scaler.fit_transform(X), y)
+    return model, scaler
+
+
+def percentiles(samples_s):
+    """p50/p99 einer Liste von Laufzeiten in Sekunden, umgerechnet in Millisekunden."""
+    arr = np.asarray(samples_s) * 1000.0
+    return float(np.percentile(arr, 50)), float(np.percentile(arr, 99))
@@ -0,0 +1,157 @@
+"""
+backtest.py – Walk-forward-Backtest über alle historischen Spieltage
+---------------------------------------------------------------------
+Für jeden Tabellenstand (Season, Spieltag) wird ein Modell nur mit Zeilen trainiert, die zu
+diesem Zeitpunkt bekannt waren (alle früheren Spieltage, auch der laufenden Saison, mit der
+Zielvariable relegated wie in model_generator.py). Anschließend wird für jedes Team dieses
+Tabellenstands der Abstieg am Saisonende (Rang 11 oder 12 am letzten Spieltag) vorhergesagt
+und pro Spieltag mit Brier Score und Log-Loss bewertet. Bewertet werden nur abgeschlossene
+Saisons (letzter Spieltag = SEASON_LENGTH).
+
+Die Tabellenstände bilden eine aufsteigende Folge; das Trainingsset wächst von einem zum
+nächsten nur um die Zeilen eines Spieltags. Die Folge wird daher in zusammenhängende Blöcke
+aufgeteilt, die parallel in einem Prozess-Pool laufen. Innerhalb eines Blocks wird
+  - der StandardScaler per partial_fit nur um die neuen Zeilen ergänzt,
+  - die logistische Regression mit warm_start von den Koeffizienten des vorherigen Spieltags
+    aus weitertrainiert (der Random Forest wird jeweils neu gefittet).
+
+Aufruf:
+    python model/backtest.py --csv data/df_league_table_raw.csv
+    python model/backtest.py --seasons 2 --workers 4 --output backtest.csv   # Datenquelle aus DATA_SOURCE
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import brier_score_loss, log_loss
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from data_source import data_source_from_env
+from features import FEATURES, RELEGATION_RANKS, SEASON_LENGTH, FeatureStore, build_features
+
+MODELS = {
+    "logreg": lambda: LogisticRegression(max_iter=1000, class_weight="balanced", warm_start=True),
+    "rf": lambda: RandomForestClassifier(random_state=42, class_weight="balanced"),
+}
+
+RESULT_COLUMNS = ["Season", "Spieltag", "n_train", "n_teams", "relegated", "brier", "log_loss", "fit_s"]
+
+# Daten des Worker-Prozesses (einmal pro Prozess über den Initializer gesetzt)
+_data = {}
+
+
+def final_relegation(df):
+    """
+    Pro Zeile 1.0, falls das Team am Saisonende auf Rang 11 oder 12 steht, sonst 0.0;
+    NaN für Saisons, deren letzter Spieltag noch fehlt.
+    """
+    last = df.sort_values(["Season", "Spieltag"], kind="stable").drop_duplicates(["Season", "Team"], keep="last")
+    final = last.set_index(["Season", "Team"])["Rank"].isin(RELEGATION_RANKS).astype(float)
+    complete = df.groupby("Season")["Spieltag"].max() >= SEASON_LENGTH
+    final[~final.index.get_level_values("Season").map(complete).to_numpy(dtype=bool)] = np.nan
+    return pd.MultiIndex.from_frame(df[["Season", "Team"]]).map(final).to_numpy(dtype=float)
+
+
+def _init_worker(X, y, final, row_keys, model_name):
+    _data.update(X=X, y=y, final=final, row_keys=row_keys, model_name=model_name)
+
+
+def replay(snapshot_keys):
+    """
+    Spielt einen zusammenhängenden Block von Tabellenständen (Season * 1000 + Spieltag) durch.
+    Die Zeilen in _data sind nach diesem Schlüssel sortiert.
+    """
+    X, y, final, row_keys = _data["X"], _data["y"], _data["final"], _data["row_keys"]
+    scaler = StandardScaler()
+    model = MODELS[_data["model_name"]]()
+    fitted_rows = 0
+    results = []
+    for key in snapshot_keys:
+        train_end, test_end = np.searchsorted(row_keys, [key, key + 1])
+        y_true = final[train_end:test_end]
+        if train_end == 0 or len(np.unique(y[:train_end])) < 2 or np.isnan(y_true).any():
+            continue
+        start = time.perf_counter()
+        # Nur die seit dem letzten Fit hinzugekommenen Zeilen in den Skalierer aufnehmen
+        scaler.partial_fit(X[fitted_rows:train_end])
+        fitted_rows = train_end
+        model.fit(scaler.transform(X[:train_end]), y[:train_end])
+        proba = model.predict_proba(scaler.transform(X[train_end:test_end]))[:, 1]
+        results.append([
+            int(key // 1000), int(key % 1000), int(train_end), len(y_true), int(y_true.sum()),
+            brier_score_loss(y_true, proba), log_loss(y_true, proba, labels=[0, 1]), time.perf_counter() - start,
+        ])
+    return results
+
+
+def run_backtest(df, seasons=None, model_name="logreg", workers=None):
+    """
+    Walk-forward-Backtest über die Tabellenstände der angegebenen Saisons (Standard: alle
+    abgeschlossenen). Gibt einen DataFrame mit einer Zeile pro (Season, Spieltag) zurück.
+    """
+    df = df.sort_values(["Season", "Spieltag"], kind="stable").reset_index(drop=True)
+    row_keys = (df["Season"] * 1000 + df["Spieltag"]).to_numpy(dtype=np.int64)
+    X = df[FEATURES].to_numpy(dtype=float)
+    y = df["relegated"].to_numpy(dtype=int)
+    final = final_relegation(df)
+
+    scored = ~np.isnan(final)
+    if seasons is not None:
+        scored &= df["Season"].isin(seasons).to_numpy()
+    snapshot_keys = np.unique(row_keys[scored])
+    workers = max(1, min(workers or os.cpu_count() or 1, len(snapshot_keys)))
+    chunks = [chunk for chunk in np.array_split(snapshot_keys, workers) if len(chunk)]
+
+    init_args = (X, y, final, row_keys, model_name)
+    if workers == 1:
+        _init_worker(*init_args)
+        rows = [row for chunk in chunks for row in replay(chunk)]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=init_args) as pool:
+            rows = [row for result in pool.map(replay, chunks) for row in result]
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", help="Liga-Tabelle als CSV (Format von data/df_league_table_raw.csv) statt der Datenquelle")
+    parser.add_argument("--seasons", type=int, default=2, help="Anzahl der letzten abgeschlossenen Saisons (0 = alle)")
+    parser.add_argument("--model", choices=sorted(MODELS), default="logreg")
+    parser.add_argument("--workers", type=int, default=None, help="Prozesse (Standard: Anzahl CPU-Kerne)")
+    parser.add_argument("--output", help="Ergebnistabelle zusätzlich als CSV speichern")
+    args = parser.parse_args()
+
+    if args.csv:
+        df = build_features(pd.read_csv(args.csv))
+    else:
+        source = data_source_from_env()
+        try:
+            df = FeatureStore().refresh(source)
+        finally:
+            source.close()
+
+    complete = sorted(s for s, last in df.groupby("Season")["Spieltag"].max().items() if last >= SEASON_LENGTH)
+    seasons = complete[-args.seasons:] if args.seasons else complete
+
+    start = time.perf_counter()
+    results = run_backtest(df, seasons, args.model, args.workers)
+    wall = time.perf_counter() - start
+
+    pd.set_option("display.max_rows", None)
+    print(results.round(4).to_string(index=False))
+    print("-" * 50)
+    print(results.groupby("Season")[["brier", "log_loss"]].mean().round(4))
+    print(f"{len(results)} Tabellenstände aus den Saisons {seasons} in {wall:.2f}s ({args.model})")
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
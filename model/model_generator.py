@@ -1,9 +1,11 @@
 # %%
 import os
+import sys
+import time
 import pandas as pd
 import numpy as np
-from pymongo import MongoClient
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.model_selection import GroupKFold, GridSearchCV, cross_val_predict
+from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
@@ -11,47 +13,39 @@ from sklearn.svm import SVC
 from sklearn.metrics import classification_report, accuracy_score, f1_score, brier_score_loss
 import joblib
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from data_source import data_source_from_env
+from features import FEATURES, FeatureStore
+from compact_model import export_compact
+from uncertainty import export_uncertainty, fit_bootstrap_ensemble, fit_calibrator
+
+# Cache-Ordner für gefittete Fold-Transformer und Suchergebnisse; bei unveränderten Daten
+# wird ein erneuter Lauf direkt aus dem Cache bedient
+CACHE_DIR = os.getenv("MODEL_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+# Anzahl Folds der saisonweisen Kreuzvalidierung (höchstens Anzahl Saisons)
+CV_FOLDS = int(os.getenv("MODEL_CV_FOLDS", "5"))
+# Anzahl logistischer Regressionen im Bootstrap-Ensemble für die Vorhersageintervalle
+BOOTSTRAP_MEMBERS = int(os.getenv("MODEL_BOOTSTRAP_MEMBERS", "200"))
+
 # -----------------------------------------------------------------------------
-# 1. Daten aus MongoDB laden
+# 1. Daten laden
 # -----------------------------------------------------------------------------
-# Aufbau der Verbindung zur MongoDB und Laden aller Dokumente aus der "league-tables" Collection
-mongodb_uri = os.getenv("MONGODB_URI")
-if not mongodb_uri:
-    raise ValueError("Die Umgebungsvariable MONGODB_URI ist nicht gesetzt!")
-
-client = MongoClient(mongodb_uri)
-db = client["mdm-project1"]
-cursor = db["league-tables"].find()
-df = pd.DataFrame(list(cursor))
-if '_id' in df.columns:
-    df.drop('_id', axis=1, inplace=True)
-print("Geladene Spalten:", df.columns.tolist())
+# Die Liga-Tabellen kommen aus der Datenquelle (backend/data_source.py): MongoDB, falls
+# MONGODB_URI gesetzt ist, sonst die CSV- bzw. Parquet-Dateien in data/ (DATA_SOURCE, DATA_DIR).
+# Geladen wird über den gemeinsamen Feature-Store (backend/features.py), den auch das
+# Flask-Backend verwendet
+source = data_source_from_env()
+print(f"Datenquelle: {source.name}")
 
 # -----------------------------------------------------------------------------
 # 2. Datenvorbereitung
 # -----------------------------------------------------------------------------
-# Konvertiere relevante Spalten in numerische Werte
-numeric_cols = ['Spieltag', 'Rank', 'Spiele', 'G', 'U', 'V', 'Tore', 'Goal_Diff', 'Points']
-for col in numeric_cols:
-    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-# Fülle alle fehlenden Werte in den Spalten mit -1
-df.fillna(-1, inplace=True)
-
-# Filter: Für das Modelltraining werden nur bereits abgeschlossene Spieltage verwendet. 
-# (Es wird angenommen, dass in der Spalte "Future" bereits ein boolescher Wert vorhanden ist.)
-df_train = df[df['Future'] == False].copy()
-
-# Berechne das Feature "Restspiele" (Differenz zur Saisonlänge von 38 Spieltagen), falls nicht vorhanden
-if 'Restspiele' not in df_train.columns:
-    df_train['Restspiele'] = 38 - df_train['Spieltag']
-
-# Berechne "Estimated_Extra_Points" als Schätzung (zum Beispiel 1.2 Punkte pro verbleibendem Spiel)
-if 'Estimated_Extra_Points' not in df_train.columns:
-    df_train['Estimated_Extra_Points'] = df_train['Restspiele'] * 1.2
-
-# Zielvariable: Ein Team gilt als gefährdet (relegated = 1), wenn der Rank entweder 11 oder 12 beträgt.
-df_train['relegated'] = df_train['Rank'].apply(lambda x: 1 if x in [11, 12] else 0)
+# build_features wandelt die Spalten in numerische Werte um (fehlende Werte = -1), behält nur
+# abgeschlossene Spieltage und berechnet Restspiele, Estimated_Extra_Points sowie die
+# Zielvariable relegated (Rang 11 oder 12). Neue Spieltage werden inkrementell ergänzt.
+df_train = FeatureStore().refresh(source)
+source.close()
+print("Geladene Spalten:", df_train.columns.tolist())
 
 # Kontrolle der ersten Zeilen
 print("Beispiel-Datensätze (Trainingsdaten):")
@@ -61,51 +55,98 @@ print(df_train.head(15))
 # 3. Trainingsdaten definieren und Feature-Vektor erstellen
 # -----------------------------------------------------------------------------
 # Die Feature-Matrix beinhaltet aktuelle Leistungsdaten und Zukunftsfeatures
-features = ['Points', 'Goal_Diff', 'G', 'U', 'V', 'Restspiele', 'Estimated_Extra_Points']
+features = FEATURES
 X = df_train[features]
 y = df_train['relegated']
 
 # Sicherstellen, dass keine fehlenden Werte in den Features vorliegen
 assert X.isna().sum().sum() == 0, "Es gibt noch NaN-Werte in den Features!"
 
-# Aufteilen in Trainings- (80%) und Testdaten (20%)
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+# Gruppen für die Kreuzvalidierung: Alle Spieltage einer Saison landen im selben Fold, damit
+# das Modell nicht mit Tabellenständen derselben Saison trainiert und getestet wird
+groups = df_train['Season']
+cv = GroupKFold(n_splits=max(2, min(CV_FOLDS, groups.nunique())))
 
 # -----------------------------------------------------------------------------
-# 4. Vorverarbeitung: Skalierung
+# 4. Vorverarbeitung: Skalierung als Teil der Pipeline
 # -----------------------------------------------------------------------------
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
+# Der StandardScaler wird pro Fold nur auf den Trainingsdaten gefittet; über memory werden die
+# gefitteten Skalierer zwischengespeichert und zwischen den Parameterkombinationen wiederverwendet.
+memory = joblib.Memory(os.path.join(CACHE_DIR, "pipeline"), verbose=0)
+
+
+def make_pipeline(classifier):
+    return Pipeline([("scaler", StandardScaler()), ("clf", classifier)], memory=memory)
+
 
 # -----------------------------------------------------------------------------
-# 5. Modelltraining und Evaluation
+# 5. Hyperparameter-Suche und Evaluation
 # -----------------------------------------------------------------------------
 # Drei Klassifikatoren werden mit der Option class_weight='balanced' trainiert, um der Klassenunbalance entgegenzuwirken.
+# Die SVC-Suche läuft ohne probability=True (die interne Platt-Skalierung mit 5-facher CV pro
+# Kombination ist der teuerste Schritt); erst das gewählte Modell wird mit Wahrscheinlichkeiten gefittet.
 models = {
-    'Logistic Regression': LogisticRegression(max_iter=1000, class_weight='balanced'),
-    'Random Forest': RandomForestClassifier(random_state=42, class_weight='balanced'),
-    'Support Vector Classifier': SVC(probability=True, class_weight='balanced')
+    'Logistic Regression': (
+        LogisticRegression(max_iter=1000, class_weight='balanced'),
+        {'clf__C': [0.01, 0.1, 1.0, 10.0]},
+    ),
+    'Random Forest': (
+        RandomForestClassifier(random_state=42, class_weight='balanced'),
+        {'clf__max_depth': [None, 8, 16], 'clf__min_samples_leaf': [1, 5]},
+    ),
+    'Support Vector Classifier': (
+        SVC(class_weight='balanced'),
+        {'clf__C': [0.1, 1.0, 10.0], 'clf__gamma': ['scale', 0.1]},
+    ),
 }
 
-model_scores = {}
 
-for name, model in models.items():
-    model.fit(X_train_scaled, y_train)
-    y_pred = model.predict(X_test_scaled)
-    acc = accuracy_score(y_test, y_pred)
-    f1 = f1_score(y_test, y_pred)
-    brier = brier_score_loss(y_test, model.predict_proba(X_test_scaled)[:, 1])
-    print(f"Modell: {name}")
-    print(classification_report(y_test, y_pred))
-    print(f"Accuracy: {acc:.4f} | F1-Score: {f1:.4f} | Brier Score Loss: {brier:.4f}")
+def search_model(classifier, param_grid, X, y, groups, cv):
+    """
+    Parameter-Suche (parallel über alle Kerne) mit F1 als Kriterium und anschließende
+    Out-of-Fold-Vorhersagen des besten Modells für Accuracy, F1 und Brier.
+    """
+    search = GridSearchCV(make_pipeline(classifier), param_grid, scoring='f1', cv=cv, n_jobs=-1)
+    search.fit(X, y, groups=groups)
+    best = search.best_estimator_
+    if 'probability' in best.named_steps['clf'].get_params():
+        best.set_params(clf__probability=True)
+    proba = cross_val_predict(best, X, y, groups=groups, cv=cv, n_jobs=-1, method='predict_proba')[:, 1]
+    best.fit(X, y)
+    return best, search.best_params_, proba
+
+
+# Das gesamte Suchergebnis wird über einen Hash der Daten und Parameter zwischengespeichert
+search_model_cached = joblib.Memory(os.path.join(CACHE_DIR, "search"), verbose=0).cache(search_model)
+
+model_scores = {}
+best_pipelines = {}
+oof_proba = {}
+
+for name, (classifier, param_grid) in models.items():
+    start = time.perf_counter()
+    pipeline, params, proba = search_model_cached(classifier, param_grid, X, y, groups, cv)
+    wall = time.perf_counter() - start
+    y_pred = (proba >= 0.5).astype(int)
+    acc = accuracy_score(y, y_pred)
+    f1 = f1_score(y, y_pred)
+    brier = brier_score_loss(y, proba)
+    print(f"Modell: {name} – beste Parameter: {params}")
+    print(classification_report(y, y_pred))
+    print(f"Accuracy: {acc:.4f} | F1-Score: {f1:.4f} | Brier Score Loss: {brier:.4f} | Laufzeit: {wall:.2f}s")
     print("-" * 50)
-    model_scores[name] = {"accuracy": acc, "f1": f1, "brier": brier}
+    model_scores[name] = {"accuracy": acc, "f1": f1, "brier": brier, "wall_s": wall}
+    best_pipelines[name] = pipeline
+    oof_proba[name] = proba
+
+print(pd.DataFrame(model_scores).T.round(4))
 
 # Auswahl des besten Modells basierend auf dem höchsten F1-Score
 best_model_name = max(model_scores, key=lambda k: model_scores[k]['f1'])
 print(f"Bestes Modell basierend auf F1-Score: {best_model_name}")
-best_model = models[best_model_name]
+# Backend und save.py erwarten Modell und Skalierer als getrennte Dateien
+best_model = best_pipelines[best_model_name].named_steps['clf']
+scaler = best_pipelines[best_model_name].named_steps['scaler']
 
 # -----------------------------------------------------------------------------
 # 6. Persistierung
@@ -115,5 +156,37 @@ joblib.dump(best_model, 'best_model.pkl')
 joblib.dump(scaler, 'scaler.pkl')
 print("Bestes Modell und Skalierer wurden gespeichert.")
 
+# Zusätzlich ein kompaktes Inferenz-Artefakt (NumPy-Arrays, per Memory-Map ladbar), sofern das
+# Modell unterstützt wird; der Export prüft die Übereinstimmung mit predict_proba auf X
+try:
+    export_compact(best_model, scaler, 'best_model.compact', X_check=X)
+    print("Kompaktes Modell wurde gespeichert.")
+except ValueError as e:
+    if os.path.exists('best_model.compact'):
+        os.remove('best_model.compact')
+    print(f"Kein kompaktes Modell: {e}")
 
-
+# -----------------------------------------------------------------------------
+# 7. Kalibrierung und Vorhersageintervalle
+# -----------------------------------------------------------------------------
+# class_weight='balanced' verschiebt die Wahrscheinlichkeiten nach oben. Auf den Out-of-Fold-
+# Wahrscheinlichkeiten wird je Saison geprüft, ob isotonic, platt oder keine Kalibrierung den
+# kleinsten Brier Score liefert. Für die Intervalle wird die logistische Regression mit den
+# gefundenen Parametern auf Bootstrap-Stichproben neu gefittet (auch wenn ein anderes Modell
+# gewählt wurde; sie dient dann als lineares Ersatzmodell für die Streuung) und mit ihren
+# eigenen Out-of-Fold-Wahrscheinlichkeiten kalibriert. Beim Ausliefern wird das Intervall um
+# die kalibrierte Wahrscheinlichkeit des gewählten Modells zentriert (UncertaintyModel.interval).
+calibration, calibration_scores = fit_calibrator(oof_proba[best_model_name], y, groups)
+print(f"Kalibrierung: {calibration.method} – Brier Score pro Methode: "
+      + ", ".join(f"{method} {score:.4f}" for method, score in calibration_scores.items()))
+
+lr_name = 'Logistic Regression'
+member_calibration, _ = fit_calibrator(oof_proba[lr_name], y, groups)
+lr_params = best_pipelines[lr_name].named_steps['clf'].get_params()
+start = time.perf_counter()
+coef, intercept = fit_bootstrap_ensemble(
+    scaler.transform(X), y, lambda: LogisticRegression(**lr_params), members=BOOTSTRAP_MEMBERS,
+)
+export_uncertainty('best_model.uncertainty', calibration, member_calibration, scaler, coef, intercept)
+print(f"Bootstrap-Ensemble mit {BOOTSTRAP_MEMBERS} Mitgliedern ({time.perf_counter() - start:.2f}s) "
+      f"und Kalibrierung wurden gespeichert.")
@@ -17,6 +17,10 @@ from datetime import datetime
 # Lokale Dateinamen – passen Sie diese ggf. an
 MODEL_FILENAME = "best_model.pkl"
 SCALER_FILENAME = "scaler.pkl"
+# Optionales kompaktes Inferenz-Artefakt aus model_generator.py (wird als model-<n>.compact abgelegt)
+COMPACT_FILENAME = "best_model.compact"
+# Optionale Kalibrierung und Bootstrap-Ensemble (wird als model-<n>.uncertainty abgelegt)
+UNCERTAINTY_FILENAME = "best_model.uncertainty"
 # Containername, in dem die Modelle und Skalierer abgelegt werden sollen
 BLOB_CONTAINER_NAME = "models"
 
@@ -44,8 +48,11 @@ def get_new_blob_name(container_client: ContainerClient, base_name: str) -> str:
     next_version = max(versions) + 1 if versions else 1
     return f"{base_name}-{next_version}.pkl"
 
-def upload_file(filename, base_blob_name):
-    """Lädt eine gegebene Datei in den Blob Storage hoch und verwendet fortlaufende Nummerierung."""
+def upload_file(filename, base_blob_name, blob_name=None):
+    """
+    Lädt eine gegebene Datei in den Blob Storage hoch und verwendet fortlaufende Nummerierung.
+    Mit blob_name wird stattdessen genau dieser Name verwendet. Gibt den Blob-Namen zurück.
+    """
     if not os.path.exists(filename):
         print(f"Datei '{filename}' nicht gefunden. Bitte stellen Sie sicher, dass die Datei existiert.")
         sys.exit(1)
@@ -58,15 +65,21 @@ def upload_file(filename, base_blob_name):
     except Exception:
         container_client = blob_service_client.get_container_client(BLOB_CONTAINER_NAME)
     
-    new_blob_name = get_new_blob_name(container_client, base_blob_name)
+    new_blob_name = blob_name or get_new_blob_name(container_client, base_blob_name)
     print(f"Upload von {filename} als '{new_blob_name}'...")
     with open(filename, "rb") as data:
         container_client.upload_blob(new_blob_name, data)
     print(f"{filename} erfolgreich hochgeladen.")
+    return new_blob_name
 
 def main():
     try:
-        upload_file(MODEL_FILENAME, "model")
+        model_blob_name = upload_file(MODEL_FILENAME, "model")
+        # Die zusätzlichen Artefakte erhalten dieselbe Versionsnummer wie das Modell und werden vor
+        # dem Skalierer hochgeladen: Das Backend übernimmt eine Version erst, wenn der Skalierer existiert
+        for filename, suffix in [(COMPACT_FILENAME, ".compact"), (UNCERTAINTY_FILENAME, ".uncertainty")]:
+            if os.path.exists(filename):
+                upload_file(filename, "model", model_blob_name.replace(".pkl", suffix))
         upload_file(SCALER_FILENAME, "scaler")
     except Exception as e:
         print(f"Fehler beim Hochladen: {e}")
@@ -0,0 +1,183 @@
+"""
+fetcher.py – Wiederverwendbare Browser-Sessions und paralleler Seitenabruf
+--------------------------------------------------------------------------
+Statt für jeden Spieltag einen neuen Headless-Chrome zu starten und fix 5 Sekunden zu
+warten, hält der PageFetcher einen kleinen Pool von WebDrivern offen. Jeder Abruf wartet
+nur so lange, bis die Tabelle (table.items) im DOM vorhanden ist. Mehrere Spieltage
+werden parallel abgerufen; ein gemeinsamer RateLimiter begrenzt die Anfragen pro Sekunde.
+
+Der Fetcher liefert nur das HTML; das Parsen erfolgt separat in transfermarkt_spider.py.
+Ein Browser, dessen Abruf fehlschlägt (z. B. abgestürzte Session), wird beendet und beim
+nächsten Abruf ersetzt; fetch_many meldet fehlgeschlagene Seiten mit html=None, statt den
+ganzen Lauf abzubrechen.
+Über base_url (bzw. TRANSFERMARKT_BASE_URL) kann ein lokaler HTTP-Server mit
+gespeicherten Seiten verwendet werden.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+DEFAULT_BASE_URL = os.getenv("TRANSFERMARKT_BASE_URL", "https://www.transfermarkt.ch")
+URL_TEMPLATE = "{base_url}/super-league/spieltagtabelle/wettbewerb/C1?saison_id={season}&spieltag={spieltag}"
+
+# Anzahl paralleler Browser und maximale Anfragen pro Sekunde (über alle Browser)
+SPIDER_WORKERS = int(os.getenv("SPIDER_WORKERS", "2"))
+SPIDER_RATE_LIMIT = float(os.getenv("SPIDER_RATE_LIMIT", "1.0"))
+# Maximale Wartezeit auf die Tabelle in Sekunden
+SPIDER_PAGE_TIMEOUT = float(os.getenv("SPIDER_PAGE_TIMEOUT", "20"))
+
+
+def page_url(season, spieltag, base_url=DEFAULT_BASE_URL):
+    """URL der Spieltagstabelle einer Saison."""
+    return URL_TEMPLATE.format(base_url=base_url.rstrip("/"), season=season, spieltag=spieltag)
+
+
+def create_driver(chromedriver_path=None):
+    """Startet einen Headless-Chrome mit derselben Konfiguration wie bisher im Spider."""
+    service = Service(chromedriver_path or os.getenv("CHROMEDRIVER_PATH"))
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("window-size=1920,1080")
+    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36")
+    return webdriver.Chrome(service=service, options=options)
+
+
+class RateLimiter:
+    """
+    Verteilt Anfragen threadsicher auf feste Zeitfenster: höchstens rate Anfragen pro Sekunde.
+    rate <= 0 schaltet die Begrenzung ab.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class PageFetcher:
+    """
+    Pool aus bis zu `workers` WebDrivern, die über alle Abrufe hinweg wiederverwendet werden.
+
+    Verwendung:
+        with PageFetcher(workers=3, rate_limit=1.0) as fetcher:
+            for season, spieltag, html in fetcher.fetch_many([(2024, 1), (2024, 2)]):
+                ...
+    """
+
+    def __init__(self, workers=SPIDER_WORKERS, rate_limit=SPIDER_RATE_LIMIT, timeout=SPIDER_PAGE_TIMEOUT,
+                 base_url=DEFAULT_BASE_URL, driver_factory=create_driver):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.base_url = base_url
+        self.driver_factory = driver_factory
+        self.rate_limiter = RateLimiter(rate_limit)
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _start_driver(self):
+        """Startet einen weiteren Browser, solange der Pool nicht voll ist; sonst None."""
+        with self._lock:
+            if len(self._drivers) >= self.workers:
+                return None
+            driver = self.driver_factory()
+            self._drivers.append(driver)
+            return driver
+
+    def _acquire(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._start_driver() or self._idle.get()
+            # None steht für den freien Platz eines verworfenen Browsers: erneut versuchen
+            if driver is not None:
+                return driver
+
+    def _discard(self, driver):
+        """Beendet einen fehlerhaften Browser; sein Platz im Pool wird beim nächsten Abruf neu besetzt."""
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        # Weckt einen Abruf, der auf einen freien Browser wartet
+        self._idle.put(None)
+
+    def fetch(self, season, spieltag):
+        """Lädt eine Spieltagsseite und gibt den Seitenquelltext zurück."""
+        driver = self._acquire()
+        healthy = False
+        try:
+            self.rate_limiter.wait()
+            driver.get(page_url(season, spieltag, self.base_url))
+            try:
+                WebDriverWait(driver, self.timeout).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "table.items"))
+                )
+            except TimeoutException:
+                print(f"Zeitüberschreitung beim Warten auf die Tabelle (Saison {season}, Spieltag {spieltag}).")
+            html = driver.page_source
+            healthy = True
+            return html
+        finally:
+            if healthy:
+                self._idle.put(driver)
+            else:
+                self._discard(driver)
+
+    def _fetch_or_none(self, season, spieltag):
+        try:
+            return self.fetch(season, spieltag)
+        except Exception as e:
+            print(f"Abruf fehlgeschlagen (Saison {season}, Spieltag {spieltag}): {e}")
+            return None
+
+    def fetch_many(self, pages):
+        """
+        Lädt mehrere (season, spieltag)-Seiten parallel und liefert (season, spieltag, html)
+        in der Reihenfolge der Eingabe; html ist None, falls der Abruf fehlgeschlagen ist.
+        """
+        pages = list(pages)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(lambda page: self._fetch_or_none(*page), pages)
+            for (season, spieltag), html in zip(pages, results):
+                yield season, spieltag, html
+
+    def close(self):
+        """Beendet alle gestarteten Browser."""
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self._idle = queue.Queue()
@@ -0,0 +1,135 @@
+"""
+page_cache.py – Inhaltsadressierter Cache der abgerufenen Transfermarkt-Seiten
+-------------------------------------------------------------------------------
+Jede Seite wird gzip-komprimiert unter ihrem SHA-256-Hash abgelegt (objects/ab/<hash>.html.gz).
+Pro (Saison, Spieltag) verweist eine kleine JSON-Datei (refs/<saison>_<spieltag>.json) auf
+den aktuellen Inhalt, zusammen mit Abrufzeitpunkt und Future-Flag:
+  - abgeschlossene Spieltage (alle Partien mit Resultat) werden unbegrenzt aus dem Cache bedient,
+  - zukünftige und laufende Spieltage (future=True) laufen nach ttl Sekunden ab und werden neu geladen.
+Identische Inhalte werden nur einmal gespeichert; ein erneuter Abruf ohne Änderung
+aktualisiert lediglich den Verweis.
+
+Damit lassen sich Parser-Änderungen ohne Browser auf alle gespeicherten Seiten anwenden
+(siehe --reparse in transfermarkt_spider.py).
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "SPIDER_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "page_cache")
+)
+# Gültigkeitsdauer zukünftiger Spieltage in Sekunden
+SPIDER_CACHE_TTL = float(os.getenv("SPIDER_CACHE_TTL", str(6 * 3600)))
+
+
+def _atomic_write(path, data):
+    """Schreibt data über eine temporäre Datei und os.replace, damit Leser nie halbe Dateien sehen."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class PageCache:
+    """Seiten-Cache auf der Festplatte mit Treffer-/Fehlzugriffsstatistik (stats)."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=SPIDER_CACHE_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self.objects_dir = os.path.join(directory, "objects")
+        self.refs_dir = os.path.join(directory, "refs")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.refs_dir, exist_ok=True)
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stored": 0, "unchanged": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _ref_path(self, season, spieltag):
+        return os.path.join(self.refs_dir, f"{season}_{spieltag}.json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.html.gz")
+
+    def _read_ref(self, season, spieltag):
+        try:
+            with open(self._ref_path(season, spieltag), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _read_object(self, digest):
+        with gzip.open(self._object_path(digest), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def get(self, season, spieltag, now=None):
+        """
+        Liefert das HTML eines Spieltags aus dem Cache oder None, falls die Seite fehlt
+        oder als zukünftiger Spieltag älter als ttl ist.
+        """
+        ref = self._read_ref(season, spieltag)
+        if ref is None:
+            self._count("misses")
+            return None
+        now = time.time() if now is None else now
+        if ref["future"] and now - ref["fetched_at"] > self.ttl:
+            self._count("expired")
+            self._count("misses")
+            return None
+        try:
+            html = self._read_object(ref["sha256"])
+        except (FileNotFoundError, OSError, EOFError):
+            self._count("misses")
+            return None
+        self._count("hits")
+        return html
+
+    def load(self, season, spieltag):
+        """Liefert das gespeicherte HTML unabhängig vom Ablauf (für das erneute Parsen)."""
+        ref = self._read_ref(season, spieltag)
+        return None if ref is None else self._read_object(ref["sha256"])
+
+    def put(self, season, spieltag, html, future):
+        """Speichert eine frisch abgerufene Seite und gibt ihren Inhalts-Hash zurück."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest)
+        previous = self._read_ref(season, spieltag)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            _atomic_write(object_path, gzip.compress(data))
+        ref = {"season": season, "spieltag": spieltag, "sha256": digest, "future": bool(future), "fetched_at": time.time()}
+        _atomic_write(self._ref_path(season, spieltag), json.dumps(ref).encode("utf-8"))
+        self._count("unchanged" if previous and previous["sha256"] == digest else "stored")
+        return digest
+
+    def entries(self):
+        """Alle gespeicherten (season, spieltag)-Paare, sortiert."""
+        pages = []
+        for name in os.listdir(self.refs_dir):
+            if name.endswith(".json"):
+                season, spieltag = name[:-len(".json")].split("_")
+                pages.append((int(season), int(spieltag)))
+        return sorted(pages)
+
+    def summary(self):
+        stats = self.stats
+        lookups = stats["hits"] + stats["misses"]
+        rate = stats["hits"] / lookups * 100 if lookups else 0.0
+        return (
+            f"Cache: {stats['hits']} Treffer, {stats['misses']} Fehlzugriffe "
+            f"(davon {stats['expired']} abgelaufen), Trefferquote {rate:.1f}%, "
+            f"{stats['stored']} neu gespeichert, {stats['unchanged']} unverändert"
+        )
@@ -2,39 +2,143 @@
 """
 Notwendige Importe und Initialisierung
 ----------------------------------------
-- Import von Standardmodulen (re, time, datetime)
+- Import von Standardmodulen (re, datetime)
 - Import von pandas zur Datenmanipulation
-- Import von Selenium (webdriver und Service) und BeautifulSoup zur HTML-Extraktion
-- MongoClient aus pymongo zur Verbindung mit der Datenbank
+- PageFetcher (Selenium-Browser-Pool) zum Abruf, lxml bzw. BeautifulSoup zur HTML-Extraktion
+- PageCache zum Zwischenspeichern der abgerufenen Seiten
+- MongoClient und UpdateOne aus pymongo zur Verbindung mit der Datenbank und für Bulk-Upserts
 """
+import argparse
 import os
 import re
-import time
+import lxml.etree
+import lxml.html
 import pandas as pd
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from bs4 import BeautifulSoup
-from pymongo import MongoClient
+from pymongo import ASCENDING, MongoClient, UpdateOne
+from pymongo.errors import OperationFailure
+from fetcher import SPIDER_RATE_LIMIT, SPIDER_WORKERS, PageFetcher
+from page_cache import DEFAULT_CACHE_DIR, PageCache
 
-mongodb_uri = os.getenv("MONGODB_URI")
-if not mongodb_uri:
-    raise ValueError("Die Umgebungsvariable MONGODB_URI ist nicht gesetzt!")
+# Parser-Backend für die Spieltagsseiten: "lxml" (schnell) oder "bs4" (BeautifulSoup, html.parser)
+PARSER_BACKEND = os.getenv("SPIDER_PARSER", "lxml")
 
-# MongoDB-Verbindung aufbauen
-client = MongoClient(mongodb_uri)
-db = client["mdm-project1"]
+# Anzahl UpdateOne-Operationen pro bulk_write-Aufruf
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "500"))
 
-# Pfad zum ChromeDriver (Anpassung nach Bedarf)
-CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")
+# Eindeutige Schlüssel für den Delta-Import
+league_key_fields = ["Season", "Spieltag", "Team"]
+matches_key_fields = ["Season", "Spieltag", "date", "time", "home_team", "away_team"]
+
+def get_database():
+    """Baut die MongoDB-Verbindung über die Umgebungsvariable MONGODB_URI auf."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        raise ValueError("Die Umgebungsvariable MONGODB_URI ist nicht gesetzt!")
+    client = MongoClient(mongodb_uri)
+    return client["mdm-project1"]
 
 # %%
-def get_table_and_match_results(season_id, spieltag):
+# Gemeinsame Hilfsfunktionen beider Parser-Backends (BeautifulSoup und lxml)
+DATE_PATTERN = re.compile(r'\d{2}\.\d{2}\.\d{4}')
+RANK_PATTERN = re.compile(r'\(\s*(\d+)\s*\.\s*\)')
+
+def parse_link_date(candidate):
+    """Wandelt den Text eines Datumslinks (dd.mm.yyyy) in ein datetime um, sonst None."""
+    if DATE_PATTERN.match(candidate):
+        try:
+            return datetime.strptime(candidate, "%d.%m.%Y")
+        except Exception:
+            return None
+    return None
+
+def determine_future_flag(match_date, season_id, spieltag):
+    """Gibt True zurück, wenn der Spieltag nach dem heutigen Datum stattfindet."""
+    today = datetime.today()
+    future_flag = False
+    if match_date:
+        if match_date > today:
+            print(f"Spieltag {spieltag} für Saison {season_id} liegt in der Zukunft ({match_date.strftime('%d.%m.%Y')}).")
+            future_flag = True
+        else:
+            print(f"Spieltag {spieltag} für Saison {season_id} fand am {match_date.strftime('%d.%m.%Y')} statt.")
+    else:
+        print("Kein Datum gefunden.")
+    return future_flag
+
+def finalize_league_row(parsed, season_id, spieltag, future_flag):
+    """Leert bei zukünftigen Spieltagen die Ergebnisfelder und stellt Season, Spieltag und Future voran."""
+    if future_flag:
+        # Für zukünftige Spieltage Ergebnisfelder leeren; diese werden später z.B. mit -1 ersetzt.
+        parsed[6] = ""  # Tore
+        parsed[7] = ""  # Goal_Diff
+        parsed[8] = ""  # Points
+    # Füge season_id, spieltag und das future_flag als erstes ein
+    parsed.insert(0, future_flag)
+    parsed.insert(0, spieltag)
+    parsed.insert(0, season_id)
+    return parsed
+
+def update_header_context(text, current_date, current_time):
+    """Übernimmt Datum und Uhrzeit aus dem Text einer Header-Zeile (Klasse "bg_blau_20")."""
+    date_match = re.search(r'(\d{2}\.\d{2}\.\d{4})', text)
+    time_match = re.search(r'(\d{1,2}:\d{2})', text)
+    if date_match:
+        current_date = date_match.group(1)
+    if time_match:
+        current_time = time_match.group(1)
+    return current_date, current_time
+
+def build_match(current_date, current_time, result_text, home_info, away_info):
+    """
+    Erstellt den Datensatz eines Spiels aus den Zelltexten. Liegt das Datum in der Zukunft
+    oder ist kein Ergebnis "x:y" vorhanden, werden die Tore als -1 gesetzt.
+    """
+    # Überprüfe, ob das aktuelle Datum in der Zukunft liegt und setze Ergebnis gegebenenfalls auf -1
+    result_available = True
+    if current_date:
+        try:
+            header_date = datetime.strptime(current_date, "%d.%m.%Y")
+            if header_date > datetime.today():
+                result_available = False
+        except Exception:
+            pass
+    if result_available and re.match(r'\d+:\d+', result_text):
+        try:
+            home_goals, away_goals = map(int, result_text.split(":"))
+        except Exception:
+            home_goals, away_goals = -1, -1
+    else:
+        home_goals, away_goals = -1, -1
+    
+    home_rank_match = RANK_PATTERN.search(home_info)
+    home_rank = int(home_rank_match.group(1)) if home_rank_match else None
+    home_team = RANK_PATTERN.sub("", home_info).strip()
+    
+    away_rank_match = RANK_PATTERN.search(away_info)
+    away_rank = int(away_rank_match.group(1)) if away_rank_match else None
+    away_team = RANK_PATTERN.sub("", away_info).strip()
+    
+    return {
+        "date": current_date,
+        "time": current_time,
+        "home_rank": home_rank,
+        "home_team": home_team,
+        "home_goals": home_goals,
+        "away_goals": away_goals,
+        "away_rank": away_rank,
+        "away_team": away_team
+    }
+
+# %%
+def parse_page(html, season_id, spieltag):
     """
     Extrahiert die aggregierte Liga-Tabelle und die detaillierten Tagesresultate
-    für einen gegebenen Spieltag einer Saison von Transfermarkt.
+    aus dem HTML einer Spieltagsseite von Transfermarkt.
     
     Parameter:
+        html (str): Seitenquelltext der Spieltagstabelle.
         season_id (int): Die Saison-ID (z.B. 2024).
         spieltag (int): Die Spieltag-Nummer.
     
@@ -45,46 +149,16 @@ def get_table_and_match_results(season_id, spieltag):
              bzw. im späteren Preprocessing als -1 abgelegt.
         match_rows (list): Liste von Rohdatenzeilen (TR-Elemente) aus dem detaillierten Resultatbereich.
     """
-    # Erstelle die URL anhand der Saison und des Spieltags
-    url = f"https://www.transfermarkt.ch/super-league/spieltagtabelle/wettbewerb/C1?saison_id={season_id}&spieltag={spieltag}"
-    
-    # Selenium-Konfiguration
-    service = Service(CHROMEDRIVER_PATH)
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("window-size=1920,1080")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36")
-    
-    driver = webdriver.Chrome(service=service, options=options)
-    driver.get(url)
-    time.sleep(5)  # Wartezeit, bis alle Inhalte geladen sind
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()
+    soup = BeautifulSoup(html, "html.parser")
     
     # Extrahiere Datum aus Link-Elementen (Format dd.mm.yyyy)
-    date_pattern = re.compile(r'\d{2}\.\d{2}\.\d{4}')
     match_date = None
     for a in soup.find_all("a", href=True):
         if "datum" in a['href']:
-            candidate = a.get_text(strip=True)
-            if date_pattern.match(candidate):
-                try:
-                    match_date = datetime.strptime(candidate, "%d.%m.%Y")
-                    break
-                except Exception:
-                    continue
-    today = datetime.today()
-    future_flag = False
-    if match_date:
-        if match_date > today:
-            print(f"Spieltag {spieltag} für Saison {season_id} liegt in der Zukunft ({match_date.strftime('%d.%m.%Y')}).")
-            future_flag = True
-        else:
-            print(f"Spieltag {spieltag} für Saison {season_id} fand am {match_date.strftime('%d.%m.%Y')} statt.")
-    else:
-        print("Kein Datum gefunden.")
+            match_date = parse_link_date(a.get_text(strip=True))
+            if match_date:
+                break
+    future_flag = determine_future_flag(match_date, season_id, spieltag)
     
     # Aggregierte Liga-Tabelle extrahieren
     league_table = []
@@ -96,16 +170,7 @@ def get_table_and_match_results(season_id, spieltag):
             for row in rows:
                 parsed = parse_league_row(row)
                 if parsed:
-                    if future_flag:
-                        # Für zukünftige Spieltage Ergebnisfelder leeren; diese werden später z.B. mit -1 ersetzt.
-                        parsed[6] = ""  # Tore
-                        parsed[7] = ""  # Goal_Diff
-                        parsed[8] = ""  # Points
-                    # Füge season_id, spieltag und das future_flag als erstes ein
-                    parsed.insert(0, future_flag)
-                    parsed.insert(0, spieltag)
-                    parsed.insert(0, season_id)
-                    league_table.append(parsed)
+                    league_table.append(finalize_league_row(parsed, season_id, spieltag, future_flag))
     else:
         print("Keine aggregierte Tabelle mit class 'items' gefunden!")
     
@@ -123,6 +188,18 @@ def get_table_and_match_results(season_id, spieltag):
     
     return league_table, match_rows
 
+def get_table_and_match_results(season_id, spieltag, fetcher=None):
+    """
+    Lädt und parst einen einzelnen Spieltag. Ohne übergebenen PageFetcher wird
+    ein eigener Browser für diesen einen Abruf gestartet.
+    """
+    if fetcher is None:
+        with PageFetcher(workers=1) as own_fetcher:
+            html = own_fetcher.fetch(season_id, spieltag)
+    else:
+        html = fetcher.fetch(season_id, spieltag)
+    return parse_page(html, season_id, spieltag)
+
 def parse_league_row(row):
     """
     Parst eine Zeile der aggregierten Tabelle und extrahiert:
@@ -157,127 +234,379 @@ def parse_detailed_matches(match_rows):
     matches = []
     current_date = ""
     current_time = ""
-    rank_pattern = re.compile(r'\(\s*(\d+)\s*\.\s*\)')
     
     for row in match_rows:
         classes = row.get("class", [])
         if "bg_blau_20" in classes:
-            text = row.get_text(" ", strip=True)
-            date_match = re.search(r'(\d{2}\.\d{2}\.\d{4})', text)
-            time_match = re.search(r'(\d{1,2}:\d{2})', text)
-            if date_match:
-                current_date = date_match.group(1)
-            if time_match:
-                current_time = time_match.group(1)
+            current_date, current_time = update_header_context(row.get_text(" ", strip=True), current_date, current_time)
             continue
         cells = row.find_all("td")
         if len(cells) < 11:
             continue
-        
-        result_text = cells[6].get_text(strip=True)
-        # Überprüfe, ob das aktuelle Datum in der Zukunft liegt und setze Ergebnis gegebenenfalls auf -1
-        result_available = True
-        if current_date:
-            try:
-                header_date = datetime.strptime(current_date, "%d.%m.%Y")
-                if header_date > datetime.today():
-                    result_available = False
-            except Exception:
-                pass
-        if result_available and re.match(r'\d+:\d+', result_text):
-            try:
-                home_goals, away_goals = map(int, result_text.split(":"))
-            except Exception:
-                home_goals, away_goals = -1, -1
-        else:
-            home_goals, away_goals = -1, -1
-        
-        home_info = cells[3].get_text(strip=True)
-        home_rank_match = rank_pattern.search(home_info)
-        home_rank = int(home_rank_match.group(1)) if home_rank_match else None
-        home_team = rank_pattern.sub("", home_info).strip()
-        
-        away_info = cells[8].get_text(strip=True)
-        away_rank_match = rank_pattern.search(away_info)
-        away_rank = int(away_rank_match.group(1)) if away_rank_match else None
-        away_team = rank_pattern.sub("", away_info).strip()
-        
-        match_dict = {
-            "date": current_date,
-            "time": current_time,
-            "home_rank": home_rank,
-            "home_team": home_team,
-            "home_goals": home_goals,
-            "away_goals": away_goals,
-            "away_rank": away_rank,
-            "away_team": away_team
-        }
-        matches.append(match_dict)
+        matches.append(build_match(
+            current_date, current_time, cells[6].get_text(strip=True),
+            cells[3].get_text(strip=True), cells[8].get_text(strip=True),
+        ))
     return matches
 
-def get_all_data(seasons, start_day, end_day):
+# %%
+# Schnelles Parser-Backend: lxml mit gezielter XPath-Auswahl, gleiche Ausgabe wie BeautifulSoup
+# Textknoten wie bei BeautifulSoup get_text: ohne Kommentare und ohne Inhalt von script, style und template
+_LXML_TEXT = lxml.etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+def _lxml_text(element, separator=""):
+    """Entspricht BeautifulSoup get_text(separator, strip=True)."""
+    return separator.join(text.strip() for text in _LXML_TEXT(element) if text.strip())
+
+def _xpath_first_with_class(doc, tag, cls):
+    found = doc.xpath(f'(//{tag}[contains(concat(" ", normalize-space(@class), " "), " {cls} ")])[1]')
+    return found[0] if found else None
+
+def parse_page_lxml(html, season_id, spieltag):
+    """
+    Wie parse_page gefolgt von parse_detailed_matches, jedoch mit lxml. Statt den ganzen
+    Baum zu durchsuchen, werden Datumslinks, Tabelle und Resultatbereich per XPath gewählt.
+
+    Returns:
+        (league_table, matches) im selben Format wie parse_page bzw. parse_detailed_matches.
     """
-    Iteriert über alle angegebenen Spieltage für die vorgegebenen Saisons.
+    doc = lxml.html.fromstring(html) if html and html.strip() else lxml.html.fromstring("<html></html>")
+    
+    match_date = None
+    for a in doc.xpath('//a[contains(@href, "datum")]'):
+        match_date = parse_link_date(_lxml_text(a))
+        if match_date:
+            break
+    future_flag = determine_future_flag(match_date, season_id, spieltag)
+    
+    league_table = []
+    table = _xpath_first_with_class(doc, "table", "items")
+    if table is not None:
+        tbody = table.find(".//tbody")
+        if tbody is not None:
+            for row in tbody.iter("tr"):
+                cells = list(row.iter("td"))
+                if len(cells) < 10:
+                    continue
+                parsed = [_lxml_text(cells[i]) for i in (0, 2, 3, 4, 5, 6, 7, 8, 9)]
+                league_table.append(finalize_league_row(parsed, season_id, spieltag, future_flag))
+    else:
+        print("Keine aggregierte Tabelle mit class 'items' gefunden!")
+    
+    matches = []
+    responsive_div = _xpath_first_with_class(doc, "div", "responsive-table")
+    if responsive_div is not None:
+        table2 = responsive_div.find(".//table")
+        tbody2 = table2.find(".//tbody") if table2 is not None else None
+        if tbody2 is not None:
+            current_date = ""
+            current_time = ""
+            for row in tbody2.iter("tr"):
+                if "bg_blau_20" in (row.get("class") or "").split():
+                    current_date, current_time = update_header_context(_lxml_text(row, " "), current_date, current_time)
+                    continue
+                cells = list(row.iter("td"))
+                if len(cells) < 11:
+                    continue
+                matches.append(build_match(
+                    current_date, current_time, _lxml_text(cells[6]), _lxml_text(cells[3]), _lxml_text(cells[8]),
+                ))
+    else:
+        print("Keine detaillierten Tagesresultate gefunden!")
+    
+    return league_table, matches
+
+def parse_page_data(html, season_id, spieltag, backend=None):
+    """
+    Parst eine Spieltagsseite mit dem konfigurierten Backend (SPIDER_PARSER: "lxml" oder "bs4").
+
+    Returns:
+        (league_table, matches) – Tabellenzeilen und bereits geparste Spielresultate.
+    """
+    backend = backend or PARSER_BACKEND
+    if backend == "lxml":
+        return parse_page_lxml(html, season_id, spieltag)
+    if backend == "bs4":
+        league_table, match_rows = parse_page(html, season_id, spieltag)
+        return league_table, parse_detailed_matches(match_rows)
+    raise ValueError(f"Unbekanntes Parser-Backend: {backend!r} (erwartet 'lxml' oder 'bs4')")
+
+def round_complete(matches):
+    """
+    Ein Spieltag ist abgeschlossen, wenn er Partien enthält und jede davon ein Resultat hat.
+    Das Datum des ersten Spiels allein reicht nicht: Bei einer laufenden Runde liegt es bereits
+    in der Vergangenheit, während spätere Partien noch offen sind.
+    """
+    return bool(matches) and all(m["home_goals"] >= 0 and m["away_goals"] >= 0 for m in matches)
+
+def collect_page(season, spieltag, html, league_all, matches_all, parser_backend=None):
+    """
+    Parst eine Spieltagsseite und hängt Tabellenzeilen und Spielresultate (mit Season und
+    Spieltag) an league_all bzw. matches_all an.
+
+    Returns:
+        True, falls der Spieltag abgeschlossen ist (Tabelle vorhanden, alle Partien mit Resultat).
+    """
+    print(f"Verarbeite Spieltag {spieltag} für Saison {season}...")
+    league_data, detailed_matches = parse_page_data(html, season, spieltag, parser_backend)
+    if not league_data:
+        print(f"Keine Daten für Spieltag {spieltag} in Saison {season}.")
+        return False
+    league_all.extend(league_data)
+    for match in detailed_matches:
+        match["Season"] = season
+        match["Spieltag"] = spieltag
+        matches_all.append(match)
+    return not league_data[0][2] and round_complete(detailed_matches)
+
+def get_all_data(seasons, start_day, end_day, workers=SPIDER_WORKERS, rate_limit=SPIDER_RATE_LIMIT, pages=None,
+                 cache=None, parser_backend=None, refresh=()):
+    """
+    Iteriert über alle angegebenen Spieltage für die vorgegebenen Saisons
+    (bzw. nur über die übergebenen (season, spieltag)-Paare in pages).
+    Gültige Seiten aus dem PageCache (falls übergeben) werden direkt verwendet; die übrigen
+    und alle Seiten in refresh werden über einen gemeinsamen Browser-Pool mit `workers`
+    parallelen Sessions abgerufen (höchstens `rate_limit` Anfragen pro Sekunde), geparst und
+    im Cache abgelegt. Als abgeschlossen (ohne Ablauf) gilt eine Seite nur, wenn alle Partien
+    ein Resultat haben (round_complete).
     Extrahiert sowohl die aggregierte Liga-Tabelle als auch die detaillierten Spielresultate.
     Fügt für jeden Datensatz Season und Spieltag hinzu.
     """
     league_all = []
     matches_all = []
-    for season in seasons:
-        for spieltag in range(start_day, end_day + 1):
-            print(f"Verarbeite Spieltag {spieltag} für Saison {season}...")
-            league_data, raw_match_rows = get_table_and_match_results(season, spieltag)
-            if league_data is None:
-                print(f"Keine Daten für Spieltag {spieltag} in Saison {season}.")
-                continue
-            league_all.extend(league_data)
-            detailed_matches = parse_detailed_matches(raw_match_rows)
-            for match in detailed_matches:
-                match["Season"] = season
-                match["Spieltag"] = spieltag
-                matches_all.append(match)
+    if pages is None:
+        pages = [(season, spieltag) for season in seasons for spieltag in range(start_day, end_day + 1)]
+    missing = []
+    refresh = set(refresh)
+    for season, spieltag in pages:
+        cached = cache is not None and (season, spieltag) not in refresh
+        html = cache.get(season, spieltag) if cached else None
+        if html is None:
+            missing.append((season, spieltag))
+        else:
+            collect_page(season, spieltag, html, league_all, matches_all, parser_backend)
+    if missing:
+        failed = []
+        with PageFetcher(workers=workers, rate_limit=rate_limit) as fetcher:
+            for season, spieltag, html in fetcher.fetch_many(missing):
+                if html is None:
+                    failed.append((season, spieltag))
+                    continue
+                complete = collect_page(season, spieltag, html, league_all, matches_all, parser_backend)
+                if cache is not None:
+                    cache.put(season, spieltag, html, future=not complete)
+        if failed:
+            print(f"{len(failed)} Seiten konnten nicht abgerufen werden: {failed}")
+    return league_all, matches_all
+
+def reparse_from_cache(cache, seasons=None, parser_backend=None):
+    """
+    Parst alle im Cache gespeicherten Seiten erneut (ohne Browser), z.B. nach einer
+    Änderung an parse_league_row oder parse_detailed_matches.
+    """
+    league_all = []
+    matches_all = []
+    for season, spieltag in cache.entries():
+        if seasons and season not in seasons:
+            continue
+        collect_page(season, spieltag, cache.load(season, spieltag), league_all, matches_all, parser_backend)
     return league_all, matches_all
 
 # %% 
-# Hauptprogramm – Sammle Daten für einen bestimmten Zeitraum (hier z. B. Spieltag 30 bis 33 der Saison 2024)
-league_all_data, matches_all_data = get_all_data([2023 , 2024], 1, 38)
+# Inkrementeller Modus: nur neue, noch als Future markierte und der letzte abgeschlossene Spieltag
+def get_completed_pages(collection, seasons):
+    """
+    Liefert die Menge der (Season, Spieltag)-Paare, deren Partien in der "matches"-Collection
+    alle ein Resultat haben (wie round_complete). Das Future-Flag der Tabelle hängt nur am
+    Datum des ersten Spiels und markiert eine laufende Runde bereits als vergangen.
+    """
+    pipeline = [
+        {"$match": {"Season": {"$in": list(seasons)}}},
+        {"$group": {
+            "_id": {"Season": "$Season", "Spieltag": "$Spieltag"},
+            "home_goals": {"$min": "$home_goals"},
+            "away_goals": {"$min": "$away_goals"},
+        }},
+    ]
+    return {
+        (int(doc["_id"]["Season"]), int(doc["_id"]["Spieltag"]))
+        for doc in collection.aggregate(pipeline)
+        if doc["home_goals"] >= 0 and doc["away_goals"] >= 0
+    }
+
+def plan_incremental_pages(seasons, start_day, end_day, completed):
+    """
+    Bestimmt die abzurufenden Seiten im inkrementellen Modus.
 
-# Erstelle DataFrames für die aggregierte Tabelle und die detaillierten Ergebnisse
-league_columns = ["Season", "Spieltag", "Future", "Rank", "Team", "Spiele", "G", "U", "V", "Tore", "Goal_Diff", "Points"]
-df_league_table = pd.DataFrame(league_all_data, columns=league_columns)
+    Abgerufen werden fehlende und noch nicht abgeschlossene Spieltage. Hat eine Saison solche
+    Spieltage, wird zusätzlich ihr letzter abgeschlossener Spieltag erneut geladen
+    (nachträglich gewertete Spiele); er steht in refresh und muss am Seiten-Cache vorbei
+    abgerufen werden. Vollständig abgeschlossene Saisons werden übersprungen.
 
-match_columns = ["Season", "Spieltag", "date", "time", "home_rank", "home_team", "home_goals", "away_goals", "away_rank", "away_team"]
-df_matches = pd.DataFrame(matches_all_data, columns=match_columns)
+    Returns:
+        (to_fetch, skipped, refresh): Listen von (season, spieltag)-Paaren.
+    """
+    to_fetch = []
+    skipped = []
+    refresh = []
+    for season in seasons:
+        days = range(start_day, end_day + 1)
+        done = [d for d in days if (season, d) in completed]
+        missing = [d for d in days if (season, d) not in completed]
+        refresh_days = [max(done)] if missing and done else []
+        fetch_days = sorted(set(missing) | set(refresh_days))
+        to_fetch.extend((season, d) for d in fetch_days)
+        skipped.extend((season, d) for d in days if d not in fetch_days)
+        refresh.extend((season, d) for d in refresh_days)
+    return to_fetch, skipped, refresh
 
 # %% 
 # Upsert in MongoDB: Aktualisiert vorhandene Einträge oder fügt neue hinzu basierend auf einem eindeutigen Schlüssel.
-def upsert_records(collection, records, key_fields):
-    for record in records:
-        filter_query = {field: record[field] for field in key_fields}
-        collection.update_one(filter_query, {"$set": record}, upsert=True)
+def ensure_key_index(collection, key_fields):
+    """
+    Stellt einen eindeutigen Compound-Index über die Schlüsselfelder sicher, damit jeder
+    Upsert-Filter den Index statt eines Collection-Scans verwendet und kein Schlüssel
+    doppelt gespeichert wird. Existiert er bereits, passiert nichts.
 
-# Wandle DataFrames in Listen von Dictionaries um
-league_records = df_league_table.to_dict(orient="records")
-matches_records = df_matches.to_dict(orient="records")
+    Ein früher ohne unique angelegter Index wird erst entfernt, nachdem der eindeutige Index
+    (unter dem Namen <name>_unique) angelegt ist. Scheitert das, etwa weil die Collection
+    bereits doppelte Schlüssel enthält, bleibt der bisherige Index bestehen (bzw. wird ein
+    nicht eindeutiger angelegt) und der Import läuft mit einer Warnung weiter.
 
-# Definiere eindeutige Schlüssel für den Delta-Import
-league_key_fields = ["Season", "Spieltag", "Team"]
-matches_key_fields = ["Season", "Spieltag", "date", "time", "home_team", "away_team"]
+    Returns:
+        Name des verwendeten Index.
+    """
+    keys = [(field, ASCENDING) for field in key_fields]
+    name = "_".join(f"{field}_1" for field in key_fields)
+    indexes = collection.index_information()
+    same_keys = [index for index, info in indexes.items() if list(info["key"]) == keys]
+    for index in same_keys:
+        if indexes[index].get("unique"):
+            return index
+    try:
+        unique = collection.create_index(keys, name=f"{name}_unique" if same_keys else name, unique=True)
+    except OperationFailure as e:
+        print(f"Eindeutiger Index auf {key_fields} in '{collection.name}' konnte nicht angelegt werden "
+              f"({e}); doppelte Schlüssel bitte bereinigen. Der Import verwendet einen nicht eindeutigen Index.")
+        return same_keys[0] if same_keys else collection.create_index(keys, name=name)
+    for index in same_keys:
+        collection.drop_index(index)
+    return unique
+
+
+def upsert_records(collection, records, key_fields, batch_size=UPSERT_BATCH_SIZE):
+    """
+    Schreibt die Datensätze als Bulk-Upserts (UpdateOne mit upsert=True) in Blöcken von
+    batch_size Operationen. Mit ordered=False kann der Server die Operationen eines
+    Blocks ohne Abbruch bei Einzelfehlern abarbeiten.
+
+    Returns:
+        dict mit den Anzahlen "upserted" (neu eingefügt), "modified" (geändert)
+        und "unchanged" (gefunden, aber unverändert).
+    """
+    counts = {"upserted": 0, "modified": 0, "unchanged": 0}
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        operations = [
+            UpdateOne({field: record[field] for field in key_fields}, {"$set": record}, upsert=True)
+            for record in batch
+        ]
+        result = collection.bulk_write(operations, ordered=False)
+        counts["upserted"] += result.upserted_count
+        counts["modified"] += result.modified_count
+        counts["unchanged"] += result.matched_count - result.modified_count
+    return counts
+
+# %% 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Transfermarkt-Spider: Tabellen und Resultate in MongoDB laden.")
+    parser.add_argument("--seasons", type=int, nargs="+", default=[2023, 2024], help="Saison-IDs (z.B. 2023 2024)")
+    parser.add_argument("--start-day", type=int, default=1, help="erster Spieltag")
+    parser.add_argument("--end-day", type=int, default=38, help="letzter Spieltag")
+    parser.add_argument("--incremental", action="store_true",
+                        help="nur fehlende, noch als Future markierte und den letzten abgeschlossenen Spieltag abrufen")
+    parser.add_argument("--workers", type=int, default=SPIDER_WORKERS, help="parallele Browser")
+    parser.add_argument("--rate-limit", type=float, default=SPIDER_RATE_LIMIT, help="maximale Anfragen pro Sekunde")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Ordner des Seiten-Caches")
+    parser.add_argument("--no-cache", action="store_true", help="Seiten-Cache nicht verwenden")
+    parser.add_argument("--reparse", action="store_true",
+                        help="keine Seiten abrufen, sondern alle Seiten im Cache neu parsen")
+    parser.add_argument("--export-csv", metavar="DIR", help="Tabellen zusätzlich als CSV in DIR exportieren")
+    parser.add_argument("--no-db", action="store_true", help="keinen Delta-Import in MongoDB durchführen")
+    parser.add_argument("--parser", choices=["lxml", "bs4"], default=PARSER_BACKEND, help="Parser-Backend")
+    args = parser.parse_args(argv)
+    # Der inkrementelle Modus liest die abgeschlossenen Spieltage aus MongoDB
+    if args.incremental and args.no_db:
+        parser.error("--incremental benötigt die Datenbank und kann nicht mit --no-db kombiniert werden.")
+    return args
+
+def main(argv=None):
+    """
+    Hauptprogramm – Sammelt Tabellen und Resultate, schreibt sie per Delta-Import in die MongoDB.
+    """
+    args = parse_args(argv)
+    db = None if args.no_db else get_database()
+    cache = None if args.no_cache else PageCache(args.cache_dir)
+
+    pages = [(season, day) for season in args.seasons for day in range(args.start_day, args.end_day + 1)]
+    skipped = []
+    refresh = []
+    if args.reparse:
+        if cache is None:
+            raise ValueError("--reparse benötigt den Seiten-Cache (ohne --no-cache).")
+        league_all_data, matches_all_data = reparse_from_cache(cache, parser_backend=args.parser)
+        pages = []
+    else:
+        if args.incremental:
+            completed = get_completed_pages(db["matches"], args.seasons)
+            pages, skipped, refresh = plan_incremental_pages(args.seasons, args.start_day, args.end_day, completed)
+        print(f"Seiten: {len(pages)} abzurufen, {len(skipped)} übersprungen.")
+        league_all_data, matches_all_data = get_all_data(
+            args.seasons, args.start_day, args.end_day, workers=args.workers, rate_limit=args.rate_limit,
+            pages=pages, cache=cache, parser_backend=args.parser, refresh=refresh,
+        )
+
+    # Erstelle DataFrames für die aggregierte Tabelle und die detaillierten Ergebnisse
+    league_columns = ["Season", "Spieltag", "Future", "Rank", "Team", "Spiele", "G", "U", "V", "Tore", "Goal_Diff", "Points"]
+    df_league_table = pd.DataFrame(league_all_data, columns=league_columns)
+
+    match_columns = ["Season", "Spieltag", "date", "time", "home_rank", "home_team", "home_goals", "away_goals", "away_rank", "away_team"]
+    df_matches = pd.DataFrame(matches_all_data, columns=match_columns)
+
+    if cache is not None:
+        print(cache.summary())
+
+    # Exportiere die Ergebnisse auch lokal als CSV
+    if args.export_csv:
+        os.makedirs(args.export_csv, exist_ok=True)
+        df_matches.to_csv(os.path.join(args.export_csv, "df_matches_raw.csv"), index=False)
+        df_league_table.to_csv(os.path.join(args.export_csv, "df_league_table_raw.csv"), index=False)
+
+    if db is None:
+        return
+
+    # Wandle DataFrames in Listen von Dictionaries um
+    league_records = df_league_table.to_dict(orient="records")
+    matches_records = df_matches.to_dict(orient="records")
 
-# Collections auswählen
-league_collection = db["league-tables"]
-matches_collection = db["matches"]
+    # Collections auswählen
+    league_collection = db["league-tables"]
+    matches_collection = db["matches"]
 
-# Clear Collections (optional)
-#league_collection.delete_many({})
-#matches_collection.delete_many({})
+    # Clear Collections (optional)
+    #league_collection.delete_many({})
+    #matches_collection.delete_many({})
 
-# Führe den Upsert durch
-upsert_records(league_collection, league_records, league_key_fields)
-upsert_records(matches_collection, matches_records, matches_key_fields)
+    # Indizes für die Upsert-Filter sicherstellen und Bulk-Upsert durchführen
+    ensure_key_index(league_collection, league_key_fields)
+    ensure_key_index(matches_collection, matches_key_fields)
+    league_counts = upsert_records(league_collection, league_records, league_key_fields)
+    matches_counts = upsert_records(matches_collection, matches_records, matches_key_fields)
 
-print("Delta-Import: Daten wurden erfolgreich in MongoDB aktualisiert bzw. eingefügt.")
+    print("Delta-Import: Daten wurden erfolgreich in MongoDB aktualisiert bzw. eingefügt.")
+    print(f"  league-tables: {league_counts}")
+    print(f"  matches: {matches_counts}")
+    print(f"  Seiten abgerufen: {len(pages)}, übersprungen: {len(skipped)}")
 
-# Exportiere die Ergebnisse auch lokal als CSV
-#df_matches.to_csv("../data/df_matches_raw.csv", index=False)
-#df_league_table.to_csv("../data/df_league_table_raw.csv", index=False)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Gemeinsame Einstellungen der Tests (Aufruf aus dem Projektordner: python -m pytest -q).
+Backend, Spider und der Generator synthetischer Daten aus benchmarks/ werden wie in den
+Skripten direkt über sys.path importiert.
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import joblib
+import mongomock
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+for directory in ["backend", "spider", "benchmarks"]:
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope="module")
+def make_app(tmp_path_factory):
+    """
+    Erzeugt Flask-Apps auf synthetischen Daten: mongomock statt MongoDB, Modell, Skalierer und
+    Unsicherheits-Artefakt (Version 1) aus einem lokalen Ordner (MODEL_SOURCE_DIR), keine
+    Hintergrund-Threads. make_app() gibt einen Namespace mit app, mongo (mongomock-Client),
+    model_dir, league_df und scaler zurück.
+    """
+    import data_source
+    from sklearn.linear_model import LogisticRegression
+    from synthetic import FEATURES, fit_model_and_scaler, generate_league, prepare_league_df
+    from uncertainty import export_uncertainty, fit_bootstrap_ensemble, fit_calibrator
+
+    league, matches = generate_league(n_seasons=3, future_from=34)
+    league_df = prepare_league_df(league)
+    model, scaler = fit_model_and_scaler(league_df)
+    X_scaled, y = scaler.transform(league_df[FEATURES]), league_df["relegated"].to_numpy()
+    calibration, _ = fit_calibrator(model.predict_proba(X_scaled)[:, 1], y, league_df["Season"].to_numpy())
+    coef, intercept = fit_bootstrap_ensemble(X_scaled, y, lambda: LogisticRegression(max_iter=1000), members=20)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("MONGODB_URI", "mongodb://test")
+        patch.setenv("LEAGUE_DATA", "latest")
+        patch.setenv("SIMULATION_RUNS", "1000")
+
+        def make():
+            model_dir = tmp_path_factory.mktemp("models")
+            joblib.dump(model, model_dir / "model-1.pkl")
+            joblib.dump(scaler, model_dir / "scaler-1.pkl")
+            export_uncertainty(str(model_dir / "model-1.uncertainty"), calibration, calibration, scaler, coef, intercept)
+            mongo = mongomock.MongoClient()
+            mongo["mdm-project1"]["league-tables"].insert_many(league.to_dict("records"))
+            mongo["mdm-project1"]["matches"].insert_many(matches.to_dict("records"))
+            # Alle Verbindungen dieser App (auch die des LeagueFeed) gehen an denselben mongomock-Client
+            patch.setattr(data_source, "MongoClient", lambda uri: mongo)
+            patch.setenv("MODEL_SOURCE_DIR", str(model_dir))
+            import app
+
+            return SimpleNamespace(
+                app=app.create_app(start_watcher=False), mongo=mongo, model_dir=model_dir,
+                league_df=league_df, scaler=scaler,
+            )
+
+        yield make
+
+
+@pytest.fixture(scope="module")
+def app_client(make_app):
+    """Testclient einer gemeinsamen App pro Testmodul (siehe make_app)."""
+    return make_app().app.test_client()
+
+
+@pytest.fixture
+def publish_matchday():
+    """
+    Schreibt wie der Spider einen Spieltag der letzten Saison in den mongomock-Client einer App:
+    publish(mongo, spieltag, points=None) übernimmt den Vortag mit einem Remis für jedes Team
+    (Spiele, U und Punkte + 1); points ersetzt die Punkte einzelner Teams (Korrekturen).
+    """
+    def publish(mongo, spieltag, points=None):
+        collection = mongo["mdm-project1"]["league-tables"]
+        season = max(collection.distinct("Season"))
+        for doc in collection.find({"Season": season, "Spieltag": spieltag - 1, "Future": False}, {"_id": 0}):
+            doc.update(Spieltag=spieltag, Future=False, Spiele=doc["Spiele"] + 1, U=doc["U"] + 1,
+                       Points=doc["Points"] + 1)
+            doc["Points"] = (points or {}).get(doc["Team"], doc["Points"])
+            key = {"Season": season, "Spieltag": spieltag, "Team": doc["Team"]}
+            collection.replace_one(key, doc, upsert=True)
+
+    return publish
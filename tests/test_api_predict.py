@@ -0,0 +1,20 @@
+import pytest
+
+
+def test_predict_accepts_team_list(app_client):
+    teams = [p["team"] for p in app_client.get("/api/predict").get_json()["predictions"]][:2]
+    response = app_client.post("/api/predict", json={"teams": teams})
+    assert response.status_code == 200
+    assert [p["team"] for p in response.get_json()["predictions"]] == teams
+
+
+@pytest.mark.parametrize("body", [[1, 2], "all", {"teams": 5}, {"teams": ["A", 1]}, {"teams": {"a": 1}}])
+def test_predict_rejects_malformed_body(app_client, body):
+    response = app_client.post("/api/predict", json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_scenario_rejects_non_object_body(app_client):
+    response = app_client.post("/api/scenario", json=[{"fixture": 0}])
+    assert response.status_code == 400
@@ -0,0 +1,29 @@
+"""
+Durchsatz der Parser-Backends als pytest-benchmark-Tests (Gegenstück zu benchmarks/bench_parser.py).
+Nur die Messungen: python -m pytest tests/test_bench_parser.py --benchmark-only
+"""
+import pytest
+
+from bench_parser import load_pages, parse_all
+
+# BeautifulSoup braucht über 100 ms pro Seite; gemessen wird daher ein fester Ausschnitt
+BENCH_PAGES = 10
+BENCH_ROUNDS = 3
+
+
+@pytest.fixture(scope="module")
+def pages():
+    return load_pages()
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_parser_throughput(benchmark, pages, backend):
+    benchmark.group = "parse_page_data"
+    records = benchmark.pedantic(parse_all, args=(pages[:BENCH_PAGES], backend),
+                                 rounds=BENCH_ROUNDS, iterations=1)
+    assert len(records) == BENCH_PAGES
+    assert all(league_data for league_data, _ in records)
+
+
+def test_backends_identical_on_fixture_pages(pages):
+    assert parse_all(pages, "lxml") == parse_all(pages, "bs4")
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from data_source import LEAGUE_CSV, CsvDataSource
+from features import FeatureStore
+from synthetic import generate_league
+
+
+def write_league(directory, league):
+    directory.mkdir(exist_ok=True)
+    league.to_csv(directory / LEAGUE_CSV, index=False)
+    return CsvDataSource(str(directory))
+
+
+def last_matchday(df):
+    return df[(df["Season"] == 2010) & (df["Spieltag"] == 10)]
+
+
+def test_refresh_rereads_partially_written_high_water(tmp_path):
+    league = generate_league(n_seasons=1, n_spieltage=12)[0]
+    league = league[league["Spieltag"] <= 10]
+    store = FeatureStore(str(tmp_path / "features"))
+
+    # Spieltag 10 zunächst nur teilweise geschrieben, ein Team mit falschen Punkten
+    partial = league[(league["Spieltag"] < 10) | (league["Rank"] <= 6)].copy()
+    partial.loc[(partial["Spieltag"] == 10) & (partial["Rank"] == 1), "Points"] = 99
+    df = store.refresh(write_league(tmp_path / "data", partial))
+    assert len(last_matchday(df)) == 6
+    version = store.version
+
+    df = store.refresh(write_league(tmp_path / "data", league))
+    assert store.version == version + 1
+    matchday = last_matchday(df)
+    assert len(matchday) == 12 and matchday["Team"].is_unique
+    expected = league[league["Spieltag"] == 10].set_index("Team")["Points"]
+    pd.testing.assert_series_equal(matchday.set_index("Team")["Points"].loc[expected.index], expected, check_dtype=False)
+
+    # Unverändert: keine neue Version
+    store.refresh(write_league(tmp_path / "data", league))
+    assert store.version == version + 1
+
+
+def test_refresh_rebuilds_when_source_changes(tmp_path):
+    league = generate_league(n_seasons=1, n_spieltage=12)[0]
+    store = FeatureStore(str(tmp_path / "features"))
+    store.refresh(write_league(tmp_path / "a", league[league["Spieltag"] <= 10]))
+
+    other = league[league["Spieltag"] <= 4]
+    df = store.refresh(write_league(tmp_path / "b", other))
+    assert df["Spieltag"].max() == 4 and len(df) == len(other)
+    assert store.manifest()["source"] == {"name": "csv", "location": str(tmp_path / "b" / LEAGUE_CSV)}
@@ -0,0 +1,65 @@
+from selenium.common.exceptions import WebDriverException
+
+from fetcher import PageFetcher
+
+
+class FakeDriver:
+    """Ersatz für einen Chrome-Browser; nach einem fehlgeschlagenen Abruf bleibt die Session tot."""
+
+    def __init__(self, failing):
+        self.failing = failing
+        self.dead = False
+        self.quit_called = False
+        self.page_source = None
+
+    def get(self, url):
+        if self.dead or any(url.endswith(f"spieltag={spieltag}") for spieltag in self.failing):
+            self.dead = True
+            raise WebDriverException("invalid session id")
+        self.page_source = f"<html>{url}</html>"
+
+    def find_element(self, by, value):
+        return object()
+
+    def quit(self):
+        self.quit_called = True
+
+
+def make_fetcher(failing, workers=1):
+    drivers = []
+
+    def factory():
+        drivers.append(FakeDriver(failing))
+        return drivers[-1]
+
+    fetcher = PageFetcher(workers=workers, rate_limit=0, base_url="http://localhost", driver_factory=factory)
+    return fetcher, drivers
+
+
+def test_failed_page_yields_none_and_run_continues():
+    fetcher, drivers = make_fetcher(failing={2})
+    with fetcher:
+        results = list(fetcher.fetch_many([(2024, 1), (2024, 2), (2024, 3), (2024, 4)]))
+
+    assert [(season, spieltag) for season, spieltag, _ in results] == [(2024, 1), (2024, 2), (2024, 3), (2024, 4)]
+    assert results[1][2] is None
+    assert all(html and f"spieltag={spieltag}" in html for _, spieltag, html in results if spieltag != 2)
+
+
+def test_failed_driver_is_quit_and_replaced():
+    fetcher, drivers = make_fetcher(failing={2})
+    with fetcher:
+        list(fetcher.fetch_many([(2024, 1), (2024, 2), (2024, 3)]))
+        assert len(drivers) == 2
+        assert drivers[0].quit_called
+        assert fetcher._drivers == [drivers[1]]
+
+
+def test_pool_never_exceeds_workers_after_failures():
+    fetcher, drivers = make_fetcher(failing={1, 3, 5}, workers=2)
+    with fetcher:
+        results = list(fetcher.fetch_many([(2024, spieltag) for spieltag in range(1, 9)]))
+        assert len(fetcher._drivers) <= 2
+
+    assert [spieltag for _, spieltag, html in results if html is None] == [1, 3, 5]
+    assert sum(not driver.dead for driver in drivers) <= 2
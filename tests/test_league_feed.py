@@ -0,0 +1,49 @@
+import time
+
+
+def served(client):
+    """Punkte und Spieltag pro Team laut /api/predict."""
+    predictions = client.get("/api/predict").get_json()["predictions"]
+    return {p["team"]: (p["details"]["Aktuelle Punkte"], p["details"]["Aktueller Spieltag"]) for p in predictions}
+
+
+def test_feed_ingests_new_and_corrected_matchday(make_app, publish_matchday):
+    env = make_app()
+    client, feed = env.app.test_client(), env.app.config["LEAGUE_FEED"]
+    collection = env.mongo["mdm-project1"]["league-tables"]
+    before = served(client)
+    season = feed.state.high_water[0]
+
+    publish_matchday(env.mongo, 34)
+    assert feed.ingest(collection) == len(before)
+    after = served(client)
+    assert feed.state.high_water == [season, 34]
+    assert all(after[team] == (points + 1, 34) for team, (points, _) in before.items())
+
+    # Korrektur eines bereits übernommenen Spieltags: nur diese Zeile wird ersetzt
+    team = next(iter(before))
+    publish_matchday(env.mongo, 34, points={team: 99})
+    assert feed.ingest(collection) == 1
+    assert feed.ingest(collection) == 0
+    corrected = served(client)
+    assert corrected[team] == (99, 34)
+    assert {t: v for t, v in corrected.items() if t != team} == {t: v for t, v in after.items() if t != team}
+    matchday = feed.state.league_df
+    matchday = matchday[(matchday["Season"] == season) & (matchday["Spieltag"] == 34)]
+    assert len(matchday) == len(before) and matchday["Team"].is_unique
+
+
+def test_poll_mode_picks_up_new_matchday(make_app, publish_matchday):
+    env = make_app()
+    feed = env.app.config["LEAGUE_FEED"]
+    feed.mode, feed.poll_interval = "poll", 0.02
+    feed.start()
+    try:
+        publish_matchday(env.mongo, 34)
+        deadline = time.monotonic() + 5
+        while feed.state.high_water[1] != 34 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        feed.stop()
+    assert feed.state.high_water[1] == 34
+    assert feed.summary()["mode"] == "poll" and feed.stats["updates"] == 1
@@ -0,0 +1,30 @@
+from match_features import MATCH_FEATURE_COLUMNS, MatchFeatureEngine
+from synthetic import generate_league
+
+
+def test_partial_matchday_returns_empty_frame():
+    _, matches = generate_league(n_seasons=1, start_season=2024, future_from=32)
+    engine = MatchFeatureEngine()
+    processed = engine.process(matches[matches["Spieltag"] <= 31])
+    assert engine.last_processed == (2024, 31)
+    assert len(processed) > 0
+
+    # Spieltag 32: nur drei von sechs Partien gespielt
+    batch = matches[matches["Spieltag"] == 32].copy()
+    batch.loc[batch.index[:3], ["home_goals", "away_goals"]] = [[1, 0], [2, 2], [0, 3]]
+    before = engine.latest()
+    result = engine.process(batch)
+
+    assert result.empty
+    assert list(result.columns) == ["Season", "Spieltag", "Team"] + MATCH_FEATURE_COLUMNS
+    assert engine.last_processed == (2024, 31)
+    assert engine.latest() == before
+
+
+def test_matchday_is_processed_once_complete():
+    _, matches = generate_league(n_seasons=1, start_season=2024)
+    engine = MatchFeatureEngine()
+    engine.process(matches[matches["Spieltag"] <= 31])
+    result = engine.process(matches[matches["Spieltag"] == 32])
+    assert set(result["Spieltag"]) == {32}
+    assert engine.last_processed == (2024, 32)
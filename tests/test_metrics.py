@@ -0,0 +1,49 @@
+import logging
+import time
+
+import pytest
+from flask import Flask
+
+from metrics import Metrics, SlowRequestProfiler, instrument
+
+
+def test_profiler_waits_while_no_request_is_active(tmp_path):
+    profiler = SlowRequestProfiler(slow_ms=1, interval_ms=1, directory=str(tmp_path))
+    thread_id = profiler.begin()
+    time.sleep(0.05)
+    assert profiler.end(thread_id, 0.05, "test") is not None
+
+    deadline = time.monotonic() + 1.0
+    while profiler._wake.is_set() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert not profiler._wake.is_set()
+
+
+def test_slow_request_is_logged(tmp_path, caplog):
+    app = Flask(__name__)
+
+    @app.route("/slow")
+    def slow():
+        time.sleep(0.03)
+        return "ok"
+
+    instrument(app, Metrics(), SlowRequestProfiler(slow_ms=10, interval_ms=1, directory=str(tmp_path)))
+    with caplog.at_level(logging.WARNING):
+        assert app.test_client().get("/slow").status_code == 200
+    assert any("Langsame Anfrage slow" in record.getMessage() for record in caplog.records)
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_profiler_is_released_after_unhandled_exception(tmp_path):
+    app = Flask(__name__)
+    app.testing = True
+
+    @app.route("/fail")
+    def fail():
+        raise RuntimeError("boom")
+
+    profiler = SlowRequestProfiler(slow_ms=10, interval_ms=1, directory=str(tmp_path))
+    instrument(app, Metrics(), profiler)
+    with pytest.raises(RuntimeError):
+        app.test_client().get("/fail")
+    assert profiler._active == {}
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import joblib
+from sklearn.linear_model import LogisticRegression
+
+from synthetic import FEATURES
+
+
+def blocking(model, entered, release):
+    """Lässt predict_proba von model warten, bis release gesetzt ist (Anfrage "in flight")."""
+    predict_proba = model.predict_proba
+
+    def wrapped(X):
+        entered.set()
+        release.wait(5)
+        return predict_proba(X)
+
+    model.predict_proba = wrapped
+
+
+def test_hot_reload_swaps_bundle_while_in_flight_request_keeps_old(make_app):
+    env = make_app()
+    client, store = env.app.test_client(), env.app.config["MODEL_STORE"]
+    teams = ",".join(store.bundle.extras.teams[:3])
+    before = client.get(f"/api/predict?teams={teams}").get_json()
+    assert client.get("/version").get_json()["model_version"] == 1
+
+    entered, release = threading.Event(), threading.Event()
+    blocking(store.bundle.model, entered, release)
+    in_flight = {}
+    thread = threading.Thread(
+        target=lambda: in_flight.update(client.get(f"/api/predict?teams={teams}&spieltag=33").get_json())
+    )
+    thread.start()
+    assert entered.wait(5)
+
+    # Neue Version ablegen: stark regularisiertes Modell mit anderen Wahrscheinlichkeiten
+    X, y = env.scaler.transform(env.league_df[FEATURES]), env.league_df["relegated"]
+    joblib.dump(LogisticRegression(C=1e-3).fit(X, y), env.model_dir / "model-2.pkl")
+    joblib.dump(env.scaler, env.model_dir / "scaler-2.pkl")
+    assert store.check_for_update()
+    assert not store.check_for_update()
+
+    assert client.get("/version").get_json()["model_version"] == 2
+    after = client.get(f"/api/predict?teams={teams}").get_json()
+    assert after["model_version"] == 2
+    assert [p["probability"] for p in after["predictions"]] != [p["probability"] for p in before["predictions"]]
+
+    release.set()
+    thread.join(5)
+    assert in_flight["model_version"] == 1
+    # Gleicher Tabellenstand (Spieltag 33 ist der aktuellste), gleiches Modell und Artefakt wie vorher
+    assert in_flight["predictions"] == before["predictions"]
+
+
+def test_load_timing_excludes_uncertainty_artifact(make_app):
+    env = make_app()
+    store = env.app.config["MODEL_STORE"]
+    fetch_uncertainty = store.source.fetch_uncertainty
+
+    def slow_fetch_uncertainty(version):
+        time.sleep(0.2)
+        return fetch_uncertainty(version)
+
+    store.source.fetch_uncertainty = slow_fetch_uncertainty
+    bundle = store.load(1)
+    assert bundle.uncertainty is not None
+    assert bundle.timings["load"] < 0.2
+    assert "load_uncertainty" in bundle.timings
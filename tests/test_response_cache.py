@@ -0,0 +1,49 @@
+import joblib
+from sklearn.linear_model import LogisticRegression
+
+from synthetic import FEATURES
+
+
+def test_second_request_is_a_hit_and_revalidates(app_client):
+    first = app_client.get("/api/predict?teams=all")
+    second = app_client.get("/api/predict?teams=all")
+    assert first.headers["X-Cache"] == "MISS" and second.headers["X-Cache"] == "HIT"
+    assert first.get_data() == second.get_data() and first.headers["ETag"] == second.headers["ETag"]
+
+    not_modified = app_client.get("/api/predict?teams=all", headers={"If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304 and not_modified.get_data() == b""
+    since = app_client.get("/api/predict?teams=all", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert since.status_code == 304
+
+
+def test_only_successful_responses_are_stored(make_app):
+    env = make_app()
+    client, cache = env.app.test_client(), env.app.config["RESPONSE_CACHE"]
+    for _ in range(2):
+        response = client.get("/api/predict?teams=Unbekannt")
+        assert response.status_code == 404 and "X-Cache" not in response.headers
+    assert len(cache) == 0 and cache.stats["misses"] == 2
+
+
+def test_model_and_data_swap_change_etag(make_app, publish_matchday):
+    env = make_app()
+    client = env.app.test_client()
+    etag = client.get("/api/predict").headers["ETag"]
+
+    # Modellwechsel
+    X, y = env.scaler.transform(env.league_df[FEATURES]), env.league_df["relegated"]
+    joblib.dump(LogisticRegression(C=1e-3).fit(X, y), env.model_dir / "model-2.pkl")
+    joblib.dump(env.scaler, env.model_dir / "scaler-2.pkl")
+    assert env.app.config["MODEL_STORE"].check_for_update()
+    response = client.get("/api/predict", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["X-Cache"] == "MISS"
+    assert response.headers["ETag"] != etag
+    etag = response.headers["ETag"]
+
+    # Neuer Spieltag über den LeagueFeed
+    publish_matchday(env.mongo, 34)
+    assert env.app.config["LEAGUE_FEED"].ingest(env.mongo["mdm-project1"]["league-tables"]) > 0
+    response = client.get("/api/predict", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["X-Cache"] == "MISS"
+    assert response.headers["ETag"] != etag
+    assert env.app.config["RESPONSE_CACHE"].stats["invalidations"] == 2
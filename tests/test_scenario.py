@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import FEATURES
+from scenario import ScenarioEngine
+
+TEAMS = ["FC Basel", "FC Zürich", "Servette FC", "FC Luzern"]
+
+
+def table_rows():
+    # Spieltag der Zeile vor der Anzahl Spiele, wie bei Seiten künftiger Spieltage mit aktueller Tabelle
+    rows = {}
+    for rank, (team, points, diff) in enumerate(zip(TEAMS, [20, 15, 15, 5], [8, 3, 1, -12]), start=1):
+        rows[team] = {
+            "Season": 2024, "Spieltag": 14, "Spiele": 10, "Team": team, "Rank": rank, "Points": points,
+            "Goal_Diff": diff, "G": points // 3, "U": points % 3, "V": 10 - points // 3 - points % 3,
+            "Restspiele": 28, "Estimated_Extra_Points": 28 * 1.2,
+        }
+    return rows
+
+
+def match(season, spieltag, home, away, home_goals=-1, away_goals=-1):
+    return {"Season": season, "Spieltag": spieltag, "home_team": home, "away_team": away,
+            "home_goals": home_goals, "away_goals": away_goals}
+
+
+@pytest.fixture
+def engine():
+    matches = pd.DataFrame([
+        match(2023, 11, "FC Basel", "FC Zürich"),               # Vorsaison
+        match(2024, 10, "FC Basel", "FC Zürich"),               # bereits gespielt (10 Spiele)
+        match(2024, 11, "FC Basel", "FC Luzern", 2, 0),         # schon mit Resultat
+        match(2024, 11, "FC Basel", "FC Zürich"),
+        match(2024, 11, "Servette FC", "FC Luzern"),
+        match(2024, 12, "FC Zürich", "FC Thun"),                # Team nicht in der Tabelle
+        match(2024, 12, "FC Luzern", "FC Basel"),
+    ])
+    return ScenarioEngine.from_data(table_rows(), matches, FEATURES)
+
+
+class FeatureModel:
+    """Deterministisches Modell auf den unskalierten Features (Punkte senken die Wahrscheinlichkeit)."""
+
+    def predict_proba(self, X):
+        strength = X[:, FEATURES.index("Points")] + 0.1 * X[:, FEATURES.index("Estimated_Extra_Points")]
+        p = 1.0 / (1.0 + np.exp(0.2 * (strength - 12)))
+        return np.column_stack([1.0 - p, p])
+
+
+class IdentityScaler:
+    def transform(self, X):
+        return np.asarray(X, dtype=float)
+
+
+def test_from_data_keeps_only_open_fixtures_of_the_table(engine):
+    assert [(f["spieltag"], f["home_team"], f["away_team"]) for f in engine.fixture_list()] == [
+        (11, "FC Basel", "FC Zürich"), (11, "Servette FC", "FC Luzern"), (12, "FC Luzern", "FC Basel"),
+    ]
+
+
+def test_apply_adds_results_per_team(engine):
+    scenario = engine.parse([
+        {"fixture": 0, "home_goals": 0, "away_goals": 2},
+        {"home_team": "Servette FC", "away_team": "FC Luzern", "home_goals": 1, "away_goals": 1},
+        {"fixture": 2, "home_goals": 3, "away_goals": 1},
+    ])
+    table = engine.apply(scenario)
+    pos = engine.positions
+    expected_points = {"FC Basel": 20, "FC Zürich": 18, "Servette FC": 16, "FC Luzern": 9}
+    expected_diff = {"FC Basel": 4, "FC Zürich": 5, "Servette FC": 1, "FC Luzern": -10}
+    for team in TEAMS:
+        assert table["Points"][pos[team]] == expected_points[team]
+        assert table["Goal_Diff"][pos[team]] == expected_diff[team]
+    assert table["G"][pos["FC Luzern"]] == table_rows()["FC Luzern"]["G"] + 1
+    assert table["U"][pos["Servette FC"]] == table_rows()["Servette FC"]["U"] + 1
+    assert table["V"][pos["FC Basel"]] == table_rows()["FC Basel"]["V"] + 2
+    assert table["Restspiele"][pos["FC Basel"]] == 26 and table["Restspiele"][pos["FC Zürich"]] == 27
+    assert [TEAMS[i] for i in np.argsort(table["Rank"])] == ["FC Basel", "FC Zürich", "Servette FC", "FC Luzern"]
+
+
+def test_evaluate_changes_only_scenario(engine):
+    model, scaler = FeatureModel(), IdentityScaler()
+    baseline = model.predict_proba(engine.X_base)[:, 1]
+    scenario = engine.parse([{"fixture": 1, "home_goals": 0, "away_goals": 4}])
+    table, before, after, interval = engine.evaluate(scenario, model, scaler)
+    assert interval is None
+    np.testing.assert_array_equal(before, baseline)
+    changed = np.flatnonzero(after != before)
+    assert sorted(engine.teams[i] for i in changed) == ["FC Luzern", "Servette FC"]
+    assert after[engine.positions["FC Luzern"]] < before[engine.positions["FC Luzern"]]
+
+
+@pytest.mark.parametrize("result", [
+    {"fixture": 3, "home_goals": 1, "away_goals": 0},
+    {"home_team": "FC Zürich", "away_team": "FC Thun", "home_goals": 1, "away_goals": 0},
+])
+def test_parse_rejects_unknown_fixture(engine, result):
+    with pytest.raises(LookupError):
+        engine.parse([result])
+
+
+def test_api_unknown_fixture_is_not_found(app_client):
+    fixtures = app_client.get("/api/scenario").get_json()["fixtures"]
+    response = app_client.post("/api/scenario", json={"results": [{"fixture": len(fixtures), "home_goals": 1, "away_goals": 0}]})
+    assert response.status_code == 404
+
+
+def test_scenario_is_calibrated_like_api_predict(app_client):
+    fixtures = app_client.get("/api/scenario").get_json()["fixtures"]
+    assert fixtures
+    response = app_client.post("/api/scenario", json={"results": [{"fixture": 0, "home_goals": 3, "away_goals": 0}]})
+    assert response.status_code == 200
+    served = {p["team"]: p for p in app_client.get("/api/predict").get_json()["predictions"]}
+    for prediction in response.get_json()["predictions"]:
+        assert abs(prediction["baseline_probability"] - served[prediction["team"]]["probability"]) < 1e-12
+        interval = prediction["interval"]
+        assert interval["low"] <= prediction["probability"] <= interval["high"]
+        assert "uncalibrated_probability" in prediction
@@ -0,0 +1,40 @@
+import numpy as np
+
+from simulation import outcome_weights, simulate_remaining
+
+
+def test_outcome_weights_match_direct_table():
+    rng = np.random.default_rng(0)
+    n_teams, n_matches, size = 6, 15, 50
+    home_idx = rng.integers(0, n_teams, n_matches)
+    away_idx = (home_idx + rng.integers(1, n_teams, n_matches)) % n_teams
+    hg = rng.integers(0, 5, (size, n_matches))
+    ag = rng.integers(0, 5, (size, n_matches))
+
+    weights, constant = outcome_weights(home_idx, away_idx, n_teams)
+    outcomes = np.concatenate([hg > ag, hg == ag, hg, ag], axis=1).astype(np.float32)
+    result = np.rint(outcomes @ weights + constant).astype(int)
+
+    points = np.zeros((size, n_teams), dtype=int)
+    diff = np.zeros((size, n_teams), dtype=int)
+    goals = np.zeros((size, n_teams), dtype=int)
+    for m, (h, a) in enumerate(zip(home_idx, away_idx)):
+        points[:, h] += np.where(hg[:, m] > ag[:, m], 3, hg[:, m] == ag[:, m])
+        points[:, a] += np.where(ag[:, m] > hg[:, m], 3, hg[:, m] == ag[:, m])
+        diff[:, h] += hg[:, m] - ag[:, m]
+        diff[:, a] += ag[:, m] - hg[:, m]
+        goals[:, h] += hg[:, m]
+        goals[:, a] += ag[:, m]
+    np.testing.assert_array_equal(result, np.concatenate([points, diff, goals], axis=1))
+
+
+def test_simulation_is_reproducible_and_complete():
+    points = np.array([10, 8, 8, 3])
+    zeros = np.zeros(4, dtype=int)
+    home, away = np.array([0, 2, 0, 1]), np.array([1, 3, 2, 3])
+    lam = np.full(4, 1.3)
+    first = simulate_remaining(points, zeros, zeros, home, away, lam, lam, n_sims=5000, seed=7, max_block_cells=1000)
+    second = simulate_remaining(points, zeros, zeros, home, away, lam, lam, n_sims=5000, seed=7, max_block_cells=1000)
+    np.testing.assert_array_equal(first[0], second[0])
+    assert (first[0].sum(axis=1) == 5000).all()
+    assert (first[1].sum(axis=1) == 5000).all()
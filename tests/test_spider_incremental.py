@@ -0,0 +1,97 @@
+import mongomock
+import pytest
+
+import transfermarkt_spider as spider
+from fixtures import render_page
+from page_cache import PageCache
+from synthetic import generate_league
+
+
+def page(spieltag, played):
+    """Seite 2024/spieltag mit vergangenem Datum; nur die ersten played Partien haben ein Resultat."""
+    df_league, df_matches = generate_league(n_seasons=1, start_season=2024)
+    league_rows = df_league[df_league["Spieltag"] == spieltag]
+    match_rows = df_matches[df_matches["Spieltag"] == spieltag].copy()
+    match_rows.loc[match_rows.index[played:], ["home_goals", "away_goals"]] = -1
+    return render_page(2024, spieltag, league_rows, match_rows, "01.03.2024", filler_links=0)
+
+
+class FakeFetcher:
+    """Ersatz für den PageFetcher: liefert vorgegebene Seiten und merkt sich die Abrufe."""
+
+    fetched = []
+    pages = {}
+
+    def __init__(self, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def fetch_many(self, pages):
+        for season, spieltag in pages:
+            FakeFetcher.fetched.append((season, spieltag))
+            yield season, spieltag, FakeFetcher.pages[(season, spieltag)]
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    FakeFetcher.fetched = []
+    FakeFetcher.pages = {}
+    monkeypatch.setattr(spider, "PageFetcher", FakeFetcher)
+    return FakeFetcher
+
+
+@pytest.mark.parametrize("backend", ["lxml", "bs4"])
+def test_partially_played_round_is_not_complete(backend):
+    assert spider.collect_page(2024, 5, page(5, played=6), [], [], backend)
+    assert not spider.collect_page(2024, 5, page(5, played=3), [], [], backend)
+
+
+def test_partially_played_round_is_cached_as_future(tmp_path, fetcher):
+    cache = PageCache(str(tmp_path))
+    fetcher.pages[(2024, 5)] = page(5, played=3)
+    spider.get_all_data([2024], 5, 5, cache=cache)
+    # Abgelaufen nach ttl statt dauerhaft gültig
+    assert cache.get(2024, 5, now=float("inf")) is None
+
+
+def test_refresh_pages_bypass_cache(tmp_path, fetcher):
+    cache = PageCache(str(tmp_path))
+    cache.put(2024, 5, page(5, played=6), future=False)
+    fetcher.pages[(2024, 5)] = page(5, played=6)
+
+    spider.get_all_data([2024], 5, 5, cache=cache)
+    assert fetcher.fetched == []
+    spider.get_all_data([2024], 5, 5, cache=cache, refresh=[(2024, 5)])
+    assert fetcher.fetched == [(2024, 5)]
+
+
+def test_plan_refreshes_last_completed_matchday():
+    completed = {(2024, d) for d in range(1, 31)}
+    to_fetch, skipped, refresh = spider.plan_incremental_pages([2024], 1, 38, completed)
+    assert refresh == [(2024, 30)]
+    assert to_fetch == [(2024, d) for d in range(30, 39)]
+    assert len(skipped) == 29
+
+
+def test_completed_pages_require_every_result():
+    collection = mongomock.MongoClient().db["matches"]
+    collection.insert_many([
+        {"Season": 2024, "Spieltag": 31, "home_goals": 1, "away_goals": 0},
+        {"Season": 2024, "Spieltag": 31, "home_goals": 2, "away_goals": 2},
+        {"Season": 2024, "Spieltag": 32, "home_goals": 0, "away_goals": 1},
+        {"Season": 2024, "Spieltag": 32, "home_goals": -1, "away_goals": -1},
+        {"Season": 2023, "Spieltag": 1, "home_goals": 3, "away_goals": 1},
+    ])
+    assert spider.get_completed_pages(collection, [2024]) == {(2024, 31)}
+
+
+def test_incremental_requires_database(capsys):
+    with pytest.raises(SystemExit):
+        spider.parse_args(["--incremental", "--no-db"])
+    assert "--no-db" in capsys.readouterr().err
+    assert spider.parse_args(["--incremental"]).incremental
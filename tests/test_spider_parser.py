@@ -0,0 +1,27 @@
+import re
+
+import lxml.html
+import pytest
+from bs4 import BeautifulSoup
+
+from fixtures import iter_pages, load_raw_data
+from transfermarkt_spider import _lxml_text, parse_page_data
+
+
+@pytest.mark.parametrize("html, expected", [
+    ("<div><a>FC <b>Basel</b></a><script>var x=1;</script></div>", "FCBasel"),
+    ("<div>Servette<!-- Kommentar --><style>.a { }</style> FC<template><i>x</i></template></div>", "ServetteFC"),
+])
+def test_lxml_text_matches_beautifulsoup(html, expected):
+    assert BeautifulSoup(html, "html.parser").div.get_text(strip=True) == expected
+    assert _lxml_text(lxml.html.fromstring(html)) == expected
+
+
+def test_backends_agree_with_scripts_in_cells():
+    league, matches = load_raw_data()
+    season, spieltag, html = next(iter_pages(league, matches))
+    # Skripte und Kommentare in jeder Zelle dürfen die geparsten Werte nicht verändern
+    html = re.sub(r"</td>", "<script>var x = 1;</script><!-- x --></td>", html)
+    results = {backend: parse_page_data(html, season, spieltag, backend) for backend in ["bs4", "lxml"]}
+    assert results["lxml"] == results["bs4"]
+    assert all(row[4] and "var" not in row[4] for row in results["lxml"][0])
@@ -0,0 +1,54 @@
+import mongomock
+
+from transfermarkt_spider import ensure_key_index, league_key_fields, upsert_records
+
+
+def league_records(points):
+    return [
+        {"Season": 2023, "Spieltag": 1, "Team": team, "Points": points + i}
+        for i, team in enumerate(["FC Basel", "FC Zürich", "Servette FC"])
+    ]
+
+
+def test_ensure_key_index_creates_unique_index():
+    collection = mongomock.MongoClient().db["league-tables"]
+    name = ensure_key_index(collection, league_key_fields)
+    index = collection.index_information()[name]
+    assert index["key"] == [(field, 1) for field in league_key_fields]
+    assert index["unique"]
+    assert ensure_key_index(collection, league_key_fields) == name
+
+
+def test_ensure_key_index_replaces_non_unique_index():
+    collection = mongomock.MongoClient().db["league-tables"]
+    old = collection.create_index([(field, 1) for field in league_key_fields])
+    name = ensure_key_index(collection, league_key_fields)
+    indexes = collection.index_information()
+    assert indexes[name]["unique"] and old not in indexes
+    assert ensure_key_index(collection, league_key_fields) == name
+
+
+def test_ensure_key_index_keeps_old_index_when_keys_are_duplicated(capsys):
+    collection = mongomock.MongoClient().db["league-tables"]
+    collection.insert_many(league_records(3) + league_records(3))
+    old = collection.create_index([(field, 1) for field in league_key_fields])
+    assert ensure_key_index(collection, league_key_fields) == old
+    indexes = collection.index_information()
+    assert old in indexes and not indexes[old].get("unique")
+    assert "doppelte Schlüssel" in capsys.readouterr().out
+
+
+def test_upsert_records_is_idempotent_and_updates_fields():
+    collection = mongomock.MongoClient().db["league-tables"]
+    ensure_key_index(collection, league_key_fields)
+
+    assert upsert_records(collection, league_records(3), league_key_fields, batch_size=2) == \
+        {"upserted": 3, "modified": 0, "unchanged": 0}
+    assert upsert_records(collection, league_records(3), league_key_fields, batch_size=2) == \
+        {"upserted": 0, "modified": 0, "unchanged": 3}
+    assert upsert_records(collection, league_records(10), league_key_fields) == \
+        {"upserted": 0, "modified": 3, "unchanged": 0}
+
+    docs = list(collection.find({}, {"_id": 0}))
+    assert len(docs) == 3
+    assert sorted(doc["Points"] for doc in docs) == [10, 11, 12]
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from compact_model import export_compact, load_compact
+from synthetic import FEATURES, generate_league, prepare_league_df
+from team_index import build_team_index
+from uncertainty import (
+    Calibrator, UncertaintyModel, export_uncertainty, fit_bootstrap_ensemble, fit_calibrator, load_uncertainty,
+)
+
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+    league_df = prepare_league_df(generate_league(n_seasons=3)[0])
+    X, y = league_df[FEATURES], league_df["relegated"].to_numpy()
+    scaler = StandardScaler().fit(X)
+    make_model = lambda: LogisticRegression(max_iter=1000, class_weight="balanced")
+    model = make_model().fit(scaler.transform(X), y)
+    directory = tmp_path_factory.mktemp("models")
+    compact_path = export_compact(model, scaler, str(directory / "model.compact"), X_check=X)
+    coef, intercept = fit_bootstrap_ensemble(scaler.transform(X), y, make_model, members=20)
+    calibration, _ = fit_calibrator(model.predict_proba(scaler.transform(X))[:, 1], y, league_df["Season"].to_numpy())
+    uncertainty_path = export_uncertainty(
+        str(directory / "model.uncertainty"), calibration, Calibrator("none"), scaler, coef, intercept,
+    )
+    return league_df, model, scaler, compact_path, load_uncertainty(uncertainty_path)
+
+
+def test_compact_and_joblib_give_same_intervals(trained):
+    league_df, model, scaler, compact_path, uncertainty = trained
+    compact_model, compact_scaler = load_compact(compact_path)
+    results = []
+    for m, s in [(model, scaler), (compact_model, compact_scaler)]:
+        index = build_team_index(league_df, s, FEATURES)
+        results.append(uncertainty.predict(index.predict_proba(m), index.raw()))
+    for joblib_values, compact_values in zip(*results):
+        np.testing.assert_allclose(joblib_values, compact_values, atol=1e-9)
+    low, high = results[0][1], results[0][2]
+    assert np.all(low <= high)
+    assert np.any(high - low > 1e-3)
+
+
+def test_interval_matches_separate_members(trained):
+    league_df, _, scaler, _, uncertainty = trained
+    X = league_df[FEATURES].to_numpy(dtype=np.float64)[:12]
+    expected = 1.0 / (1.0 + np.exp(-(scaler.transform(X) @ uncertainty.coef + uncertainty.intercept)))
+    np.testing.assert_allclose(uncertainty.member_proba(X), expected, atol=1e-12)
+
+
+def test_interval_contains_served_probability_of_non_linear_model(trained):
+    league_df, _, scaler, _, uncertainty = trained
+    X = league_df[FEATURES]
+    y, groups = league_df["relegated"].to_numpy(), league_df["Season"].to_numpy()
+    forest = RandomForestClassifier(n_estimators=30, min_samples_leaf=5, random_state=0).fit(scaler.transform(X), y)
+    proba = forest.predict_proba(scaler.transform(X))[:, 1]
+    calibration, _ = fit_calibrator(proba, y, groups)
+    # Ensemble (logistische Regression) mit der Kalibrierung des ausgelieferten Random Forest
+    served = UncertaintyModel(calibration, uncertainty.member_calibration, uncertainty.mean, uncertainty.scale,
+                              uncertainty.coef, uncertainty.intercept, uncertainty.level)
+    calibrated, low, high = served.predict(proba, X.to_numpy(dtype=np.float64))
+    assert np.all(low <= calibrated) and np.all(calibrated <= high)
+    assert np.any(high - low > 1e-3)